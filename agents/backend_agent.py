@@ -2,9 +2,30 @@
 Backend specialized agent for the LLM Swarm system.
 """
 
+import re
+
 from .base_agent import SMEAgent
 from utils.dependency_graph import AgentType
 
+# Extensions that already identify a backend source file
+_VALID_EXT = re.compile(r'\.(py|js|ts|java|go|rs|php)$')
+
+# Content markers used to guess a missing extension
+_PY_RE = re.compile(r'\b(def |import |from |class )')
+_JS_RE = re.compile(r'\b(const |let |var |function |require\()')
+
+
+def _looks_like_java(content: str) -> bool:
+    """
+    Check for a package declaration followed by a public class.
+
+    Same test as matching ``package .*?public class`` with DOTALL, but two
+    linear str.find scans instead of a lazy regex that re-scans the rest of
+    the file from every "package " occurrence when no class follows.
+    """
+    package_pos = content.find('package ')
+    return package_pos != -1 and content.find('public class', package_pos + len('package ')) != -1
+
 
 class BackendAgent(SMEAgent):
     """
@@ -26,24 +47,16 @@ class BackendAgent(SMEAgent):
         # Default to Python for backend logic
         return "py"
     
-    def _parse_response(self, response: str, task):
-        """Enhanced parsing for backend-specific files."""
-        output = super()._parse_response(response, task)
-        
-        # Post-process backend files
-        processed_files = {}
-        for filename, content in output.files.items():
-            # Ensure proper file extensions for backend files
-            if not any(filename.endswith(ext) for ext in ['.py', '.js', '.ts', '.java', '.go', '.rs', '.php']):
-                # Guess extension based on content
-                if any(py_keyword in content for py_keyword in ['def ', 'import ', 'from ', 'class ']):
-                    filename = filename.rsplit('.', 1)[0] + '.py'
-                elif any(js_keyword in content for js_keyword in ['const ', 'let ', 'var ', 'function ', 'require(']):
-                    filename = filename.rsplit('.', 1)[0] + '.js'
-                elif 'package ' in content and 'public class' in content:
-                    filename = filename.rsplit('.', 1)[0] + '.java'
-            
-            processed_files[filename] = content
+    def _classify_filename(self, filename: str, content: str) -> str:
+        """Ensure proper file extensions for backend files, guessing from content."""
+        if _VALID_EXT.search(filename):
+            return filename
         
-        output.files = processed_files
-        return output
\ No newline at end of file
+        stem = filename.rsplit('.', 1)[0]
+        if _PY_RE.search(content):
+            return stem + '.py'
+        elif _JS_RE.search(content):
+            return stem + '.js'
+        elif _looks_like_java(content):
+            return stem + '.java'
+        return filename
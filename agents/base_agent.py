@@ -2,25 +2,131 @@
 Base agent classes for the LLM Swarm system.
 """
 
+import asyncio
+import copy
+import gc
+import importlib.util
+import json
 import logging
+import os
+import random
 import time
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional, List, Union
-from dataclasses import dataclass
+from typing import Dict, Any, Optional, List, Union, Tuple, Callable, Iterable, Iterator
+from dataclasses import dataclass, asdict
 import re
+import sys
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 
+from .inference_server import InferenceServer
 from utils.dependency_graph import Task, TaskStatus, AgentType
 from utils.prompt_templates import PromptTemplates
+from utils.response_cache import ResponseCache
+from utils.rate_limiter import get_rate_limiter
 from utils.config_loader import ModelConfig, AgentConfig
 
-# Import torch only when needed for local models
-try:
-    import torch
-except ImportError:
-    torch = None
+# Slotted dataclasses drop the per-instance __dict__; the slots flag needs Python 3.10+
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
+# torch is imported by _import_torch() when a local model is loaded, so API-only runs never pay for it
+torch = None
 
-@dataclass
+
+def _import_torch():
+    """Import torch on first use and publish it as this module's ``torch``."""
+    global torch
+    if torch is None:
+        import torch as _torch
+        torch = _torch
+    return torch
+
+
+# HTTP statuses that will fail the same way on every retry (bad request, auth, not found)
+_TERMINAL_STATUS_CODES = frozenset({400, 401, 403, 404, 422})
+
+# Longest backoff between generation attempts, in seconds
+_MAX_RETRY_DELAY = 60.0
+
+# Code fences with an explicit filename: ```filename: path/to/file.ext
+_FILE_RE = re.compile(r'```filename:\s*([^\n]+)\n(.*?)```', re.DOTALL)
+# Generic code fences, optionally tagged with a language
+_CODE_RE = re.compile(r'```(?:\w+)?\n(.*?)```', re.DOTALL)
+# A whole response wrapped in one json code fence, as some models do with a JSON envelope
+_JSON_FENCE_RE = re.compile(r'```json[ \t]*\n(.*)\n[ \t]*```\Z', re.DOTALL)
+
+# Written by the model after its last file (see the *_task templates); generation stops there
+_END_OF_FILES = "END_OF_FILES"
+
+# END_OF_FILES instruction of the *_task templates; dropped from the tasks of a batched_tasks
+# prompt, where a model following it would hit the stop sequence after the first answer
+_END_OF_FILES_INSTRUCTION = " After the last file, write END_OF_FILES on its own line."
+
+# Header of each answer in a response to the batched_tasks template
+_RESPONSE_HEADER_RE = re.compile(r'^=== RESPONSE (\d+) ===[ \t]*$', re.MULTILINE)
+
+# JSON envelope requested from models configured with structured_output
+_RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "summary": {"type": "string"},
+        "files": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"path": {"type": "string"}, "content": {"type": "string"}},
+                "required": ["path", "content"],
+                "additionalProperties": False
+            }
+        }
+    },
+    "required": ["summary", "files"],
+    "additionalProperties": False
+}
+
+# Tokenizers without a configured context length report a huge placeholder as model_max_length
+_UNSET_MAX_LENGTH = 10**8
+
+# Loaded transformers models keyed by (model_id, quantization, device); each entry counts its agents
+_local_models: Dict[tuple, Dict[str, Any]] = {}
+# Reentrant because __del__ can run from garbage collection while the lock is held
+_local_models_lock = threading.RLock()
+
+# vLLM engines by (model_id, kv_cache_dtype); an engine reserves most of the GPU, so agents on the same model share it
+_vllm_engines: Dict[tuple, Any] = {}
+_vllm_lock = threading.Lock()
+
+# Connection pools shared by every agent's async API clients, one per event loop: pooled
+# connections belong to the loop that opened them, and each asyncio.run starts a new loop
+_shared_http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+_shared_http_clients_lock = threading.Lock()
+
+
+def _get_shared_http_client():
+    """
+    Get the async HTTP client used by the API SDKs on the running event loop.
+
+    Sharing one pool lets agents reuse keep-alive connections instead of
+    paying a TLS handshake per client. Returns None when httpx is not
+    importable, in which case the SDKs fall back to their own client.
+    """
+    try:
+        import httpx
+    except ImportError:
+        return None
+    loop = asyncio.get_running_loop()
+    with _shared_http_clients_lock:
+        client = _shared_http_clients.get(loop)
+        if client is None:
+            client = _shared_http_clients[loop] = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+                timeout=httpx.Timeout(600.0, connect=5.0)
+            )
+    return client
+
+
+@dataclass(**_DATACLASS_SLOTS)
 class AgentOutput:
     """Output from an agent execution."""
     success: bool
@@ -36,11 +142,22 @@ class AgentOutput:
             self.metadata = {}
 
 
+@dataclass(**_DATACLASS_SLOTS)
+class AgentStats:
+    """Execution statistics of an agent."""
+    tasks_completed: int = 0
+    tasks_failed: int = 0
+    total_execution_time: float = 0.0
+
+
 class BaseAgent(ABC):
     """
     Abstract base class for all agents in the LLM Swarm system.
     """
     
+    # Typical response length for this kind of agent; None means the model's max_tokens
+    expected_output_tokens: Optional[int] = None
+    
     def __init__(self, name: str, agent_type: AgentType, config: AgentConfig, model_config: ModelConfig):
         """
         Initialize the base agent.
@@ -59,14 +176,17 @@ class BaseAgent(ABC):
         
         # Initialize prompt templates
         self.prompt_templates = PromptTemplates()
+        # The system prompt only depends on the agent, so it is rendered once on first use
+        self._system_prompt = None
+        # Compiled task template; only its render varies between tasks
+        self._task_template = None
+        # Last (project_context, rendered context) pair; the orchestrator passes one dict for every task
+        self._context_cache = None
+        # Responses by normalized task, so a re-run of the same task skips generation
+        self.response_cache = ResponseCache()
         
         # Track execution statistics
-        self.stats = {
-            "tasks_completed": 0,
-            "tasks_failed": 0,
-            "total_execution_time": 0.0,
-            "average_execution_time": 0.0
-        }
+        self.stats = AgentStats()
     
     @abstractmethod
     def _generate_response(self, prompt: str) -> str:
@@ -81,13 +201,18 @@ class BaseAgent(ABC):
         """
         pass
     
-    def run_task(self, task: Task, project_context: Dict[str, Any] = None) -> AgentOutput:
+    def run_task(self, task: Task, project_context: Dict[str, Any] = None,
+                 on_file: Optional[Callable[[str, str], None]] = None) -> AgentOutput:
         """
         Execute a task using this agent.
         
         Args:
             task: Task to execute
             project_context: Global project context
+            on_file: Called with the name and content of each file as soon as
+                the model has finished writing it, while the rest of the
+                response is still generating. Only local models stream, so the
+                returned output still lists every file.
             
         Returns:
             Agent output with results
@@ -95,37 +220,150 @@ class BaseAgent(ABC):
         start_time = time.time()
         
         try:
-            self.logger.info(f"Starting task: {task.name}")
+            cache_key, response = self._begin_task(task, project_context or {})
+            if response is None:
+                prompt = self._prepare_prompt(task, project_context or {})
+                response = self._generate_with_retries(prompt, on_file)
+                self._store_response(cache_key, task, response)
+            return self._finish_task(task, response, start_time)
             
-            # Validate that this agent can handle the task
-            if task.agent_type != self.agent_type:
-                error_msg = f"Agent type mismatch: task requires {task.agent_type}, agent is {self.agent_type}"
-                self.logger.error(error_msg)
-                return AgentOutput(success=False, error=error_msg)
+        except Exception as e:
+            return self._fail_task(e, start_time)
+    
+    async def arun_task(self, task: Task, project_context: Dict[str, Any] = None) -> AgentOutput:
+        """
+        Execute a task using this agent without blocking the event loop.
+        
+        Args:
+            task: Task to execute
+            project_context: Global project context
             
-            # Prepare the prompt
-            prompt = self._prepare_prompt(task, project_context or {})
+        Returns:
+            Agent output with results
+        """
+        start_time = time.time()
+        
+        try:
+            cache_key, response = self._begin_task(task, project_context or {})
+            if response is None:
+                prompt = self._prepare_prompt(task, project_context or {})
+                response = await self._agenerate_with_retries(prompt, self._expected_tokens(task))
+                self._store_response(cache_key, task, response)
+            return self._finish_task(task, response, start_time)
+            
+        except Exception as e:
+            return self._fail_task(e, start_time)
+    
+    def _begin_task(self, task: Task, project_context: Dict[str, Any]) -> Tuple[str, Optional[str]]:
+        """
+        Check that this agent can handle a task and look up its cached response.
+        
+        Returns:
+            The task's response cache key, and its cached response or None
             
-            # Generate response with retries
-            response = self._generate_with_retries(prompt)
+        Raises:
+            ValueError: If the task is for another agent type
+        """
+        self.logger.info(f"Starting task: {task.name}")
+        
+        if task.agent_type != self.agent_type:
+            raise ValueError(f"Agent type mismatch: task requires {task.agent_type}, agent is {self.agent_type}")
+        
+        cache_key = self._task_cache_key(task, project_context)
+        response = self._lookup_response(cache_key, task)
+        if response is not None:
+            self.logger.info(f"Reusing cached response for task: {task.name}")
+        return cache_key, response
+    
+    def _finish_task(self, task: Task, response: str, start_time: float) -> AgentOutput:
+        """Parse a task's response into files and record its success."""
+        output = self._parse_response(response, task)
+        
+        execution_time = time.time() - start_time
+        self._update_stats(execution_time, success=True)
+        
+        self.logger.info(f"Completed task: {task.name} ({execution_time:.2f}s)")
+        return output
+    
+    def _fail_task(self, error: Exception, start_time: float) -> AgentOutput:
+        """Record a failed task and build its output."""
+        self._update_stats(time.time() - start_time, success=False)
+        
+        error_msg = f"Task execution failed: {str(error)}"
+        self.logger.error(error_msg)
+        return AgentOutput(success=False, error=error_msg)
+    
+    def run_tasks(self, tasks: List[Task], project_context: Dict[str, Any] = None) -> List[AgentOutput]:
+        """
+        Execute several tasks, sharing a single model call where the backend supports it.
+        
+        Args:
+            tasks: Tasks to execute (all must match this agent's type)
+            project_context: Global project context
             
-            # Parse the response into files
-            output = self._parse_response(response, task)
+        Returns:
+            Agent outputs, in the same order as the tasks
+        """
+        if len(tasks) <= 1:
+            return [self.run_task(task, project_context) for task in tasks]
+        
+        start_time = time.time()
+        
+        try:
+            for task in tasks:
+                if task.agent_type != self.agent_type:
+                    raise ValueError(f"Agent type mismatch: task requires {task.agent_type}, agent is {self.agent_type}")
             
-            # Update statistics
-            execution_time = time.time() - start_time
-            self._update_stats(execution_time, success=True)
+            self.logger.info(f"Starting batch of {len(tasks)} tasks")
+            cache_keys = [self._task_cache_key(task, project_context or {}) for task in tasks]
+            responses = [
+                self._lookup_response(key, task)
+                for key, task in zip(cache_keys, tasks)
+            ]
             
-            self.logger.info(f"Completed task: {task.name} ({execution_time:.2f}s)")
-            return output
+            # Only tasks without a cached response go to the model
+            pending = [i for i, response in enumerate(responses) if response is None]
+            if pending:
+                prompts = [self._prepare_prompt(tasks[i], project_context or {}) for i in pending]
+                for i, response in zip(pending, self._generate_batch(prompts)):
+                    responses[i] = response
+                    if response and response.strip():
+                        self._store_response(cache_keys[i], tasks[i], response)
             
         except Exception as e:
-            execution_time = time.time() - start_time
-            self._update_stats(execution_time, success=False)
+            self.logger.warning(f"Batched generation failed, falling back to per-task execution: {e}")
+            return [self.run_task(task, project_context) for task in tasks]
+        
+        # Wall time is shared by the whole batch
+        execution_time = (time.time() - start_time) / len(tasks)
+        
+        outputs = []
+        for task, response in zip(tasks, responses):
+            if not response or not response.strip():
+                # Retry this task on its own rather than failing the batch
+                outputs.append(self.run_task(task, project_context))
+                continue
             
-            error_msg = f"Task execution failed: {str(e)}"
-            self.logger.error(error_msg)
-            return AgentOutput(success=False, error=error_msg)
+            outputs.append(self._parse_response(response, task))
+            self._update_stats(execution_time, success=True)
+            self.logger.info(f"Completed task: {task.name} (batched)")
+        
+        return outputs
+    
+    def _generate_batch(self, prompts: List[str]) -> List[str]:
+        """
+        Generate responses for several prompts.
+        
+        The default implementation generates one prompt at a time; backends
+        that can batch override this.
+        
+        Args:
+            prompts: Input prompts
+            
+        Returns:
+            Generated responses, in the same order as the prompts
+        """
+        return [self._generate_with_retries(prompt) for prompt in prompts]
     
     def _prepare_prompt(self, task: Task, project_context: Dict[str, Any]) -> str:
         """
@@ -138,25 +376,21 @@ class BaseAgent(ABC):
         Returns:
             Formatted prompt
         """
-        # Get system prompt template
-        system_template_name = f"{self.agent_type.value}_system"
-        system_prompt = self.prompt_templates.render_template(
-            system_template_name,
-            agent_name=self.name,
-            agent_type=self.agent_type.value
-        )
+        system_prompt = self._get_system_prompt()
         
         # Get task prompt template
-        task_template_name = f"{self.agent_type.value}_task"
+        if self._task_template is None:
+            self._task_template = self.prompt_templates.get_template(f"{self.agent_type.value}_task")
         
         # Create enhanced project context for the agent
         enhanced_context = self._create_enhanced_context(project_context)
         
-        task_prompt = self.prompt_templates.render_template(
-            task_template_name,
+        task_prompt = self._task_template.render(
             task_description=task.description,
             project_context=enhanced_context,
-            dependencies=task.context.get("completed_dependencies", [])
+            dependencies=task.context.get("completed_dependencies", []),
+            # A JSON envelope ends with its closing brace, so it is not followed by END_OF_FILES
+            structured_output=self.model_config.structured_output
         )
         
         # Combine system and task prompts
@@ -165,6 +399,55 @@ class BaseAgent(ABC):
         self.logger.debug(f"Prepared prompt for task {task.id} ({len(full_prompt)} chars)")
         return full_prompt
     
+    def _task_cache_key(self, task: Task, project_context: Dict[str, Any]) -> str:
+        """Key a task's response by what it asks for, ignoring whitespace and case differences."""
+        dependencies = sorted(dep["name"] for dep in task.context.get("completed_dependencies", []))
+        return ResponseCache.make_key(
+            self.agent_type.value,
+            task.description,
+            project_context.get("description"),
+            *dependencies
+        )
+    
+    def _task_cache_text(self, task: Task) -> str:
+        """
+        Text of a task for similarity lookups in the response cache.
+        
+        The project description is left out: shared by every task of a project,
+        it would outweigh the task's own words and make them all look alike.
+        """
+        dependencies = [dep["name"] for dep in task.context.get("completed_dependencies", [])]
+        return "\n".join([task.description, *dependencies])
+    
+    def _lookup_response(self, cache_key: str, task: Task) -> Optional[str]:
+        """Find a cached response to a task: an exact match, or a near duplicate if enabled."""
+        response = self.response_cache.get(cache_key)
+        threshold = self.config.similarity_threshold
+        if response is None and threshold is not None:
+            response = self.response_cache.get_similar(self._task_cache_text(task), threshold)
+        return response
+    
+    def _store_response(self, cache_key: str, task: Task, response: str) -> None:
+        """Cache a task's response, with its text when similarity lookups are enabled."""
+        text = self._task_cache_text(task) if self.config.similarity_threshold is not None else None
+        self.response_cache.put(cache_key, response, text)
+    
+    def _expected_tokens(self, task: Task) -> int:
+        """Estimate how many tokens the response to a task will take."""
+        return task.expected_tokens or self.expected_output_tokens or self.model_config.max_tokens
+    
+    def _get_system_prompt(self) -> str:
+        """Render this agent's system prompt, caching it for subsequent tasks."""
+        if self._system_prompt is None:
+            self._system_prompt = self.prompt_templates.render_template(
+                f"{self.agent_type.value}_system",
+                agent_name=self.name,
+                agent_type=self.agent_type.value
+            )
+            if self.model_config.structured_output:
+                self._system_prompt += "\n\n" + self.prompt_templates.render_template("structured_output_format")
+        return self._system_prompt
+    
     def _create_enhanced_context(self, project_context: Dict[str, Any]) -> str:
         """
         Create enhanced context string for the agent with tech stack information.
@@ -175,6 +458,10 @@ class BaseAgent(ABC):
         Returns:
             Formatted context string for the agent
         """
+        # Compare by identity and hold a reference so a recycled id() can never match
+        if self._context_cache and self._context_cache[0] is project_context:
+            return self._context_cache[1]
+        
         context_parts = []
         
         # Project description
@@ -236,14 +523,17 @@ class BaseAgent(ABC):
             if deps:
                 context_parts.append(f"\nKey Dependencies: {', '.join(deps[:5])}")  # Show first 5
         
-        return '\n'.join(context_parts)
+        enhanced_context = '\n'.join(context_parts)
+        self._context_cache = (project_context, enhanced_context)
+        return enhanced_context
     
-    def _generate_with_retries(self, prompt: str) -> str:
+    def _generate_with_retries(self, prompt: str, on_file: Optional[Callable[[str, str], None]] = None) -> str:
         """
         Generate response with retry logic.
         
         Args:
             prompt: Input prompt
+            on_file: Called for each file as soon as it is generated (see run_task)
             
         Returns:
             Generated response
@@ -251,31 +541,129 @@ class BaseAgent(ABC):
         Raises:
             Exception: If all retries fail
         """
-        max_retries = self.config.max_retries
-        last_error = None
+        attempt = 0
+        while True:
+            try:
+                if on_file:
+                    return self._check_response(self._generate_response_streaming(prompt, on_file))
+                return self._check_response(self._generate_response(prompt))
+            except Exception as e:
+                time.sleep(self._next_retry_delay(attempt, e))
+                attempt += 1
+    
+    def _generate_response_streaming(self, prompt: str, on_file: Callable[[str, str], None]) -> str:
+        """
+        Generate a response, passing each file to on_file as soon as its closing fence is generated.
+        
+        The default implementation can't stream and reports no file; the
+        caller gets them all from the parsed response instead.
+        
+        Args:
+            prompt: Input prompt
+            on_file: Called with the name and content of each completed file
+            
+        Returns:
+            Generated response
+        """
+        return self._generate_response(prompt)
+    
+    async def _agenerate_response(self, prompt: str, expected_tokens: Optional[int] = None) -> str:
+        """
+        Generate a response without blocking the event loop.
+        
+        The default implementation runs the blocking _generate_response in a
+        worker thread; backends with native async clients override this.
+        
+        Args:
+            prompt: Input prompt
+            expected_tokens: Expected response length; backends that batch
+                requests use it to group generations of similar length
+            
+        Returns:
+            Generated response
+        """
+        return await asyncio.to_thread(self._generate_response, prompt)
+    
+    async def _agenerate_with_retries(self, prompt: str, expected_tokens: Optional[int] = None) -> str:
+        """
+        Generate response with retry logic without blocking the event loop.
         
-        for attempt in range(max_retries + 1):
+        Args:
+            prompt: Input prompt
+            expected_tokens: Expected response length, if known
+            
+        Returns:
+            Generated response
+            
+        Raises:
+            Exception: If all retries fail
+        """
+        attempt = 0
+        while True:
             try:
-                if attempt > 0:
-                    self.logger.warning(f"Retry attempt {attempt}/{max_retries}")
-                
-                response = self._generate_response(prompt)
-                
-                if response and response.strip():
-                    return response
-                else:
-                    raise ValueError("Empty response from model")
-                    
+                return self._check_response(await self._agenerate_response(prompt, expected_tokens))
             except Exception as e:
-                last_error = e
-                self.logger.warning(f"Generation attempt {attempt + 1} failed: {e}")
-                
-                if attempt < max_retries:
-                    # Wait before retry (exponential backoff)
-                    wait_time = 2 ** attempt
-                    time.sleep(wait_time)
+                await asyncio.sleep(self._next_retry_delay(attempt, e))
+                attempt += 1
+    
+    def _check_response(self, response: str) -> str:
+        """Return a generated response, raising if the model produced nothing."""
+        if not response or not response.strip():
+            raise ValueError("Empty response from model")
+        return response
+    
+    def _next_retry_delay(self, attempt: int, error: Exception) -> float:
+        """
+        Decide whether to retry a failed generation attempt, and after how long.
+        
+        Args:
+            attempt: Number of the failed attempt, counting from 0
+            error: Why it failed
+            
+        Returns:
+            Seconds to wait before the next attempt
+            
+        Raises:
+            Exception: If the error isn't retryable or no retries are left
+        """
+        max_retries = self.config.max_retries
+        self.logger.warning(f"Generation attempt {attempt + 1} failed: {error}")
+        
+        if attempt >= max_retries or not self._is_retryable(error):
+            raise Exception(f"All {attempt + 1} generation attempts failed. Last error: {error}") from error
+        
+        self.logger.warning(f"Retry attempt {attempt + 1}/{max_retries}")
+        return self._retry_delay(attempt, error)
+    
+    def _retry_delay(self, attempt: int, error: Optional[Exception] = None) -> float:
+        """
+        Work out how long to wait before the next generation attempt.
         
-        raise Exception(f"All {max_retries + 1} generation attempts failed. Last error: {last_error}")
+        A rate-limited API response (HTTP 429) carrying a Retry-After header is
+        honored as is. Otherwise the delay is capped exponential backoff with
+        +/-50% jitter, so agents sharing a rate limit don't retry in lockstep.
+        """
+        if getattr(error, "status_code", None) == 429:
+            retry_after = self._retry_after(error)
+            if retry_after is not None:
+                return min(retry_after, _MAX_RETRY_DELAY)
+        return min(_MAX_RETRY_DELAY, 2 ** attempt) * random.uniform(0.5, 1.5)
+    
+    def _retry_after(self, error: Exception) -> Optional[float]:
+        """Read the Retry-After header (in seconds) from an API error's response, if present."""
+        headers = getattr(getattr(error, "response", None), "headers", None)
+        if not headers:
+            return None
+        try:
+            return max(float(headers.get("retry-after")), 0.0)
+        except (TypeError, ValueError):
+            # Missing, or given as an HTTP date, which the backoff covers well enough
+            return None
+    
+    def _is_retryable(self, error: Exception) -> bool:
+        """Check whether a generation error is worth retrying."""
+        # OpenAI and Anthropic API errors both carry the HTTP status code
+        return getattr(error, "status_code", None) not in _TERMINAL_STATUS_CODES
     
     def _parse_response(self, response: str, task: Task) -> AgentOutput:
         """
@@ -288,48 +676,16 @@ class BaseAgent(ABC):
         Returns:
             Parsed agent output
         """
-        files = {}
-        summary = ""
-        
-        # Look for code blocks with filenames
-        # Pattern: ```filename: path/to/file.ext
-        file_pattern = r'```filename:\s*([^\n]+)\n(.*?)```'
-        matches = re.findall(file_pattern, response, re.DOTALL)
-        
-        if matches:
-            for filename, content in matches:
-                filename = filename.strip()
-                content = content.strip()
-                files[filename] = content
-                self.logger.debug(f"Extracted file: {filename} ({len(content)} chars)")
-        else:
-            # Fallback: look for generic code blocks
-            code_pattern = r'```(?:\w+)?\n(.*?)```'
-            code_matches = re.findall(code_pattern, response, re.DOTALL)
-            
-            if code_matches:
-                # If only one code block, use task name as filename
-                if len(code_matches) == 1:
-                    # Guess file extension based on agent type
-                    ext = self._guess_file_extension()
-                    filename = f"{task.name.lower().replace(' ', '_')}.{ext}"
-                    files[filename] = code_matches[0].strip()
-                else:
-                    # Multiple code blocks, number them
-                    ext = self._guess_file_extension()
-                    for i, content in enumerate(code_matches):
-                        filename = f"{task.name.lower().replace(' ', '_')}_{i+1}.{ext}"
-                        files[filename] = content.strip()
-        
-        # Extract summary (text before first code block or entire response if no code)
-        if files:
-            # Find the first code block and use text before it as summary
-            first_code_pos = response.find('```')
-            if first_code_pos > 0:
-                summary = response[:first_code_pos].strip()
+        # A JSON envelope (see structured_output) is decoded in one pass; anything else is scanned for code fences
+        text = response.strip()
+        fenced = _JSON_FENCE_RE.match(text)
+        if fenced:
+            text = fenced.group(1).lstrip()
+        envelope = self._parse_json_envelope(text) if text.startswith("{") else None
+        if envelope is not None:
+            files, summary = envelope
         else:
-            # No code blocks found, entire response is summary
-            summary = response.strip()
+            files, summary = self._parse_fenced_files(response, task)
         
         # Clean up summary
         if len(summary) > 500:
@@ -347,6 +703,115 @@ class BaseAgent(ABC):
             }
         )
     
+    def _parse_json_envelope(self, response: str) -> Optional[Tuple[Dict[str, str], str]]:
+        """
+        Read files and summary from a JSON envelope response.
+        
+        Args:
+            response: Raw response from the model
+            
+        Returns:
+            Files and summary, or None if the response is not a valid envelope
+        """
+        try:
+            data = json.loads(response)
+            files = {}
+            for entry in data["files"]:
+                content = entry["content"]
+                files[self._classify_filename(entry["path"], content)] = content
+            return files, str(data.get("summary", ""))
+        except (json.JSONDecodeError, KeyError, TypeError, AttributeError):
+            return None
+    
+    def _parse_fenced_files(self, response: str, task: Task) -> Tuple[Dict[str, str], str]:
+        """
+        Extract files from code fences, and the summary text before them.
+        
+        Args:
+            response: Raw response from the model
+            task: Original task, used to name unnamed code blocks
+            
+        Returns:
+            Files and summary
+        """
+        files = {}
+        summary = ""
+        
+        # Look for code blocks with filenames, building the files dict as matches stream in
+        first_code_pos = -1
+        for match in _FILE_RE.finditer(response):
+            if first_code_pos < 0:
+                first_code_pos = match.start()
+            content = match.group(2).strip()
+            filename = self._classify_filename(match.group(1).strip(), content)
+            files[filename] = content
+            self.logger.debug(f"Extracted file: {filename} ({len(content)} chars)")
+        
+        if not files:
+            # Fall back to generic code blocks; naming depends on how many there are
+            matches = list(_CODE_RE.finditer(response))
+            
+            if matches:
+                first_code_pos = matches[0].start()
+                # Guess file extension based on agent type
+                ext = self._guess_file_extension()
+                base_name = task.name.lower().replace(' ', '_')
+                # If only one code block, use task name as filename
+                if len(matches) == 1:
+                    content = matches[0].group(1).strip()
+                    files[self._classify_filename(f"{base_name}.{ext}", content)] = content
+                else:
+                    # Multiple code blocks, number them
+                    for i, match in enumerate(matches):
+                        content = match.group(1).strip()
+                        files[self._classify_filename(f"{base_name}_{i+1}.{ext}", content)] = content
+        
+        # Extract summary (text before first code block or entire response if no code)
+        if files:
+            if first_code_pos > 0:
+                summary = response[:first_code_pos].strip()
+        else:
+            # No code blocks found, entire response is summary
+            summary = response.strip()
+        
+        return files, summary
+    
+    def _iter_completed_files(self, chunks: Iterable[str]) -> Iterator[Tuple[str, str]]:
+        """
+        Yield each filename fence of a response as soon as it closes.
+        
+        Args:
+            chunks: Response text arriving in pieces, e.g. from a token stream
+            
+        Yields:
+            Filename and content of each completed file, named as _parse_fenced_files names them
+        """
+        buffer = ""
+        pos = 0
+        for chunk in chunks:
+            buffer += chunk
+            # Only look from the end of the last complete fence onwards
+            for match in _FILE_RE.finditer(buffer, pos):
+                content = match.group(2).strip()
+                yield self._classify_filename(match.group(1).strip(), content), content
+                pos = match.end()
+    
+    def _classify_filename(self, filename: str, content: str) -> str:
+        """
+        Adjust the name of a parsed file, e.g. to fix a missing extension.
+        
+        Called once per file while the response is parsed; specialized
+        agents override this instead of post-processing the files dict.
+        
+        Args:
+            filename: Name given by the model (or generated for an unnamed block)
+            content: File content
+            
+        Returns:
+            Filename to store the content under
+        """
+        return filename
+    
     def _guess_file_extension(self) -> str:
         """Guess appropriate file extension based on agent type."""
         extensions = {
@@ -361,28 +826,23 @@ class BaseAgent(ABC):
     def _update_stats(self, execution_time: float, success: bool) -> None:
         """Update execution statistics."""
         if success:
-            self.stats["tasks_completed"] += 1
+            self.stats.tasks_completed += 1
         else:
-            self.stats["tasks_failed"] += 1
+            self.stats.tasks_failed += 1
         
-        self.stats["total_execution_time"] += execution_time
-        
-        total_tasks = self.stats["tasks_completed"] + self.stats["tasks_failed"]
-        if total_tasks > 0:
-            self.stats["average_execution_time"] = self.stats["total_execution_time"] / total_tasks
+        self.stats.total_execution_time += execution_time
     
     def get_stats(self) -> Dict[str, Any]:
         """Get agent execution statistics."""
-        return self.stats.copy()
+        stats = asdict(self.stats)
+        # The average is only needed when someone asks for it
+        total_tasks = self.stats.tasks_completed + self.stats.tasks_failed
+        stats["average_execution_time"] = self.stats.total_execution_time / total_tasks if total_tasks else 0.0
+        return stats
     
     def reset_stats(self) -> None:
         """Reset execution statistics."""
-        self.stats = {
-            "tasks_completed": 0,
-            "tasks_failed": 0,
-            "total_execution_time": 0.0,
-            "average_execution_time": 0.0
-        }
+        self.stats = AgentStats()
 
 
 class SMEAgent(BaseAgent):
@@ -395,22 +855,101 @@ class SMEAgent(BaseAgent):
         super().__init__(name, agent_type, config, model_config)
         self.model = None
         self.tokenizer = None
+        self.llm = None
+        self._inference_server = None
         self.api_client = None
+        self.async_api_client = None
+        # Async SDK client class and arguments; a client is created per event loop by _get_async_api_client
+        self._async_client_class = None
+        self._client_kwargs: Dict[str, Any] = {}
+        self._async_api_client_loop = None
+        self._provider = None
+        self._rate_limiter = None
+        # Most recent (prompt, inputs) pair, reused when a retry resends the same prompt
+        self._last_tokenized = None
+        # Tokenized system prompt, and (its token ids, KV cache) so the shared prefix is prefilled once
+        self._system_inputs = None
+        self._prefix_cache = None
+        # (inputs, KV cache) of the last prompt, so a retry skips its prefill entirely
+        self._prompt_cache = None
+        # Longest prompt (in tokens) that still leaves room for max_tokens of output
+        self._max_input_len = None
         
         # Load model based on type
         if self.model_config.type == "local":
             self._load_local_model()
+            self._max_input_len = self._compute_max_input_len()
+            # Tokenize the static system prompt up front, so the first task doesn't pay for it
+            self._get_system_inputs()
+        elif self.model_config.type == "vllm":
+            self._load_vllm_engine()
         elif self.model_config.type == "api":
             self._load_api_client()
         else:
             raise ValueError(f"Unsupported model type: {self.model_config.type}")
     
+    def _local_model_key(self) -> tuple:
+        """Key identifying a loaded local model in the process-wide registry."""
+        return (self.model_config.model_id, self.model_config.quantization, self.model_config.device)
+    
     def _load_local_model(self) -> None:
-        """Load the local model for this agent."""
+        """Load the local model for this agent, reusing one already loaded by another agent."""
+        key = self._local_model_key()
+        # Held across the load so agents created concurrently don't each load the same weights
+        with _local_models_lock:
+            shared = _local_models.get(key)
+            if shared:
+                shared["refs"] += 1
+                self.model = shared["model"]
+                self.tokenizer = shared["tokenizer"]
+                self._inference_server = shared["server"]
+                self.logger.info(f"Reusing loaded model: {self.model_config.model_id}")
+                return
+            
+            self._load_model_weights()
+            # Async callers of every agent on this model are batched together through one server
+            self._inference_server = InferenceServer(max_batch_size=self.model_config.max_num_seqs)
+            _local_models[key] = {
+                "model": self.model,
+                "tokenizer": self.tokenizer,
+                "server": self._inference_server,
+                "refs": 1
+            }
+    
+    def _compute_max_input_len(self) -> int:
+        """Work out the prompt token budget once, after the tokenizer and model are loaded."""
+        context_length = self.tokenizer.model_max_length
+        if context_length >= _UNSET_MAX_LENGTH:
+            # Fall back to the model's own position limit when the tokenizer doesn't know it
+            model_config = getattr(self.model, "config", None)
+            context_length = getattr(model_config, "max_position_embeddings", None) or context_length
+        # Never let a large max_tokens push the budget to zero or below
+        return max(context_length - self.model_config.max_tokens, 1)
+    
+    def _to_model_device(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Move tokenized inputs to the model's device.
+        
+        On CUDA the tensors are pinned and copied asynchronously, so the
+        host-to-device transfer can overlap with work already queued on the GPU.
+        """
+        device = getattr(self.model, "device", None)
+        if device is None:
+            return dict(inputs)
+        if device.type == "cuda":
+            return {k: v.pin_memory().to(device, non_blocking=True) for k, v in inputs.items()}
+        return {k: v.to(device) for k, v in inputs.items()}
+    
+    def _load_model_weights(self) -> None:
+        """Load the tokenizer and model weights described by the model config."""
         try:
             self.logger.info(f"Loading local model: {self.model_config.model_id}")
             
-            # Import here to avoid loading transformers if not needed
+            # Agents share this tokenizer across threads; let its Rust backend parallelize unless told otherwise
+            os.environ.setdefault("TOKENIZERS_PARALLELISM", "true")
+            
+            # Import here to avoid loading torch/transformers if not needed
+            _import_torch()
             from transformers import AutoModelForCausalLM, AutoTokenizer
             
             # Load tokenizer
@@ -432,18 +971,39 @@ class SMEAgent(BaseAgent):
             if self.model_config.device == "auto":
                 model_kwargs["device_map"] = "auto"
             
-            if self.model_config.quantization:
-                if self.model_config.quantization == "4bit":
+            quantization = self._resolve_quantization()
+            if quantization:
+                if quantization == "4bit":
                     from transformers import BitsAndBytesConfig
+                    # NF4 weights with double quantization; compute in bf16 where the GPU supports it
+                    use_bf16 = torch.cuda.is_available() and torch.cuda.is_bf16_supported()
+                    compute_dtype = torch.bfloat16 if use_bf16 else torch.float16
                     model_kwargs["quantization_config"] = BitsAndBytesConfig(
                         load_in_4bit=True,
-                        bnb_4bit_compute_dtype="float16"
+                        bnb_4bit_quant_type="nf4",
+                        bnb_4bit_use_double_quant=True,
+                        bnb_4bit_compute_dtype=compute_dtype
                     )
+                    model_kwargs["torch_dtype"] = compute_dtype
             
-            self.model = AutoModelForCausalLM.from_pretrained(
-                self.model_config.model_id,
-                **model_kwargs
-            )
+            model_kwargs["attn_implementation"] = self._select_attn_implementation()
+            
+            try:
+                self.model = AutoModelForCausalLM.from_pretrained(
+                    self.model_config.model_id,
+                    **model_kwargs
+                )
+            except (ImportError, ValueError) as e:
+                # Not every architecture supports the fused kernels; fall back to the default
+                self.logger.warning(f"{model_kwargs['attn_implementation']} attention unavailable ({e}), using default")
+                model_kwargs.pop("attn_implementation")
+                self.model = AutoModelForCausalLM.from_pretrained(
+                    self.model_config.model_id,
+                    **model_kwargs
+                )
+            
+            if self.model_config.compile and torch.cuda.is_available():
+                self._compile_model()
             
             self.logger.info("Model loaded successfully")
             
@@ -451,22 +1011,92 @@ class SMEAgent(BaseAgent):
             self.logger.error(f"Failed to load model: {e}")
             raise
     
+    def _resolve_quantization(self) -> Optional[str]:
+        """Resolve the configured quantization, turning "auto" into 4bit when bitsandbytes can run on CUDA."""
+        quantization = self.model_config.quantization
+        if quantization == "auto":
+            # Decode is memory-bound, so 4-bit weights pay off wherever they are supported
+            quantization = "4bit" if torch.cuda.is_available() and importlib.util.find_spec("bitsandbytes") else None
+        return quantization
+    
+    def _select_attn_implementation(self) -> str:
+        """Pick FlashAttention-2 when it is installed and usable, otherwise PyTorch SDPA."""
+        if torch.cuda.is_available() and importlib.util.find_spec("flash_attn"):
+            return "flash_attention_2"
+        return "sdpa"
+    
+    def _compile_model(self) -> None:
+        """Compile the loaded model and warm it up so the first task doesn't pay compile cost."""
+        self.logger.info("Compiling model with torch.compile")
+        # A static KV cache keeps decode step shapes fixed, so reduce-overhead can capture CUDA graphs
+        self.model.generation_config.cache_implementation = "static"
+        # Compile forward in place: generate() calls the module's own forward, which a compiled wrapper would bypass
+        self.model.forward = torch.compile(self.model.forward, mode="reduce-overhead", fullgraph=False)
+        
+        # Generate a single token to trigger compilation
+        warmup = self.tokenizer("warmup", return_tensors="pt")
+        warmup = self._to_model_device(warmup)
+        with torch.inference_mode():
+            self.model.generate(
+                **warmup,
+                max_new_tokens=1,
+                pad_token_id=self.tokenizer.pad_token_id
+            )
+    
+    def _load_vllm_engine(self) -> None:
+        """Load (or reuse) the vLLM engine serving this agent's model."""
+        try:
+            key = (self.model_config.model_id, self.model_config.kv_cache_dtype)
+            with _vllm_lock:
+                if key not in _vllm_engines:
+                    self.logger.info(f"Starting vLLM engine: {self.model_config.model_id}")
+                    
+                    # Import here to avoid loading vllm if not needed
+                    from vllm import LLM
+                    
+                    _vllm_engines[key] = LLM(
+                        model=self.model_config.model_id,
+                        trust_remote_code=True,
+                        enable_prefix_caching=True,
+                        max_num_seqs=self.model_config.max_num_seqs,
+                        # An FP8 cache halves the KV bytes read per decoded token on long outputs
+                        kv_cache_dtype=self.model_config.kv_cache_dtype
+                    )
+                self.llm = _vllm_engines[key]
+            
+            self.logger.info("vLLM engine ready")
+            
+        except Exception as e:
+            self.logger.error(f"Failed to load vLLM engine: {e}")
+            raise
+    
     def _load_api_client(self) -> None:
         """Load API client for this agent."""
         try:
             self.logger.info(f"Loading API client for: {self.model_config.model_id}")
             
-            # Infer provider from model_id
-            provider = self._infer_provider(self.model_config.model_id)
+            # Infer provider from model_id once; it can't change for this agent
+            self._provider = self._infer_provider(self.model_config.model_id)
+            self._rate_limiter = get_rate_limiter(self.model_config.name, self.model_config.requests_per_minute)
+            
+            # api_base points the SDK at another endpoint, e.g. a shared vLLM/SGLang server
+            client_kwargs = {}
+            if self.model_config.api_base:
+                client_kwargs["base_url"] = self.model_config.api_base
+            if self.model_config.api_key_env and os.environ.get(self.model_config.api_key_env):
+                client_kwargs["api_key"] = os.environ[self.model_config.api_key_env]
             
-            if provider == "openai":
+            if self._provider == "openai":
                 import openai
-                self.api_client = openai.OpenAI()
-            elif provider == "anthropic":
+                self.api_client = openai.OpenAI(**client_kwargs)
+                self._async_client_class = openai.AsyncOpenAI
+            elif self._provider == "anthropic":
                 import anthropic
-                self.api_client = anthropic.Anthropic()
+                self.api_client = anthropic.Anthropic(**client_kwargs)
+                self._async_client_class = anthropic.AsyncAnthropic
             else:
-                raise ValueError(f"Unsupported API provider: {provider}")
+                raise ValueError(f"Unsupported API provider: {self._provider}")
+            self._client_kwargs = client_kwargs
             
             self.logger.info("API client loaded successfully")
             
@@ -488,79 +1118,467 @@ class SMEAgent(BaseAgent):
         """Generate response using either local model or API."""
         if self.model_config.type == "local":
             return self._generate_local_response(prompt)
+        elif self.model_config.type == "vllm":
+            return self._generate_vllm_response([prompt])[0]
         elif self.model_config.type == "api":
             return self._generate_api_response(prompt)
         else:
             raise ValueError(f"Unsupported model type: {self.model_config.type}")
     
-    def _generate_local_response(self, prompt: str) -> str:
-        """Generate response using the local model."""
+    def _generate_response_streaming(self, prompt: str, on_file: Callable[[str, str], None]) -> str:
+        """Generate a response, streaming the files of local models as they are generated."""
+        if self.model_config.type == "local":
+            return self._generate_local_response(prompt, on_file)
+        return super()._generate_response_streaming(prompt, on_file)
+    
+    def _generate_batch(self, prompts: List[str]) -> List[str]:
+        """Generate responses, batching prompts through one call for local and vLLM models."""
+        if self.model_config.type == "vllm":
+            return self._generate_vllm_response(prompts)
+        if self.model_config.type == "local" and len(prompts) > 1:
+            return self._generate_local_response_batch(prompts)
+        group_size = self.model_config.max_tasks_per_request
+        # A structured output response is one JSON envelope, never the per-task answers a combined request needs
+        if self.model_config.type == "api" and group_size > 1 and len(prompts) > 1 and not self.model_config.structured_output:
+            responses = []
+            for start in range(0, len(prompts), group_size):
+                responses.extend(self._generate_marshaled(prompts[start:start + group_size]))
+            return responses
+        return super()._generate_batch(prompts)
+    
+    def _generate_marshaled(self, prompts: List[str]) -> List[str]:
+        """
+        Answer several independent prompts with a single API request.
+        
+        The shared system prompt is sent once, followed by the numbered task
+        prompts; the response is split back up on its per-task headers. This
+        saves a round trip and a prefill of the system prompt per task.
+        
+        Raises:
+            ValueError: If the response doesn't contain one answer per prompt
+        """
+        if len(prompts) == 1:
+            return [self._generate_with_retries(prompts[0])]
+        
+        system_prompt = self._get_system_prompt()
+        task_prompts = [
+            (prompt[len(system_prompt):].lstrip() if prompt.startswith(system_prompt) else prompt)
+            .replace(_END_OF_FILES_INSTRUCTION, "")
+            for prompt in prompts
+        ]
+        combined = f"{system_prompt}\n\n" + self.prompt_templates.render_template("batched_tasks", tasks=task_prompts)
+        response = self._generate_with_retries(combined)
+        
+        # Text between consecutive headers is the answer to the task numbered in the first one
+        headers = list(_RESPONSE_HEADER_RE.finditer(response))
+        answers = {}
+        for header, next_header in zip(headers, headers[1:] + [None]):
+            end = next_header.start() if next_header else len(response)
+            answers[int(header.group(1))] = response[header.end():end].strip()
+        
+        if sorted(answers) != list(range(1, len(prompts) + 1)):
+            raise ValueError(f"Expected {len(prompts)} answers in batched response, found {sorted(answers)}")
+        return [answers[i] for i in range(1, len(prompts) + 1)]
+    
+    def _generate_local_response(self, prompt: str, on_file: Optional[Callable[[str, str], None]] = None) -> str:
+        """Generate response using the local model, passing completed files to on_file if given."""
         if not self.model or not self.tokenizer:
             raise RuntimeError("Local model not loaded")
         
         try:
-            # Tokenize input
+            inputs = self._tokenize(prompt)
+            return self._generate_from_inputs(inputs, on_file)
+            
+        except Exception as e:
+            self.logger.error(f"Local generation failed: {e}")
+            raise
+    
+    def _tokenize(self, prompt: str) -> Dict[str, Any]:
+        """
+        Tokenize a prompt for the local model.
+        
+        The last result is kept so that retries of the same prompt from
+        _generate_with_retries skip re-tokenization.
+        """
+        if self._last_tokenized and self._last_tokenized[0] == prompt:
+            return self._last_tokenized[1]
+        
+        max_length = self._max_input_len
+        system_prompt = self._system_prompt
+        
+        if system_prompt and prompt.startswith(system_prompt):
+            # The system prompt is tokenized once; only the task-specific tail is tokenized per call.
+            # This also keeps the leading ids identical to the prefix KV cache's.
+            system_inputs = self._get_system_inputs()
+            system_length = system_inputs["input_ids"].shape[1]
+            tail = self.tokenizer(
+                prompt[len(system_prompt):],
+                return_tensors="pt",
+                add_special_tokens=False,
+                truncation=True,
+                max_length=max(max_length - system_length, 1)
+            )
+            tail = self._to_model_device(tail)
+            inputs = {k: torch.cat([system_inputs[k], v], dim=1) for k, v in tail.items()}
+        else:
             inputs = self.tokenizer(
                 prompt,
                 return_tensors="pt",
                 truncation=True,
-                max_length=self.tokenizer.model_max_length - self.model_config.max_tokens
+                max_length=max_length
             )
+            inputs = self._to_model_device(inputs)
+        
+        self._last_tokenized = (prompt, inputs)
+        return inputs
+    
+    def _get_system_inputs(self) -> Dict[str, Any]:
+        """Tokenize this agent's system prompt once, on the model's device."""
+        if self._system_inputs is None:
+            system_inputs = self.tokenizer(self._get_system_prompt(), return_tensors="pt")
+            self._system_inputs = self._to_model_device(system_inputs)
+        return self._system_inputs
+    
+    def _generate_from_inputs(self, inputs: Dict[str, Any], on_file: Optional[Callable[[str, str], None]] = None) -> str:
+        """
+        Run generation on already tokenized inputs and decode the new tokens.
+        
+        With on_file, generate runs on a worker thread and streams its text
+        back, so each file is passed on as soon as its closing fence is
+        generated rather than when the whole response is done.
+        """
+        generate_kwargs = {}
+        prompt_cache = self._get_prompt_cache(inputs)
+        if prompt_cache is not None:
+            generate_kwargs["past_key_values"] = prompt_cache
+        streamer = None
+        if on_file:
+            from transformers import TextIteratorStreamer
+            streamer = TextIteratorStreamer(self.tokenizer, skip_prompt=True, skip_special_tokens=True)
+            generate_kwargs["streamer"] = streamer
+        
+        def generate():
+            # inference_mode is thread-local, so it is entered on the generating thread
+            with torch.inference_mode():
+                try:
+                    return self.model.generate(
+                        **inputs,
+                        **generate_kwargs,
+                        max_new_tokens=self.model_config.max_tokens,
+                        temperature=self.model_config.temperature,
+                        do_sample=True,
+                        pad_token_id=self.tokenizer.pad_token_id,
+                        eos_token_id=self.tokenizer.eos_token_id,
+                        tokenizer=self.tokenizer,
+                        **self._stop_kwargs("stop_strings")
+                    )
+                except Exception:
+                    # Unblock the consumer of a stream that generate will never finish
+                    if streamer:
+                        streamer.end()
+                    raise
+        
+        if streamer:
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                generation = executor.submit(generate)
+                for filename, content in self._iter_completed_files(streamer):
+                    on_file(filename, content)
+                outputs = generation.result()
+        else:
+            outputs = generate()
+        
+        # Decode response (skip the input tokens)
+        input_length = inputs["input_ids"].shape[1]
+        response_tokens = outputs[0][input_length:]
+        response = self.tokenizer.decode(response_tokens, skip_special_tokens=True)
+        
+        return self._strip_end_marker(response)
+    
+    def _get_prompt_cache(self, inputs: Dict[str, Any]) -> Optional[Any]:
+        """
+        Get a KV cache covering all but the last token of the prompt.
+        
+        The prompt is prefilled once (on top of the system prompt cache when
+        it applies) and kept until a different prompt arrives. Retries from
+        _generate_with_retries get the same inputs object back from
+        _tokenize, so they reuse the prefill instead of recomputing it.
+        """
+        # A compiled model generates into its own static cache, which can't be seeded with these
+        if getattr(self.model.generation_config, "cache_implementation", None) == "static":
+            return None
+        
+        if self._prompt_cache and self._prompt_cache[0] is inputs:
+            return copy.deepcopy(self._prompt_cache[1])
+        
+        input_ids = inputs["input_ids"]
+        past_key_values = self._get_prefix_cache(input_ids)
+        try:
+            cached_length = past_key_values.get_seq_length() if past_key_values is not None else 0
+            # generate needs at least one uncached token to start from
+            if input_ids.shape[0] == 1 and input_ids.shape[1] - 1 > cached_length:
+                with torch.no_grad():
+                    past_key_values = self.model(
+                        input_ids=input_ids[:, cached_length:-1],
+                        attention_mask=inputs["attention_mask"][:, :-1],
+                        past_key_values=past_key_values,
+                        use_cache=True
+                    ).past_key_values
+                self._prompt_cache = (inputs, past_key_values)
+                return copy.deepcopy(past_key_values)
+        except Exception as e:
+            # A failed forward may have partially extended the cache, so don't hand it to generate
+            self.logger.debug(f"Prompt prefill cache unavailable: {e}")
+            return None
+        
+        return past_key_values
+    
+    def _get_prefix_cache(self, input_ids) -> Optional[Any]:
+        """
+        Get a KV cache covering the system prompt when input_ids starts with it.
+        
+        Every task prompt of an agent begins with the same system prompt, so
+        its keys/values are computed once and generate only prefills the
+        task-specific tail. A copy is returned because generate extends the
+        cache in place.
+        """
+        if self._prefix_cache is False:
+            return None
+        
+        try:
+            if self._prefix_cache is None:
+                prefix = self._get_system_inputs()
+                with torch.no_grad():
+                    past_key_values = self.model(**prefix, use_cache=True).past_key_values
+                self._prefix_cache = (prefix["input_ids"], past_key_values)
             
-            # Move to same device as model
-            if hasattr(self.model, 'device'):
-                inputs = {k: v.to(self.model.device) for k, v in inputs.items()}
+            prefix_ids, past_key_values = self._prefix_cache
+            prefix_length = prefix_ids.shape[1]
+            # Prompts not built by _prepare_prompt may tokenize differently, so check the ids really match
+            if input_ids.shape[0] == 1 and input_ids.shape[1] > prefix_length and torch.equal(input_ids[0, :prefix_length], prefix_ids[0]):
+                return copy.deepcopy(past_key_values)
+        except Exception as e:
+            # Remember the failure so later tasks don't pay for another attempt
+            self.logger.debug(f"Prefix cache unavailable: {e}")
+            self._prefix_cache = False
+        
+        return None
+    
+    def _strip_end_marker(self, response: str) -> str:
+        """Drop the end-of-files marker, which local generate keeps in its output."""
+        marker_pos = response.rfind(_END_OF_FILES)
+        if marker_pos != -1:
+            response = response[:marker_pos]
+        return response.strip()
+    
+    def _generate_local_response_batch(self, prompts: List[str]) -> List[str]:
+        """Generate responses for several prompts with a single batched generate call."""
+        if not self.model or not self.tokenizer:
+            raise RuntimeError("Local model not loaded")
+        
+        if len(prompts) == 1:
+            return [self._generate_local_response(prompts[0])]
+        
+        try:
+            # Decoder-only models must be left padded so every row ends at the prompt boundary
+            self.tokenizer.padding_side = "left"
+            inputs = self.tokenizer(
+                prompts,
+                return_tensors="pt",
+                padding=True,
+                truncation=True,
+                max_length=self._max_input_len
+            )
+            inputs = self._to_model_device(inputs)
             
-            # Generate response
-            with torch.no_grad():
+            # Generate all responses in one pass
+            with torch.inference_mode():
                 outputs = self.model.generate(
                     **inputs,
                     max_new_tokens=self.model_config.max_tokens,
                     temperature=self.model_config.temperature,
                     do_sample=True,
                     pad_token_id=self.tokenizer.pad_token_id,
-                    eos_token_id=self.tokenizer.eos_token_id
+                    eos_token_id=self.tokenizer.eos_token_id,
+                    tokenizer=self.tokenizer,
+                    **self._stop_kwargs("stop_strings")
                 )
             
-            # Decode response (skip the input tokens)
+            # With left padding every row's generated tokens start at the padded width
             input_length = inputs["input_ids"].shape[1]
-            response_tokens = outputs[0][input_length:]
-            response = self.tokenizer.decode(response_tokens, skip_special_tokens=True)
+            return [
+                self._strip_end_marker(self.tokenizer.decode(row[input_length:], skip_special_tokens=True))
+                for row in outputs
+            ]
+            
+        except Exception as e:
+            self.logger.error(f"Batched local generation failed: {e}")
+            raise
+    
+    def _generate_vllm_response(self, prompts: List[str]) -> List[str]:
+        """Generate responses for one or more prompts with the shared vLLM engine."""
+        if not self.llm:
+            raise RuntimeError("vLLM engine not loaded")
+        
+        try:
+            from vllm import SamplingParams
+            
+            sampling_kwargs = {}
+            if self.model_config.structured_output:
+                # Guided decoding constrains every token to the schema, so the envelope always parses
+                from vllm.sampling_params import GuidedDecodingParams
+                sampling_kwargs["guided_decoding"] = GuidedDecodingParams(json=_RESPONSE_SCHEMA)
+            
+            sampling_params = SamplingParams(
+                max_tokens=self.model_config.max_tokens,
+                temperature=self.model_config.temperature,
+                **self._stop_kwargs("stop"),
+                **sampling_kwargs
+            )
             
-            return response.strip()
+            # LLM.generate is not thread-safe; concurrent agents queue here and vLLM batches each call
+            with _vllm_lock:
+                outputs = self.llm.generate(prompts, sampling_params, use_tqdm=False)
+            
+            return [output.outputs[0].text.strip() for output in outputs]
             
         except Exception as e:
-            self.logger.error(f"Local generation failed: {e}")
+            self.logger.error(f"vLLM generation failed: {e}")
             raise
     
+    def _build_api_messages(self, prompt: str) -> Dict[str, Any]:
+        """
+        Build the message arguments for an API request.
+        
+        A prompt from _prepare_prompt starts with the agent's system prompt,
+        which is identical for every task. Sending it as a separate system
+        block keeps that static prefix byte-identical across calls so the
+        provider's prompt cache can hit; Anthropic needs an explicit
+        cache_control breakpoint, OpenAI caches matching prefixes itself.
+        """
+        system_prompt = self._system_prompt
+        if not system_prompt or not prompt.startswith(system_prompt):
+            return {"messages": [{"role": "user", "content": prompt}]}
+        
+        user_prompt = prompt[len(system_prompt):].lstrip()
+        if self._provider == "anthropic":
+            return {
+                "system": [{"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}],
+                "messages": [{"role": "user", "content": user_prompt}]
+            }
+        return {
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ]
+        }
+    
+    def _stop_kwargs(self, name: str) -> Dict[str, Any]:
+        """
+        Stop sequence argument of a generation call, passed as name.
+        
+        Structured output has no END_OF_FILES line to stop at; a model writing
+        the marker anyway would put it inside a JSON string, where stopping
+        would cut the envelope off.
+        """
+        if self.model_config.structured_output:
+            return {}
+        return {name: [_END_OF_FILES]}
+    
+    def _openai_format_kwargs(self) -> Dict[str, Any]:
+        """Response format arguments for OpenAI-compatible APIs; structured output is enforced with a JSON schema."""
+        if not self.model_config.structured_output:
+            return {}
+        return {
+            "response_format": {
+                "type": "json_schema",
+                "json_schema": {"name": "agent_output", "schema": _RESPONSE_SCHEMA, "strict": True}
+            }
+        }
+    
     def _generate_api_response(self, prompt: str) -> str:
         """Generate response using API client."""
         if not self.api_client:
             raise RuntimeError("API client not loaded")
+        if self._rate_limiter:
+            self._rate_limiter.acquire()
         
         try:
-            provider = self._infer_provider(self.model_config.model_id)
-            
-            if provider == "openai":
+            if self._provider == "openai":
                 response = self.api_client.chat.completions.create(
                     model=self.model_config.model_id,
-                    messages=[{"role": "user", "content": prompt}],
                     max_tokens=self.model_config.max_tokens,
-                    temperature=self.model_config.temperature
+                    temperature=self.model_config.temperature,
+                    **self._stop_kwargs("stop"),
+                    **self._openai_format_kwargs(),
+                    **self._build_api_messages(prompt)
                 )
                 return response.choices[0].message.content.strip()
             
-            elif provider == "anthropic":
+            elif self._provider == "anthropic":
                 response = self.api_client.messages.create(
                     model=self.model_config.model_id,
                     max_tokens=self.model_config.max_tokens,
                     temperature=self.model_config.temperature,
-                    messages=[{"role": "user", "content": prompt}]
+                    **self._stop_kwargs("stop_sequences"),
+                    **self._build_api_messages(prompt)
+                )
+                return response.content[0].text.strip()
+            
+            else:
+                raise ValueError(f"Unsupported API provider: {self._provider}")
+                
+        except Exception as e:
+            self.logger.error(f"API generation failed: {e}")
+            raise
+    
+    async def _agenerate_response(self, prompt: str, expected_tokens: Optional[int] = None) -> str:
+        """Generate response, using the async API client or the shared local batching server."""
+        if self.model_config.type == "api":
+            return await self._agenerate_api_response(prompt)
+        if self.model_config.type == "local" and self._inference_server:
+            return await self._inference_server.submit(prompt, self._generate_local_response_batch, expected_tokens)
+        return await super()._agenerate_response(prompt, expected_tokens)
+    
+    def _get_async_api_client(self):
+        """Get this agent's async API client for the running event loop, creating it on the loop's first use."""
+        loop = asyncio.get_running_loop()
+        if self._async_api_client_loop is not loop:
+            self.async_api_client = self._async_client_class(http_client=_get_shared_http_client(), **self._client_kwargs)
+            self._async_api_client_loop = loop
+        return self.async_api_client
+    
+    async def _agenerate_api_response(self, prompt: str) -> str:
+        """Generate response using the async API client."""
+        if not self._async_client_class:
+            raise RuntimeError("API client not loaded")
+        async_api_client = self._get_async_api_client()
+        if self._rate_limiter:
+            await self._rate_limiter.aacquire()
+        
+        try:
+            if self._provider == "openai":
+                response = await async_api_client.chat.completions.create(
+                    model=self.model_config.model_id,
+                    max_tokens=self.model_config.max_tokens,
+                    temperature=self.model_config.temperature,
+                    **self._stop_kwargs("stop"),
+                    **self._openai_format_kwargs(),
+                    **self._build_api_messages(prompt)
+                )
+                return response.choices[0].message.content.strip()
+            
+            elif self._provider == "anthropic":
+                response = await async_api_client.messages.create(
+                    model=self.model_config.model_id,
+                    max_tokens=self.model_config.max_tokens,
+                    temperature=self.model_config.temperature,
+                    **self._stop_kwargs("stop_sequences"),
+                    **self._build_api_messages(prompt)
                 )
                 return response.content[0].text.strip()
             
             else:
-                raise ValueError(f"Unsupported API provider: {provider}")
+                raise ValueError(f"Unsupported API provider: {self._provider}")
                 
         except Exception as e:
             self.logger.error(f"API generation failed: {e}")
@@ -568,7 +1586,32 @@ class SMEAgent(BaseAgent):
     
     def __del__(self):
         """Cleanup model resources."""
-        if hasattr(self, 'model') and self.model is not None:
-            del self.model
-        if hasattr(self, 'tokenizer') and self.tokenizer is not None:
-            del self.tokenizer
\ No newline at end of file
+        released = False
+        if getattr(self, 'model', None) is not None and self.model_config.type == "local":
+            # Drop the registry's reference once the last agent sharing the model goes away
+            key = self._local_model_key()
+            with _local_models_lock:
+                shared = _local_models.get(key)
+                if shared and shared["model"] is self.model:
+                    shared["refs"] -= 1
+                    if shared["refs"] <= 0:
+                        del _local_models[key]
+                        released = True
+        
+        # Tensors cached for this agent's prompts live on the model's device too
+        self._last_tokenized = None
+        self._prefix_cache = None
+        self._prompt_cache = None
+        self.model = None
+        self.tokenizer = None
+        
+        if released:
+            try:
+                # Collect the model now and hand its VRAM back rather than leaving it fragmented in the allocator
+                gc.collect()
+                if torch is not None and torch.cuda.is_available():
+                    torch.cuda.empty_cache()
+                    torch.cuda.ipc_collect()
+            except Exception:
+                # The interpreter may be shutting down; nothing useful to do
+                pass
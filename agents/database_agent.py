@@ -2,9 +2,16 @@
 Database specialized agent for the LLM Swarm system.
 """
 
+import re
+
 from .base_agent import SMEAgent
 from utils.dependency_graph import AgentType
 
+# Content markers used to guess a missing extension, each matched in a single pass
+_SQL_RE = re.compile(r'CREATE TABLE|SELECT |INSERT |UPDATE |DELETE ', re.IGNORECASE)
+_PY_RE = re.compile(r'class |def |from sqlalchemy|from django')
+_JS_RE = re.compile(r'mongoose|Schema')
+
 
 class DatabaseAgent(SMEAgent):
     """
@@ -12,6 +19,9 @@ class DatabaseAgent(SMEAgent):
     Handles schema design, models, and database setup.
     """
     
+    # Schemas and models are short, so they batch apart from long generations
+    expected_output_tokens = 512
+    
     def __init__(self, config, model_config):
         """Initialize the database agent."""
         super().__init__(
@@ -26,24 +36,16 @@ class DatabaseAgent(SMEAgent):
         # Default to SQL for database schemas
         return "sql"
     
-    def _parse_response(self, response: str, task):
-        """Enhanced parsing for database-specific files."""
-        output = super()._parse_response(response, task)
-        
-        # Post-process database files
-        processed_files = {}
-        for filename, content in output.files.items():
-            # Ensure proper file extensions for database files
-            if not any(filename.endswith(ext) for ext in ['.sql', '.py', '.js', '.ts', '.json']):
-                # Guess extension based on content
-                if any(sql_keyword in content.upper() for sql_keyword in ['CREATE TABLE', 'SELECT ', 'INSERT ', 'UPDATE ', 'DELETE ']):
-                    filename = filename.rsplit('.', 1)[0] + '.sql'
-                elif any(py_keyword in content for py_keyword in ['class ', 'def ', 'from sqlalchemy', 'from django']):
-                    filename = filename.rsplit('.', 1)[0] + '.py'
-                elif 'mongoose' in content or 'Schema' in content:
-                    filename = filename.rsplit('.', 1)[0] + '.js'
-            
-            processed_files[filename] = content
+    def _classify_filename(self, filename: str, content: str) -> str:
+        """Ensure proper file extensions for database files, guessing from content."""
+        if any(filename.endswith(ext) for ext in ['.sql', '.py', '.js', '.ts', '.json']):
+            return filename
         
-        output.files = processed_files
-        return output
\ No newline at end of file
+        # Guess extension based on content
+        if _SQL_RE.search(content):
+            return filename.rsplit('.', 1)[0] + '.sql'
+        elif _PY_RE.search(content):
+            return filename.rsplit('.', 1)[0] + '.py'
+        elif _JS_RE.search(content):
+            return filename.rsplit('.', 1)[0] + '.js'
+        return filename
\ No newline at end of file
@@ -2,9 +2,16 @@
 Frontend specialized agent for the LLM Swarm system.
 """
 
+import re
+
 from .base_agent import SMEAgent
 from utils.dependency_graph import AgentType
 
+# Content markers used to guess a missing extension, each matched in a single pass
+_REACT_RE = re.compile(r'import React|export default')
+_HTML_RE = re.compile(r'<html|<!DOCTYPE')
+_CSS_RE = re.compile(r'@media|display:|margin:|padding:')
+
 
 class FrontendAgent(SMEAgent):
     """
@@ -26,24 +33,16 @@ class FrontendAgent(SMEAgent):
         # Default to JSX for React components
         return "jsx"
     
-    def _parse_response(self, response: str, task):
-        """Enhanced parsing for frontend-specific files."""
-        output = super()._parse_response(response, task)
-        
-        # Post-process frontend files
-        processed_files = {}
-        for filename, content in output.files.items():
-            # Ensure proper file extensions for frontend files
-            if not any(filename.endswith(ext) for ext in ['.js', '.jsx', '.ts', '.tsx', '.html', '.css', '.scss']):
-                # Guess extension based on content
-                if 'import React' in content or 'export default' in content:
-                    filename = filename.rsplit('.', 1)[0] + '.jsx'
-                elif '<html' in content or '<!DOCTYPE' in content:
-                    filename = filename.rsplit('.', 1)[0] + '.html'
-                elif any(css_keyword in content for css_keyword in ['@media', 'display:', 'margin:', 'padding:']):
-                    filename = filename.rsplit('.', 1)[0] + '.css'
-            
-            processed_files[filename] = content
+    def _classify_filename(self, filename: str, content: str) -> str:
+        """Ensure proper file extensions for frontend files, guessing from content."""
+        if any(filename.endswith(ext) for ext in ['.js', '.jsx', '.ts', '.tsx', '.html', '.css', '.scss']):
+            return filename
         
-        output.files = processed_files
-        return output
\ No newline at end of file
+        # Guess extension based on content
+        if _REACT_RE.search(content):
+            return filename.rsplit('.', 1)[0] + '.jsx'
+        elif _HTML_RE.search(content):
+            return filename.rsplit('.', 1)[0] + '.html'
+        elif _CSS_RE.search(content):
+            return filename.rsplit('.', 1)[0] + '.css'
+        return filename
\ No newline at end of file
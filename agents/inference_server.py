@@ -0,0 +1,131 @@
+"""
+In-process request batching for local models in the LLM Swarm system.
+"""
+
+import asyncio
+import itertools
+import logging
+from collections import deque
+from typing import Callable, Deque, List, Optional, Tuple
+
+# Upper bounds (in tokens) of the expected-output-length bins; longer or unknown requests share the last bin
+_TOKEN_BINS = (128, 512, 2048)
+
+
+def _bin_index(expected_tokens: Optional[int]) -> int:
+    """Map an expected output length to the index of its bin."""
+    if expected_tokens is None:
+        return len(_TOKEN_BINS)
+    for index, limit in enumerate(_TOKEN_BINS):
+        if expected_tokens <= limit:
+            return index
+    return len(_TOKEN_BINS)
+
+
+class InferenceServer:
+    """
+    Collects concurrent generation requests for one local model into batches.
+    
+    Agents that share a loaded model submit their prompts here instead of
+    calling generate one request at a time. A worker drains the queue,
+    waiting up to ``window_ms`` for more requests to arrive, and runs up to
+    ``max_batch_size`` prompts through a single padded generate call.
+    
+    Requests are binned by expected output length and each batch is taken
+    from a single bin, so a short generation never waits for a long one to
+    finish decoding.
+    """
+    
+    def __init__(self, max_batch_size: int = 8, window_ms: float = 20.0):
+        """
+        Initialize the inference server.
+        
+        Args:
+            max_batch_size: Maximum number of prompts per generate call
+            window_ms: How long to wait for a batch to fill up
+        """
+        self.max_batch_size = max_batch_size
+        self.window = window_ms / 1000
+        self.logger = logging.getLogger(__name__)
+        self._sequence = itertools.count()
+        
+        # Created on first submit, and again whenever a new event loop is running
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._bins: List[Deque[Tuple[int, str, Callable, asyncio.Future]]] = []
+    
+    async def submit(self, prompt: str, generate_batch: Callable[[List[str]], List[str]],
+                     expected_tokens: Optional[int] = None) -> str:
+        """
+        Queue a prompt and wait for its response.
+        
+        Args:
+            prompt: Input prompt
+            generate_batch: Blocking function generating responses for a list
+                of prompts; every request batched together runs through the
+                first request's function, since they share the same model
+            expected_tokens: Expected length of the response, used for binning
+        
+        Returns:
+            Generated response
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._bins = [deque() for _ in range(len(_TOKEN_BINS) + 1)]
+            self._worker = loop.create_task(self._run())
+        
+        future = loop.create_future()
+        await self._queue.put((_bin_index(expected_tokens), prompt, generate_batch, future))
+        return await future
+    
+    async def _run(self) -> None:
+        """Drain the queue batch by batch until the event loop shuts down."""
+        while True:
+            batch = await self._collect_batch()
+            prompts = [prompt for _, prompt, _, _ in batch]
+            generate_batch = batch[0][2]
+            
+            self.logger.debug(f"Generating batch of {len(prompts)} prompt(s)")
+            try:
+                # Generation blocks, so keep it off the event loop
+                responses = await asyncio.to_thread(generate_batch, prompts)
+            except Exception as e:
+                for _, _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for (_, _, _, future), response in zip(batch, responses):
+                    if not future.done():
+                        future.set_result(response)
+    
+    async def _collect_batch(self) -> List[Tuple[int, str, Callable, asyncio.Future]]:
+        """Gather requests into their bins, then take a batch from the bin with the oldest request."""
+        if not any(self._bins):
+            # Wait for one request, then give concurrent callers one window to join it
+            self._add(await self._queue.get())
+            deadline = self._loop.time() + self.window
+            
+            while not any(len(bin_) >= self.max_batch_size for bin_ in self._bins):
+                timeout = deadline - self._loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    self._add(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+        
+        # Pick up anything else that is already waiting
+        while not self._queue.empty():
+            self._add(self._queue.get_nowait())
+        
+        # Serving the oldest request first keeps a busy bin from starving the others
+        bin_ = min((bin_ for bin_ in self._bins if bin_), key=lambda queued: queued[0][0])
+        return [bin_.popleft() for _ in range(min(len(bin_), self.max_batch_size))]
+    
+    def _add(self, request: Tuple[int, str, Callable, asyncio.Future]) -> None:
+        """Place a queued request in its bin, tagged with its arrival order."""
+        bin_index, prompt, generate_batch, future = request
+        self._bins[bin_index].append((next(self._sequence), prompt, generate_batch, future))
@@ -3,17 +3,21 @@ Orchestrator agent for the LLM Swarm system.
 Central controller that manages task planning and agent coordination.
 """
 
+import asyncio
 import json
 import logging
 import time
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, AsyncIterator, Tuple
 from pathlib import Path
 
 from utils.config_loader import ConfigLoader
 from utils.dependency_graph import DependencyGraph, Task, TaskStatus, AgentType
 from utils.file_manager import FileManager
 from utils.prompt_templates import PromptTemplates
-from .base_agent import AgentOutput
+from utils.response_cache import ResponseCache
+from utils import llm_cache
+from utils.rate_limiter import get_rate_limiter
+from .base_agent import AgentOutput, _get_shared_http_client
 from .frontend_agent import FrontendAgent
 from .backend_agent import BackendAgent
 from .database_agent import DatabaseAgent
@@ -27,16 +31,93 @@ try:
 except ImportError:
     LEARNING_AVAILABLE = False
 
+# Agent names by the agent type of the tasks they handle
+_AGENT_NAMES_BY_TYPE = {
+    AgentType.FRONTEND: "frontend",
+    AgentType.BACKEND: "backend",
+    AgentType.DATABASE: "database",
+    AgentType.TESTING: "testing",
+    AgentType.DOCUMENTATION: "documentation"
+}
+
+# Task fields of the generic plan used when the planning response can't be parsed
+_FALLBACK_PLAN = (
+    {
+        "id": "setup",
+        "name": "Project Setup",
+        "description": "Create basic project structure and configuration",
+        "agent_type": AgentType.BACKEND,
+        "dependencies": (),
+        "priority": 10
+    },
+    {
+        "id": "database",
+        "name": "Database Schema",
+        "description": "Design and implement database schema",
+        "agent_type": AgentType.DATABASE,
+        "dependencies": ("setup",),
+        "priority": 9
+    },
+    {
+        "id": "backend",
+        "name": "Backend Implementation",
+        "description": "Implement server-side logic and APIs",
+        "agent_type": AgentType.BACKEND,
+        "dependencies": ("database",),
+        "priority": 8
+    },
+    {
+        "id": "frontend",
+        "name": "Frontend Implementation",
+        "description": "Implement user interface and client-side logic",
+        "agent_type": AgentType.FRONTEND,
+        "dependencies": ("backend",),
+        "priority": 7
+    },
+    {
+        "id": "testing",
+        "name": "Test Implementation",
+        "description": "Create comprehensive test suite",
+        "agent_type": AgentType.TESTING,
+        "dependencies": ("backend", "frontend"),
+        "priority": 6
+    },
+    {
+        "id": "documentation",
+        "name": "Documentation",
+        "description": "Create project documentation and README",
+        "agent_type": AgentType.DOCUMENTATION,
+        "dependencies": ("testing",),
+        "priority": 5
+    }
+)
+
 
 class APIAgent:
     """
     Agent that uses API-based models (OpenAI, Anthropic, etc.)
     """
     
-    def __init__(self, model_config):
+    def __init__(self, model_config, max_retries: int = 2):
+        """
+        Initialize the API agent.
+        
+        Args:
+            model_config: Configuration of the API model
+            max_retries: Retries of requests failing on rate limits, timeouts,
+                connection or server errors; the SDK backs off exponentially
+                with jitter and honors Retry-After
+        """
         self.model_config = model_config
+        self.max_retries = max_retries
         self.logger = logging.getLogger(__name__)
         self.client = None
+        self.async_client = None
+        # Async SDK client class and arguments; a client is created per event loop by _get_async_client
+        self._async_client_class = None
+        self._async_client_kwargs: Dict[str, Any] = {}
+        self._async_client_loop = None
+        self.rate_limiter = get_rate_limiter(model_config.name, model_config.requests_per_minute)
         self._initialize_client()
     
     def _initialize_client(self):
@@ -53,8 +134,15 @@ class APIAgent:
                 
                 self.client = openai.OpenAI(
                     api_key=api_key,
-                    base_url=self.model_config.api_base
+                    base_url=self.model_config.api_base,
+                    max_retries=self.max_retries
                 )
+                self._async_client_class = openai.AsyncOpenAI
+                self._async_client_kwargs = {
+                    "api_key": api_key,
+                    "base_url": self.model_config.api_base,
+                    "max_retries": self.max_retries
+                }
                 self.client_type = "openai"
                 
             elif "claude" in self.model_config.model_id.lower():
@@ -68,8 +156,15 @@ class APIAgent:
                 
                 self.client = anthropic.Anthropic(
                     api_key=api_key,
-                    base_url=self.model_config.api_base
+                    base_url=self.model_config.api_base,
+                    max_retries=self.max_retries
                 )
+                self._async_client_class = anthropic.AsyncAnthropic
+                self._async_client_kwargs = {
+                    "api_key": api_key,
+                    "base_url": self.model_config.api_base,
+                    "max_retries": self.max_retries
+                }
                 self.client_type = "anthropic"
                 
             else:
@@ -81,31 +176,268 @@ class APIAgent:
             self.logger.error(f"Failed to initialize API client: {e}")
             raise
     
-    def generate(self, prompt: str) -> str:
-        """Generate response using the API model."""
+    def _get_async_client(self):
+        """Get the async API client for the running event loop, creating it on the loop's first use."""
+        loop = asyncio.get_running_loop()
+        if self._async_client_loop is not loop:
+            self.async_client = self._async_client_class(http_client=_get_shared_http_client(), **self._async_client_kwargs)
+            self._async_client_loop = loop
+        return self.async_client
+    
+    def _build_messages(self, prompt: str, static_prefix: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Build the message arguments for an API request.
+        
+        When the prompt starts with a static prefix that is identical across
+        calls, it is sent as a separate system block so the provider's prompt
+        cache can reuse it; Anthropic needs an explicit cache_control
+        breakpoint, OpenAI caches matching prefixes itself.
+        """
+        if not static_prefix or not prompt.startswith(static_prefix):
+            return {"messages": [{"role": "user", "content": prompt}]}
+        
+        user_prompt = prompt[len(static_prefix):].lstrip()
+        if self.client_type == "anthropic":
+            return {
+                "system": [{"type": "text", "text": static_prefix, "cache_control": {"type": "ephemeral"}}],
+                "messages": [{"role": "user", "content": user_prompt}]
+            }
+        return {
+            "messages": [
+                {"role": "system", "content": static_prefix},
+                {"role": "user", "content": user_prompt}
+            ]
+        }
+    
+    def _cache_key(self, prompt: str) -> Optional[str]:
+        """
+        Key for the persistent response cache, or None if this model's responses shouldn't be reused.
+        
+        Responses are only reused for deterministic (or explicitly cached)
+        calls; the cache outlives the run, so the same plan is read back by
+        later runs and by a real run after a dry run.
+        """
+        if self.model_config.temperature != 0 and not self.model_config.cache_responses:
+            return None
+        return ResponseCache.make_key(
+            self.model_config.model_id,
+            self.model_config.temperature,
+            self.model_config.max_tokens,
+            prompt,
+            normalize=False
+        )
+    
+    def _cached_response(self, prompt: str) -> Tuple[Optional[str], Optional[str]]:
+        """Return the cache key of a prompt (None if uncacheable) and its cached response, if any."""
+        cache_key = self._cache_key(prompt)
+        return cache_key, llm_cache.get(cache_key) if cache_key else None
+    
+    def _request_kwargs(self, prompt: str, static_prefix: Optional[str] = None) -> Dict[str, Any]:
+        """Build the arguments of a request to the provider, for either its sync or async client."""
+        kwargs = {
+            "model": self.model_config.model_id,
+            "max_tokens": self.model_config.max_tokens,
+            "temperature": self.model_config.temperature,
+            **self._build_messages(prompt, static_prefix)
+        }
+        if self.client_type == "openai":
+            kwargs["timeout"] = self.model_config.timeout
+        elif self.client_type != "anthropic":
+            raise ValueError(f"Unsupported client type: {self.client_type}")
+        return kwargs
+    
+    def _send(self, client, prompt: str, static_prefix: Optional[str] = None):
+        """
+        Send a request with the given client.
+        
+        The sync and async SDK clients share their call paths; with the async
+        client the returned response has to be awaited.
+        """
+        kwargs = self._request_kwargs(prompt, static_prefix)
+        if self.client_type == "openai":
+            return client.chat.completions.create(**kwargs)
+        return client.messages.create(**kwargs)
+    
+    def _response_text(self, response, cache_key: Optional[str]) -> str:
+        """Read the text of a response, caching it when its prompt is cacheable."""
+        if self.client_type == "openai":
+            text = response.choices[0].message.content
+        else:
+            text = response.content[0].text
+        if cache_key:
+            llm_cache.put(cache_key, text)
+        return text
+    
+    def generate(self, prompt: str, static_prefix: Optional[str] = None) -> str:
+        """
+        Generate response using the API model.
+        
+        Args:
+            prompt: Input prompt
+            static_prefix: Leading part of the prompt that is the same on every
+                call, marked for provider-side prompt caching
+        """
+        cache_key, cached = self._cached_response(prompt)
+        if cached is not None:
+            return cached
+        
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+        
+        try:
+            return self._response_text(self._send(self.client, prompt, static_prefix), cache_key)
+        except Exception as e:
+            self.logger.error(f"API generation failed: {e}")
+            raise
+    
+    async def agenerate_stream(self, prompt: str, static_prefix: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Generate a response, yielding text as it arrives.
+        
+        Args:
+            prompt: Input prompt
+            static_prefix: Leading part of the prompt that is the same on every call
+            
+        Yields:
+            Text deltas, in order; a cached response is yielded whole
+        """
+        cache_key, cached = self._cached_response(prompt)
+        if cached is not None:
+            yield cached
+            return
+        
+        if self.rate_limiter:
+            await self.rate_limiter.aacquire()
+        
+        chunks = []
         try:
+            kwargs = self._request_kwargs(prompt, static_prefix)
             if self.client_type == "openai":
-                response = self.client.chat.completions.create(
-                    model=self.model_config.model_id,
-                    messages=[{"role": "user", "content": prompt}],
-                    max_tokens=self.model_config.max_tokens,
-                    temperature=self.model_config.temperature,
-                    timeout=self.model_config.timeout
-                )
-                return response.choices[0].message.content
-                
-            elif self.client_type == "anthropic":
-                response = self.client.messages.create(
-                    model=self.model_config.model_id,
-                    max_tokens=self.model_config.max_tokens,
-                    temperature=self.model_config.temperature,
-                    messages=[{"role": "user", "content": prompt}]
-                )
-                return response.content[0].text
+                stream = await self._get_async_client().chat.completions.create(stream=True, **kwargs)
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        chunks.append(chunk.choices[0].delta.content)
+                        yield chunks[-1]
+            
+            else:
+                async with self._get_async_client().messages.stream(**kwargs) as stream:
+                    async for text in stream.text_stream:
+                        chunks.append(text)
+                        yield text
+            
+            # Only a response streamed to its end is complete enough to reuse
+            if cache_key:
+                llm_cache.put(cache_key, "".join(chunks))
                 
         except Exception as e:
             self.logger.error(f"API generation failed: {e}")
             raise
+    
+    def generate_via_batch(self, prompts: List[str], poll_interval: float = 30.0) -> List[str]:
+        """
+        Generate responses through the provider's batch API.
+        
+        Batch requests cost about half as much as regular ones but may take
+        up to 24 hours, so this is meant for runs where latency doesn't matter.
+        
+        Args:
+            prompts: Input prompts
+            poll_interval: Seconds between batch status checks
+            
+        Returns:
+            Generated responses, in the same order as the prompts
+            
+        Raises:
+            RuntimeError: If the batch doesn't complete or a request in it fails
+        """
+        custom_ids = [f"request-{i}" for i in range(len(prompts))]
+        self.logger.info(f"Submitting batch of {len(prompts)} request(s) to the {self.client_type} batch API")
+        
+        if self.client_type == "openai":
+            lines = [
+                json.dumps({
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": {
+                        "model": self.model_config.model_id,
+                        "messages": [{"role": "user", "content": prompt}],
+                        "max_tokens": self.model_config.max_tokens,
+                        "temperature": self.model_config.temperature
+                    }
+                })
+                for custom_id, prompt in zip(custom_ids, prompts)
+            ]
+            input_file = self.client.files.create(
+                file=("batch.jsonl", "\n".join(lines).encode("utf-8")),
+                purpose="batch"
+            )
+            batch = self.client.batches.create(
+                input_file_id=input_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window="24h"
+            )
+            
+            while batch.status not in ("completed", "failed", "expired", "cancelled"):
+                time.sleep(poll_interval)
+                batch = self.client.batches.retrieve(batch.id)
+            if batch.status != "completed" or not batch.output_file_id:
+                raise RuntimeError(f"Batch {batch.id} ended with status: {batch.status}")
+            
+            results = {}
+            for line in self.client.files.content(batch.output_file_id).text.splitlines():
+                if line.strip():
+                    result = json.loads(line)
+                    body = (result.get("response") or {}).get("body") or {}
+                    if body.get("choices"):
+                        results[result["custom_id"]] = body["choices"][0]["message"]["content"]
+        
+        elif self.client_type == "anthropic":
+            batch = self.client.messages.batches.create(requests=[
+                {
+                    "custom_id": custom_id,
+                    "params": {
+                        "model": self.model_config.model_id,
+                        "max_tokens": self.model_config.max_tokens,
+                        "temperature": self.model_config.temperature,
+                        "messages": [{"role": "user", "content": prompt}]
+                    }
+                }
+                for custom_id, prompt in zip(custom_ids, prompts)
+            ])
+            
+            while batch.processing_status != "ended":
+                time.sleep(poll_interval)
+                batch = self.client.messages.batches.retrieve(batch.id)
+            
+            results = {
+                entry.custom_id: entry.result.message.content[0].text
+                for entry in self.client.messages.batches.results(batch.id)
+                if entry.result.type == "succeeded"
+            }
+        
+        else:
+            raise ValueError(f"Unsupported client type: {self.client_type}")
+        
+        missing = [custom_id for custom_id in custom_ids if custom_id not in results]
+        if missing:
+            raise RuntimeError(f"Batch {batch.id} has no result for: {', '.join(missing)}")
+        return [results[custom_id] for custom_id in custom_ids]
+    
+    async def agenerate(self, prompt: str, static_prefix: Optional[str] = None) -> str:
+        """Generate response using the API model without blocking the event loop."""
+        cache_key, cached = self._cached_response(prompt)
+        if cached is not None:
+            return cached
+        
+        if self.rate_limiter:
+            await self.rate_limiter.aacquire()
+        
+        try:
+            return self._response_text(await self._send(self._get_async_client(), prompt, static_prefix), cache_key)
+        except Exception as e:
+            self.logger.error(f"API generation failed: {e}")
+            raise
 
 
 class Orchestrator:
@@ -137,9 +469,9 @@ class Orchestrator:
         self.prompt_templates = PromptTemplates()
         
         # Initialize API agent for orchestrator
-        orchestrator_config = self.config_loader.get_orchestrator_config()
-        orchestrator_model_config = self.config_loader.get_model_config(orchestrator_config.model)
-        self.api_agent = APIAgent(orchestrator_model_config)
+        self.orchestrator_config = self.config_loader.get_orchestrator_config()
+        orchestrator_model_config = self.config_loader.get_model_config(self.orchestrator_config.model)
+        self.api_agent = APIAgent(orchestrator_model_config, max_retries=self.orchestrator_config.max_retries)
         
         # Initialize SME agents
         self.agents = self._initialize_agents()
@@ -147,6 +479,8 @@ class Orchestrator:
         # Track execution state
         self.project_context = {}
         self.execution_log = []
+        # Dependency context entries of completed tasks, by task id
+        self._completed_outputs: Dict[str, Dict[str, str]] = {}
         
         # Initialize learning system
         self.learning_manager = None
@@ -191,13 +525,15 @@ class Orchestrator:
         
         return agents
     
-    def run(self, project_spec: str, dry_run: bool = False) -> bool:
+    def run(self, project_spec: str, dry_run: bool = False, use_batch_api: bool = False) -> bool:
         """
         Run the complete project generation process.
         
         Args:
             project_spec: Project specification
             dry_run: If True, only plan tasks without executing
+            use_batch_api: Plan through the provider's batch API, which is
+                cheaper but can take hours
             
         Returns:
             True if successful, False otherwise
@@ -212,9 +548,17 @@ class Orchestrator:
                 "dry_run": dry_run
             }
             
+            # Plan and execute together: tasks start while the rest of the plan is still generating
+            if self.orchestrator_config.parallel_execution and not dry_run and not use_batch_api:
+                self.logger.info("📋 Planning and executing project tasks...")
+                success = asyncio.run(self.aexecute_plan(self._astream_plan(project_spec)))
+                if success:
+                    self._finalize_project()
+                return success
+            
             # Step 1: Plan tasks
             self.logger.info("📋 Planning project tasks...")
-            tasks = self.plan_tasks(project_spec)
+            tasks = self.plan_tasks(project_spec, use_batch_api=use_batch_api)
             
             if not tasks:
                 self.logger.error("No tasks generated from project specification")
@@ -239,7 +583,12 @@ class Orchestrator:
                 self._show_execution_plan()
                 return True
             else:
-                success = self.execute_plan()
+                if self.orchestrator_config.parallel_execution:
+                    success = asyncio.run(self.aexecute_plan())
+                elif self.orchestrator_config.batch_tasks:
+                    success = self.execute_plan_batched()
+                else:
+                    success = self.execute_plan()
                 
                 if success:
                     self._finalize_project()
@@ -250,12 +599,13 @@ class Orchestrator:
             self.logger.error(f"Project generation failed: {e}")
             return False
     
-    def plan_tasks(self, project_spec: str) -> List[Task]:
+    def plan_tasks(self, project_spec: str, use_batch_api: bool = False) -> List[Task]:
         """
         Plan tasks for the project using the orchestrator LLM.
         
         Args:
             project_spec: Project specification
+            use_batch_api: Submit the planning request through the batch API
             
         Returns:
             List of planned tasks
@@ -269,7 +619,10 @@ class Orchestrator:
             
             # Generate plan using API model
             self.logger.debug("Sending planning request to orchestrator model...")
-            response = self.api_agent.generate(prompt)
+            if use_batch_api:
+                response = self.api_agent.generate_via_batch([prompt])[0]
+            else:
+                response = self.api_agent.generate(prompt, self._planning_prefix(prompt, project_spec))
             
             # Parse response into tasks
             tasks = self._parse_task_plan(response)
@@ -281,103 +634,163 @@ class Orchestrator:
             self.logger.error(f"Task planning failed: {e}")
             return []
     
+    async def aplan_tasks(self, project_spec: str) -> List[Task]:
+        """
+        Plan tasks for the project without blocking the event loop.
+        
+        Args:
+            project_spec: Project specification
+            
+        Returns:
+            List of planned tasks
+        """
+        try:
+            prompt = self.prompt_templates.render_template(
+                "orchestrator_planning",
+                project_spec=project_spec
+            )
+            
+            self.logger.debug("Sending planning request to orchestrator model...")
+            response = await self.api_agent.agenerate(prompt, self._planning_prefix(prompt, project_spec))
+            
+            tasks = self._parse_task_plan(response)
+            
+            self.logger.info(f"Planned {len(tasks)} tasks")
+            return tasks
+            
+        except Exception as e:
+            self.logger.error(f"Task planning failed: {e}")
+            return []
+    
+    def _planning_prefix(self, prompt: str, project_spec: str) -> Optional[str]:
+        """Return the static instructions of a planning prompt, which ends with the project specification."""
+        if project_spec and prompt.endswith(project_spec):
+            return prompt[:-len(project_spec)]
+        return None
+    
     def _parse_task_plan(self, response: str) -> List[Task]:
         """Parse the orchestrator's response into Task objects."""
         tasks = []
         
+        # Look for JSON in the response
+        json_start = response.find('[')
+        json_end = response.rfind(']') + 1
+        
+        if json_start < 0:
+            self.logger.warning("No valid JSON found in planning response")
+            # Fallback: create a simple default plan
+            return self._create_fallback_plan()
+        
         try:
-            # Look for JSON in the response
-            json_start = response.find('[')
-            json_end = response.rfind(']') + 1
+            task_data = json.loads(response[json_start:json_end])
+        except json.JSONDecodeError as e:
+            # Salvage the complete task objects of a truncated array, or of one followed by bracketed prose
+            task_data, _ = self._decode_plan_items(json.JSONDecoder(), response, None)
+            if not task_data:
+                self.logger.warning(f"JSON parsing failed: {e}")
+                return self._create_fallback_plan()
+            self.logger.warning(f"JSON parsing failed ({e}), recovered {len(task_data)} tasks")
+        
+        for i, task_info in enumerate(task_data):
+            task = self._task_from_plan_item(i, task_info)
+            if task:
+                tasks.append(task)
+        
+        return tasks
+    
+    def _task_from_plan_item(self, index: int, task_info: Dict[str, Any]) -> Optional[Task]:
+        """Build a Task from one element of the planning response's JSON array, or None if it is invalid."""
+        try:
+            # Map agent type string to enum
+            agent_type_str = task_info.get("agent_type", "backend")
+            agent_type = AgentType(agent_type_str)
             
-            if json_start >= 0 and json_end > json_start:
-                json_str = response[json_start:json_end]
-                task_data = json.loads(json_str)
-                
-                for i, task_info in enumerate(task_data):
-                    try:
-                        # Map agent type string to enum
-                        agent_type_str = task_info.get("agent_type", "backend")
-                        agent_type = AgentType(agent_type_str)
-                        
-                        task = Task(
-                            id=task_info.get("id", f"task_{i+1:03d}"),
-                            name=task_info.get("name", f"Task {i+1}"),
-                            description=task_info.get("description", ""),
-                            agent_type=agent_type,
-                            dependencies=task_info.get("dependencies", []),
-                            priority=task_info.get("priority", 5)
-                        )
-                        
-                        tasks.append(task)
-                        
-                    except Exception as e:
-                        self.logger.warning(f"Failed to parse task {i}: {e}")
-                        continue
+            return Task(
+                id=task_info.get("id", f"task_{index+1:03d}"),
+                name=task_info.get("name", f"Task {index+1}"),
+                description=task_info.get("description", ""),
+                agent_type=agent_type,
+                dependencies=task_info.get("dependencies", []),
+                priority=task_info.get("priority", 5)
+            )
             
-            else:
-                self.logger.warning("No valid JSON found in planning response")
-                # Fallback: create a simple default plan
-                tasks = self._create_fallback_plan()
+        except Exception as e:
+            self.logger.warning(f"Failed to parse task {index}: {e}")
+            return None
+    
+    async def _astream_plan(self, project_spec: str) -> AsyncIterator[Task]:
+        """
+        Plan tasks for the project, yielding each task as soon as its JSON object is complete.
+        
+        Falls back to parsing the whole response (and to the default plan)
+        when no task could be read from the stream. A failed request is
+        re-raised, since the tasks yielded so far are only part of the plan.
+        """
+        prompt = self.prompt_templates.render_template(
+            "orchestrator_planning",
+            project_spec=project_spec
+        )
+        
+        decoder = json.JSONDecoder()
+        response = ""
+        pos = None
+        count = 0
+        try:
+            async for chunk in self.api_agent.agenerate_stream(prompt, self._planning_prefix(prompt, project_spec)):
+                response += chunk
+                task_data, pos = self._decode_plan_items(decoder, response, pos)
+                for task_info in task_data:
+                    task = self._task_from_plan_item(count, task_info)
+                    count += 1
+                    if task:
+                        yield task
+        except Exception as e:
+            self.logger.error(f"Task planning failed: {e}")
+            raise
+        
+        if not count:
+            for task in self._parse_task_plan(response):
+                yield task
+    
+    def _decode_plan_items(self, decoder: json.JSONDecoder, response: str, pos: Optional[int]) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """
+        Decode the task objects completed so far in a partially received JSON array.
+        
+        Args:
+            decoder: JSON decoder
+            response: Response text received so far
+            pos: Where decoding stopped last time, or None before the array starts
             
-        except json.JSONDecodeError as e:
-            self.logger.warning(f"JSON parsing failed: {e}")
-            tasks = self._create_fallback_plan()
+        Returns:
+            Newly completed objects and the position to resume from
+        """
+        if pos is None:
+            start = response.find('[')
+            if start < 0:
+                return [], None
+            pos = start + 1
         
-        return tasks
+        items = []
+        while True:
+            # Skip separators between array elements
+            while pos < len(response) and response[pos] in ' \t\r\n,':
+                pos += 1
+            if pos >= len(response) or response[pos] != '{':
+                # End of the array, or the next element hasn't started yet
+                break
+            try:
+                item, pos = decoder.raw_decode(response, pos)
+            except json.JSONDecodeError:
+                # The object is still incomplete; try again with more text
+                break
+            if isinstance(item, dict):
+                items.append(item)
+        return items, pos
     
     def _create_fallback_plan(self) -> List[Task]:
         """Create a simple fallback plan if LLM planning fails."""
-        return [
-            Task(
-                id="setup",
-                name="Project Setup",
-                description="Create basic project structure and configuration",
-                agent_type=AgentType.BACKEND,
-                dependencies=[],
-                priority=10
-            ),
-            Task(
-                id="database",
-                name="Database Schema",
-                description="Design and implement database schema",
-                agent_type=AgentType.DATABASE,
-                dependencies=["setup"],
-                priority=9
-            ),
-            Task(
-                id="backend",
-                name="Backend Implementation",
-                description="Implement server-side logic and APIs",
-                agent_type=AgentType.BACKEND,
-                dependencies=["database"],
-                priority=8
-            ),
-            Task(
-                id="frontend",
-                name="Frontend Implementation", 
-                description="Implement user interface and client-side logic",
-                agent_type=AgentType.FRONTEND,
-                dependencies=["backend"],
-                priority=7
-            ),
-            Task(
-                id="testing",
-                name="Test Implementation",
-                description="Create comprehensive test suite",
-                agent_type=AgentType.TESTING,
-                dependencies=["backend", "frontend"],
-                priority=6
-            ),
-            Task(
-                id="documentation",
-                name="Documentation",
-                description="Create project documentation and README",
-                agent_type=AgentType.DOCUMENTATION,
-                dependencies=["testing"],
-                priority=5
-            )
-        ]
+        # Tasks are mutated during execution, so build fresh ones (and dependency lists) every time
+        return [Task(**dict(spec, dependencies=list(spec["dependencies"]))) for spec in _FALLBACK_PLAN]
     
     def execute_plan(self) -> bool:
         """Execute the planned tasks."""
@@ -398,114 +811,285 @@ class Orchestrator:
                     continue
                 
                 # Prepare task context with completed dependencies
-                task.context["completed_dependencies"] = [
-                    {
-                        "name": dep_task.name,
-                        "output_summary": dep_task.output.summary if dep_task.output else ""
-                    }
-                    for dep_id in task.dependencies
-                    for dep_task in [self.dependency_graph.get_task(dep_id)]
-                    if dep_task and dep_task.status == TaskStatus.COMPLETED
-                ]
+                self._prepare_task_context(task)
                 
-                # Execute task
+                # Execute task, writing each file as soon as the model has finished it
                 task.status = TaskStatus.IN_PROGRESS
                 start_time = time.time()
-                output = agent.run_task(task, self.project_context)
+                streamed_files: Dict[str, str] = {}
+                
+                def write_streamed_file(filename: str, content: str):
+                    self.file_manager.write_file(filename, content)
+                    streamed_files[filename] = content
+                
+                output = agent.run_task(task, self.project_context, on_file=write_streamed_file)
                 execution_time = time.time() - start_time
                 
                 if output.success:
-                    # Save generated files
-                    files_created = []
-                    if output.files:
-                        written_files = self.file_manager.write_files(output.files)
-                        files_created = [str(f) for f in written_files]
-                        self.logger.info(f"Generated {len(written_files)} files")
-                    
-                    task.mark_completed(output)
                     completed_tasks.add(task.id)
+                self._handle_task_output(task, agent, output, execution_time, streamed_files)
+            
+            # Check overall success
+            status_summary = self.dependency_graph.get_status_summary()
+            success = status_summary[TaskStatus.FAILED] == 0
+            
+            self.logger.info(f"Execution complete: {status_summary[TaskStatus.COMPLETED]} completed, {status_summary[TaskStatus.FAILED]} failed")
+            
+            return success
+            
+        except Exception as e:
+            self.logger.error(f"Plan execution failed: {e}")
+            return False
+    
+    def execute_plan_batched(self) -> bool:
+        """
+        Execute the planned tasks, batching ready tasks that share an agent.
+        
+        Each round collects every pending task whose dependencies are complete,
+        groups them by agent and hands each group to ``agent.run_tasks`` so that
+        local models can serve the whole group with a single generate call.
+        """
+        try:
+            total_tasks = len(self.dependency_graph.tasks)
+            self.logger.info(f"Executing {total_tasks} tasks in batches")
+            
+            while True:
+                ready_tasks = self.dependency_graph.get_ready_tasks()
+                if not ready_tasks:
+                    break
+                
+                # Group ready tasks by the agent that will run them
+                groups: Dict[str, List[Task]] = {}
+                for task in ready_tasks:
+                    agent = self._get_agent_for_task(task)
+                    if not agent:
+                        self.logger.error(f"No agent available for task: {task.name}")
+                        task.mark_failed("No suitable agent found")
+                        continue
+                    groups.setdefault(agent.name, []).append(task)
+                
+                for group in groups.values():
+                    agent = self._get_agent_for_task(group[0])
                     
-                    # Collect task feedback for learning
-                    if self.learning_manager:
-                        try:
-                            self.learning_manager.feedback_collector.collect_task_feedback(
-                                task=task,
-                                agent_type=agent.name,
-                                execution_time=execution_time,
-                                success=True,
-                                input_prompt=task.description,
-                                generated_output=output.summary,
-                                files_created=files_created
-                            )
-                        except Exception as e:
-                            self.logger.warning(f"Failed to collect task feedback: {e}")
-                    
-                    # Log execution
-                    self.execution_log.append({
-                        "task_id": task.id,
-                        "task_name": task.name,
-                        "agent": agent.name,
-                        "status": "completed",
-                        "files_generated": len(output.files),
-                        "execution_time": execution_time,
-                        "timestamp": time.time()
-                    })
-                    
-                else:
-                    task.mark_failed(output.error or "Unknown error")
-                    self.logger.error(f"Task failed: {task.name} - {output.error}")
+                    for task in group:
+                        self._prepare_task_context(task)
+                        task.status = TaskStatus.IN_PROGRESS
                     
-                    # Collect task feedback for failed tasks too
-                    if self.learning_manager:
-                        try:
-                            self.learning_manager.feedback_collector.collect_task_feedback(
-                                task=task,
-                                agent_type=agent.name,
-                                execution_time=execution_time,
-                                success=False,
-                                input_prompt=task.description,
-                                generated_output=output.error or "Task failed",
-                                files_created=[]
-                            )
-                        except Exception as e:
-                            self.logger.warning(f"Failed to collect task feedback: {e}")
+                    self.logger.info(f"📝 Executing {len(group)} task(s) with {agent.name}")
+                    start_time = time.time()
+                    outputs = agent.run_tasks(group, self.project_context)
+                    execution_time = (time.time() - start_time) / len(group)
                     
-                    # Log failure
-                    self.execution_log.append({
-                        "task_id": task.id,
-                        "task_name": task.name,
-                        "agent": agent.name,
-                        "status": "failed",
-                        "error": output.error,
-                        "execution_time": execution_time,
-                        "timestamp": time.time()
-                    })
+                    for task, output in zip(group, outputs):
+                        self._handle_task_output(task, agent, output, execution_time)
             
             # Check overall success
             status_summary = self.dependency_graph.get_status_summary()
-            success = status_summary[TaskStatus.FAILED] == 0
+            success = (
+                status_summary[TaskStatus.FAILED] == 0
+                and status_summary[TaskStatus.COMPLETED] == total_tasks
+            )
             
             self.logger.info(f"Execution complete: {status_summary[TaskStatus.COMPLETED]} completed, {status_summary[TaskStatus.FAILED]} failed")
             
             return success
+        
+        except Exception as e:
+            self.logger.error(f"Plan execution failed: {e}")
+            return False
+
+    async def aexecute_plan(self, plan_stream: Optional[AsyncIterator[Task]] = None) -> bool:
+        """
+        Execute the planned tasks concurrently.
+        
+        Every pending task whose dependencies are complete is dispatched at
+        once, with at most ``max_parallel_tasks`` agent calls in flight. Tasks
+        are handled as they finish, so a dependent task starts as soon as its
+        own dependencies are done rather than when the whole wave is.
+        
+        Args:
+            plan_stream: Tasks still being planned; each is added to the
+                dependency graph as it arrives, so execution overlaps planning
+        """
+        try:
+            max_parallel = self.orchestrator_config.max_parallel_tasks
+            self.logger.info(f"Executing tasks concurrently (max {max_parallel} in flight)")
+            
+            semaphore = asyncio.Semaphore(max_parallel)
+            
+            async def run_with_semaphore(task: Task, agent):
+                async with semaphore:
+                    start_time = time.time()
+                    output = await agent.arun_task(task, self.project_context)
+                    return output, time.time() - start_time
+            
+            # Running agent calls and the (task, agent) each belongs to
+            in_flight: Dict[asyncio.Future, tuple] = {}
+            
+            # Pending read of the next planned task, while the plan is still streaming
+            planner = asyncio.ensure_future(plan_stream.__anext__()) if plan_stream else None
+            plan_valid = True
+            
+            while True:
+                ready_tasks = self.dependency_graph.get_ready_tasks() if plan_valid else []
+                for task in ready_tasks:
+                    agent = self._get_agent_for_task(task)
+                    if not agent:
+                        self.logger.error(f"No agent available for task: {task.name}")
+                        task.mark_failed("No suitable agent found")
+                        continue
+                    
+                    self._prepare_task_context(task)
+                    task.status = TaskStatus.IN_PROGRESS
+                    in_flight[asyncio.ensure_future(run_with_semaphore(task, agent))] = (task, agent)
+                
+                if ready_tasks:
+                    self.logger.info(f"📝 Executing {len(ready_tasks)} ready task(s), {len(in_flight)} in flight")
+                if not in_flight and not planner:
+                    break
+                
+                waiting = set(in_flight) | ({planner} if planner else set())
+                done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+                
+                if planner in done:
+                    try:
+                        self.dependency_graph.add_task(planner.result())
+                        planner = asyncio.ensure_future(plan_stream.__anext__())
+                    except StopAsyncIteration:
+                        planner = None
+                        # Only now can references to later tasks and cycles be checked
+                        validation_errors = self.dependency_graph.validate_dependencies()
+                        for error in validation_errors:
+                            self.logger.error(f"Dependency error: {error}")
+                        plan_valid = not validation_errors and bool(self.dependency_graph.tasks)
+                    except Exception:
+                        # The plan was cut off, so the project would be missing tasks;
+                        # let the running tasks finish but start no more
+                        planner = None
+                        plan_valid = False
+                
+                for future in done:
+                    if future not in in_flight:
+                        continue
+                    task, agent = in_flight.pop(future)
+                    if future.exception() is not None:
+                        output, execution_time = AgentOutput(success=False, error=str(future.exception())), 0.0
+                    else:
+                        output, execution_time = future.result()
+                    # Completing a task here may make its dependents ready for the next dispatch
+                    self._handle_task_output(task, agent, output, execution_time)
+            
+            # Check overall success
+            status_summary = self.dependency_graph.get_status_summary()
+            success = (
+                plan_valid
+                and status_summary[TaskStatus.FAILED] == 0
+                and status_summary[TaskStatus.COMPLETED] == len(self.dependency_graph.tasks)
+            )
+            
+            self.logger.info(f"Execution complete: {status_summary[TaskStatus.COMPLETED]} completed, {status_summary[TaskStatus.FAILED]} failed")
             
+            return success
+        
         except Exception as e:
             self.logger.error(f"Plan execution failed: {e}")
             return False
     
+    def _prepare_task_context(self, task: Task) -> None:
+        """Attach summaries of the task's completed dependencies to its context."""
+        task.context["completed_dependencies"] = [
+            self._completed_outputs[dep_id]
+            for dep_id in task.dependencies
+            if dep_id in self._completed_outputs
+        ]
+
+    def _handle_task_output(self, task: Task, agent, output: AgentOutput, execution_time: float,
+                            streamed_files: Optional[Dict[str, str]] = None) -> None:
+        """Write files, update task status and record feedback for a finished task."""
+        if output.success:
+            self._record_completion(task, agent, output, execution_time, streamed_files)
+        else:
+            self._record_failure(task, agent, output, execution_time)
+    
+    def _record_completion(self, task: Task, agent, output: AgentOutput, execution_time: float,
+                           streamed_files: Optional[Dict[str, str]] = None) -> None:
+        """
+        Save a completed task's files, mark it completed and log it.
+        
+        Files already written while the response streamed (streamed_files)
+        are only written again if the parsed output differs.
+        """
+        timestamp = time.time()
+        
+        # Save generated files
+        files_created = []
+        if output.files:
+            streamed_files = streamed_files or {}
+            unwritten = {
+                filename: content for filename, content in output.files.items()
+                if streamed_files.get(filename) != content
+            }
+            written_files = self.file_manager.write_files_parallel(unwritten) if unwritten else []
+            files_created = [str(f) for f in written_files] + [
+                str(self.file_manager.output_dir / filename) for filename in output.files if filename not in unwritten
+            ]
+            self.logger.info(f"Generated {len(output.files)} files")
+        
+        task.mark_completed(output)
+        self._completed_outputs[task.id] = {"name": task.name, "output_summary": output.summary}
+        self._collect_task_feedback(task, agent, execution_time, True, output.summary, files_created)
+        
+        # Log execution
+        self.execution_log.append({
+            "task_id": task.id,
+            "task_name": task.name,
+            "agent": agent.name,
+            "status": "completed",
+            "files_generated": len(output.files),
+            "execution_time": execution_time,
+            "timestamp": timestamp
+        })
+    
+    def _record_failure(self, task: Task, agent, output: AgentOutput, execution_time: float) -> None:
+        """Mark a failed task as failed and log it."""
+        timestamp = time.time()
+        
+        task.mark_failed(output.error or "Unknown error")
+        self.logger.error(f"Task failed: {task.name} - {output.error}")
+        self._collect_task_feedback(task, agent, execution_time, False, output.error or "Task failed", [])
+        
+        # Log failure
+        self.execution_log.append({
+            "task_id": task.id,
+            "task_name": task.name,
+            "agent": agent.name,
+            "status": "failed",
+            "error": output.error,
+            "execution_time": execution_time,
+            "timestamp": timestamp
+        })
+    
+    def _collect_task_feedback(self, task: Task, agent, execution_time: float, success: bool,
+                               generated_output: str, files_created: List[str]) -> None:
+        """Pass a finished task's outcome to the learning system, if it is available."""
+        if not self.learning_manager:
+            return
+        try:
+            self.learning_manager.feedback_collector.collect_task_feedback(
+                task=task,
+                agent_type=agent.name,
+                execution_time=execution_time,
+                success=success,
+                input_prompt=task.description,
+                generated_output=generated_output,
+                files_created=files_created
+            )
+        except Exception as e:
+            self.logger.warning(f"Failed to collect task feedback: {e}")
+    
     def _get_agent_for_task(self, task: Task):
         """Get the appropriate agent for a task."""
-        # Map agent types to agent names
-        agent_type_mapping = {
-            AgentType.FRONTEND: "frontend",
-            AgentType.BACKEND: "backend", 
-            AgentType.DATABASE: "database",
-            AgentType.TESTING: "testing",
-            AgentType.DOCUMENTATION: "documentation"
-        }
-        
-        agent_name = agent_type_mapping.get(task.agent_type)
-        return self.agents.get(agent_name)
+        return self.agents.get(_AGENT_NAMES_BY_TYPE.get(task.agent_type))
     
     def _show_execution_plan(self):
         """Show the execution plan for dry run mode."""
@@ -535,9 +1119,8 @@ class Orchestrator:
             summary = self._generate_project_summary()
             self.file_manager.write_file("PROJECT_SUMMARY.md", summary)
             
-            # Generate execution log
-            log_content = json.dumps(self.execution_log, indent=2)
-            self.file_manager.write_file("generation_log.json", log_content)
+            # Generate execution log, streamed to disk rather than built as one string
+            self.file_manager.write_json("generation_log.json", self.execution_log)
             
             # Get project statistics
             size_info = self.file_manager.get_size_info()
@@ -605,7 +1188,7 @@ class Orchestrator:
         status_summary = self.dependency_graph.get_status_summary()
         size_info = self.file_manager.get_size_info()
         
-        summary = f"""# Project Generation Summary
+        parts = [f"""# Project Generation Summary
 
 ## Overview
 - **Generated**: {time.strftime('%Y-%m-%d %H:%M:%S')}
@@ -618,26 +1201,26 @@ class Orchestrator:
 {self.project_context.get('description', 'No description provided')}
 
 ## Generated Structure
-"""
+"""]
         
         # Add file structure
         structure = self.file_manager.get_project_structure()
         for directory, files in structure.items():
             if directory:
-                summary += f"\n### {directory}/\n"
+                parts.append(f"\n### {directory}/\n")
             else:
-                summary += f"\n### Root Directory\n"
+                parts.append(f"\n### Root Directory\n")
             
             for file in files:
-                summary += f"- {file}\n"
+                parts.append(f"- {file}\n")
         
         # Add agent statistics
-        summary += "\n## Agent Performance\n"
+        parts.append("\n## Agent Performance\n")
         for agent_name, agent in self.agents.items():
             stats = agent.get_stats()
-            summary += f"\n### {agent_name}\n"
-            summary += f"- Tasks Completed: {stats['tasks_completed']}\n"
-            summary += f"- Tasks Failed: {stats['tasks_failed']}\n"
-            summary += f"- Average Execution Time: {stats['average_execution_time']:.2f}s\n"
+            parts.append(f"\n### {agent_name}\n")
+            parts.append(f"- Tasks Completed: {stats['tasks_completed']}\n")
+            parts.append(f"- Tasks Failed: {stats['tasks_failed']}\n")
+            parts.append(f"- Average Execution Time: {stats['average_execution_time']:.2f}s\n")
         
-        return summary
\ No newline at end of file
+        return "".join(parts)
\ No newline at end of file
@@ -5,8 +5,8 @@ LLM Swarm Setup Checker - Quick diagnostic and setup guide.
 
 import os
 import sys
-import subprocess
 import importlib
+import importlib.util
 from pathlib import Path
 
 def print_status(message, status):
@@ -29,11 +29,10 @@ def check_dependencies():
     
     missing = []
     for package in required_packages:
-        try:
-            importlib.import_module(package)
-            print_status(f"Package: {package}", True)
-        except ImportError:
-            print_status(f"Package: {package}", False)
+        # Locating the package is enough here; importing openai/anthropic takes hundreds of ms each
+        installed = importlib.util.find_spec(package) is not None
+        print_status(f"Package: {package}", installed)
+        if not installed:
             missing.append(package)
     
     return missing
@@ -58,11 +57,10 @@ def check_config():
 def test_basic_functionality():
     """Test basic system functionality."""
     try:
-        result = subprocess.run([
-            sys.executable, "main.py", "--version"
-        ], capture_output=True, text=True, timeout=5)
+        # Importing the CLI in-process exercises the same imports as running it, without a new interpreter
+        main_module = importlib.import_module("main")
         
-        working = result.returncode == 0
+        working = isinstance(main_module.__version__, str)
         print_status("Basic CLI functionality", working)
         return working
         
@@ -4,77 +4,70 @@ Demo script to showcase LLM Swarm capabilities.
 """
 
 import sys
-import os
-from pathlib import Path
-
-# Add project root to path
-project_root = Path(__file__).parent
-sys.path.insert(0, str(project_root))
 
 from utils.logger import setup_logging
 
+# Static part of the demo output, written in one go
+_BANNER = "\n".join([
+    "🎉 LLM Swarm Demo",
+    "=" * 60,
+    "",
+    "🤖 Multi-Agent Code Generation System",
+    "Transform natural language specifications into complete software projects!",
+    "",
+    "✨ What's Implemented:",
+    "  ✅ Orchestrator Agent (GPT-4/Claude)",
+    "  ✅ Frontend Agent (React/HTML/CSS)",
+    "  ✅ Backend Agent (APIs/Server Logic)",
+    "  ✅ Database Agent (Schema/Models)",
+    "  ✅ Testing Agent (Unit/Integration Tests)",
+    "  ✅ Documentation Agent (README/Docs)",
+    "",
+    "🚀 Ready to Use:",
+    "  • Task planning and dependency resolution",
+    "  • Complete CLI interface",
+    "  • Configuration management",
+    "  • Dry-run mode for testing",
+    "  • API integration (OpenAI/Anthropic)",
+    "  • Local model support",
+    "",
+    "📋 Try These Commands:",
+    "",
+    "  # Validate your setup",
+    "  python main.py config --validate",
+    "",
+    "  # List available agents",
+    "  python main.py agents",
+    "",
+    "  # See execution plan (dry run)",
+    '  python main.py generate --spec "Create a simple web app" --output ./test --dry-run',
+    "",
+    "  # Generate actual project (requires API key)",
+    '  python main.py generate --spec "Create a CLI tool" --output ./my-tool',
+    "",
+    "🔧 Setup Requirements:",
+    "  1. Set API key: export OPENAI_API_KEY='your-key'",
+    "  2. Install deps: pip install -r requirements.txt",
+    "  3. Optional: pip install transformers torch (for local models)",
+    "",
+    "📚 Documentation:",
+    "  • README.md - Quick start guide",
+    "  • INSTALL.md - Detailed installation",
+    "  • USAGE.md - Usage examples",
+    "  • STATUS.md - Implementation status",
+    "  • DESIGN.md - Original design document",
+    "",
+    "🎯 System Status: MVP Complete and Ready!",
+    "=" * 60,
+    "",
+])
+
 
 def main():
     """Run the demo."""
     setup_logging()
     
-    print("🎉 LLM Swarm Demo")
-    print("=" * 60)
-    print()
-    
-    print("🤖 Multi-Agent Code Generation System")
-    print("Transform natural language specifications into complete software projects!")
-    print()
-    
-    print("✨ What's Implemented:")
-    print("  ✅ Orchestrator Agent (GPT-4/Claude)")
-    print("  ✅ Frontend Agent (React/HTML/CSS)")
-    print("  ✅ Backend Agent (APIs/Server Logic)")
-    print("  ✅ Database Agent (Schema/Models)")
-    print("  ✅ Testing Agent (Unit/Integration Tests)")
-    print("  ✅ Documentation Agent (README/Docs)")
-    print()
-    
-    print("🚀 Ready to Use:")
-    print("  • Task planning and dependency resolution")
-    print("  • Complete CLI interface")
-    print("  • Configuration management")
-    print("  • Dry-run mode for testing")
-    print("  • API integration (OpenAI/Anthropic)")
-    print("  • Local model support")
-    print()
-    
-    print("📋 Try These Commands:")
-    print()
-    print("  # Validate your setup")
-    print("  python main.py config --validate")
-    print()
-    print("  # List available agents")
-    print("  python main.py agents")
-    print()
-    print("  # See execution plan (dry run)")
-    print('  python main.py generate --spec "Create a simple web app" --output ./test --dry-run')
-    print()
-    print("  # Generate actual project (requires API key)")
-    print('  python main.py generate --spec "Create a CLI tool" --output ./my-tool')
-    print()
-    
-    print("🔧 Setup Requirements:")
-    print("  1. Set API key: export OPENAI_API_KEY='your-key'")
-    print("  2. Install deps: pip install -r requirements.txt")
-    print("  3. Optional: pip install transformers torch (for local models)")
-    print()
-    
-    print("📚 Documentation:")
-    print("  • README.md - Quick start guide")
-    print("  • INSTALL.md - Detailed installation")
-    print("  • USAGE.md - Usage examples")
-    print("  • STATUS.md - Implementation status")
-    print("  • DESIGN.md - Original design document")
-    print()
-    
-    print("🎯 System Status: MVP Complete and Ready!")
-    print("=" * 60)
+    sys.stdout.write(_BANNER)
     
     # Quick system check
     try:
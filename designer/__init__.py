@@ -9,10 +9,14 @@ from .project_designer import ProjectDesigner
 from .blueprint_generator import BlueprintGenerator
 from .adapter_planner import AdapterPlanner
 from .work_chunker import WorkChunker
+from .models import blueprint_to_json
+from .batch import design_many
 
 __all__ = [
     'ProjectDesigner',
     'BlueprintGenerator', 
     'AdapterPlanner',
-    'WorkChunker'
+    'WorkChunker',
+    'blueprint_to_json',
+    'design_many'
 ]
\ No newline at end of file
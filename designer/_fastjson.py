@@ -0,0 +1,41 @@
+"""
+Designer JSON Encoding
+
+JSON encoding and decoding for the designer's prompts and LLM responses.
+Decoding uses orjson when it is installed and the standard library
+otherwise; encoding always uses the standard library, so prompts, response
+cache keys and batch checkpoint keys are the same in every environment.
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson.JSONDecodeError subclasses it, so callers catch this either way
+JSONDecodeError = json.JSONDecodeError
+
+
+def dumps(obj: Any, indent: bool = False) -> str:
+    """
+    Serialize to a JSON string, in the one canonical form cache keys rely on
+    
+    orjson is not used here: it writes non-ASCII text, separators and floats
+    such as 1e-07 differently, which would make keys depend on whether it is
+    installed.
+    
+    Args:
+        obj: Plain JSON-style value
+        indent: Indent nested values by two spaces
+    """
+    return json.dumps(obj, indent=2 if indent else None)
+
+
+def loads(text: str) -> Any:
+    """Parse a JSON string"""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
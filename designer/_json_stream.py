@@ -0,0 +1,90 @@
+"""
+Streamed JSON Responses
+
+Reads a streamed LLM response only up to the end of the JSON object it
+contains, so the request can be closed without waiting for trailing text.
+"""
+
+from typing import AsyncIterable, Iterable, Optional, Tuple
+
+
+class JsonObjectScanner:
+    """
+    Tracks the nesting depth of streamed JSON text to find where the first
+    top-level object ends; braces inside strings are ignored
+    """
+    
+    def __init__(self):
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.parts = []
+        self.complete = False
+    
+    def feed(self, text: str) -> bool:
+        """
+        Add the next piece of the response
+        
+        Returns:
+            True once the top-level object is complete
+        """
+        start = 0
+        if not self.parts and self.depth == 0:
+            # Skip anything before the object, such as a ```json fence
+            start = text.find('{')
+            if start < 0:
+                return False
+        
+        for index in range(start, len(text)):
+            char = text[index]
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == '\\':
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char == '{':
+                self.depth += 1
+            elif char == '}':
+                self.depth -= 1
+                if self.depth == 0:
+                    self.parts.append(text[start:index + 1])
+                    self.complete = True
+                    return True
+        
+        self.parts.append(text[start:])
+        return False
+    
+    def text(self) -> str:
+        """The object's text, or everything received if it never completed"""
+        return "".join(self.parts).strip()
+
+
+def collect_json_object(deltas: Iterable[Optional[str]]) -> Tuple[str, bool]:
+    """
+    Read streamed text deltas until the top-level JSON object is complete
+    
+    Args:
+        deltas: Text pieces of the response; None pieces are skipped
+    
+    Returns:
+        Text of the JSON object, and whether it was complete (False when
+        the response ended early, e.g. at max_tokens)
+    """
+    scanner = JsonObjectScanner()
+    for delta in deltas:
+        if delta and scanner.feed(delta):
+            break
+    return scanner.text(), scanner.complete
+
+
+async def acollect_json_object(deltas: AsyncIterable[Optional[str]]) -> Tuple[str, bool]:
+    """Read async streamed text deltas until the top-level JSON object is complete"""
+    scanner = JsonObjectScanner()
+    async for delta in deltas:
+        if delta and scanner.feed(delta):
+            break
+    return scanner.text(), scanner.complete
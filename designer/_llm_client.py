@@ -0,0 +1,188 @@
+"""
+Designer LLM Client
+
+OpenAI clients and JSON mode requests shared by the designer components.
+Responses are streamed only up to the end of their JSON object, and
+complete ones are kept in the LLM response cache.
+"""
+
+import asyncio
+import logging
+import os
+import weakref
+from typing import Any, Optional, Tuple
+
+from utils import llm_cache
+from ._json_stream import collect_json_object, acollect_json_object
+
+# Model and sampling temperature of the LLM requests; the model must support JSON mode
+_MODEL = "gpt-4o"
+_TEMPERATURE = 0.3
+_MAX_TOKENS = 4096
+# JSON mode: the model only emits a valid JSON object
+_JSON_RESPONSE_FORMAT = {"type": "json_object"}
+
+# Maximum API requests a component has in flight at once
+_MAX_CONCURRENT_REQUESTS = 5
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(prompt: str) -> str:
+    """Build the response cache key of a prompt"""
+    return llm_cache.make_key(_MODEL, _TEMPERATURE, prompt)
+
+
+def _request_kwargs(prompt: str) -> dict:
+    """Arguments of a streamed JSON mode chat completion request"""
+    return {
+        "model": _MODEL,
+        "messages": [{"role": "user", "content": prompt}],
+        "max_tokens": _MAX_TOKENS,
+        "temperature": _TEMPERATURE,
+        "response_format": _JSON_RESPONSE_FORMAT,
+        "stream": True
+    }
+
+
+def request_json(client, prompt: str) -> Tuple[str, bool]:
+    """
+    Send a prompt and read the response up to the end of its JSON object
+    
+    Args:
+        client: OpenAI client
+        prompt: Prompt asking for a JSON object
+    
+    Returns:
+        Text of the JSON object, and whether it was complete
+    """
+    stream = client.chat.completions.create(**_request_kwargs(prompt))
+    try:
+        return collect_json_object(chunk.choices[0].delta.content for chunk in stream if chunk.choices)
+    finally:
+        # Stops the generation of anything after the JSON object
+        stream.close()
+
+
+async def arequest_json(client, prompt: str) -> Tuple[str, bool]:
+    """Send a prompt with an AsyncOpenAI client and read the response up to the end of its JSON object"""
+    stream = await client.chat.completions.create(**_request_kwargs(prompt))
+    try:
+        return await acollect_json_object(
+            chunk.choices[0].delta.content async for chunk in stream if chunk.choices
+        )
+    finally:
+        # Stops the generation of anything after the JSON object
+        await stream.close()
+
+
+def _create_client(class_name: str):
+    """Create an openai client class with the API key from the environment, or None if unavailable"""
+    try:
+        import openai
+    except ImportError:
+        logger.warning("OpenAI package not available")
+        return None
+    api_key = os.getenv('OPENAI_API_KEY')
+    if not api_key:
+        logger.warning("No OpenAI API key found")
+        return None
+    client = getattr(openai, class_name)(api_key=api_key)
+    logger.info(f"{class_name} client initialized")
+    return client
+
+
+class LLMClient:
+    """
+    API clients of a designer component, created when first used, and its
+    cached JSON mode requests
+    """
+    
+    def __init__(self, async_client=None):
+        """
+        Args:
+            async_client: AsyncOpenAI client to share with other designer
+                components, so they reuse one connection pool, or a function
+                creating it, called on the first use on each event loop
+        """
+        self._api_client = None
+        self._api_client_ready = False
+        self._async_client = async_client
+        # AsyncOpenAI clients by event loop; their connections belong to the loop that opened them
+        self._async_api_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+        # Bounds concurrent requests; created for the event loop it is used on
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop = None
+    
+    @property
+    def api_client(self):
+        """OpenAI client, or None if unavailable"""
+        if not self._api_client_ready:
+            self._api_client_ready = True
+            self._api_client = _create_client('OpenAI')
+        return self._api_client
+    
+    @property
+    def async_api_client(self):
+        """AsyncOpenAI client for the running event loop, or None if unavailable"""
+        if self._async_client is not None and not callable(self._async_client):
+            return self._async_client
+        loop = asyncio.get_running_loop()
+        if loop not in self._async_api_clients:
+            self._async_api_clients[loop] = self._async_client() if self._async_client else _create_client('AsyncOpenAI')
+        return self._async_api_clients[loop]
+    
+    def request_semaphore(self) -> asyncio.Semaphore:
+        """Get the semaphore bounding concurrent requests on the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(_MAX_CONCURRENT_REQUESTS)
+            self._semaphore_loop = loop
+        return self._semaphore
+    
+    def generate_json(self, prompt: str, fallback: str) -> str:
+        """
+        Get the JSON response to a prompt, from the cache or the API
+        
+        Args:
+            prompt: Prompt asking for a JSON object
+            fallback: Response returned when no API client is available or the request fails
+        """
+        client = self.api_client
+        if not client:
+            return fallback
+        
+        key = cache_key(prompt)
+        cached = llm_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        try:
+            text, complete = request_json(client, prompt)
+        except Exception as e:
+            logger.error(f"API call failed: {e}")
+            return fallback
+        if complete:
+            llm_cache.put(key, text)
+        return text
+    
+    async def agenerate_json(self, prompt: str, fallback: str) -> str:
+        """Get the JSON response to a prompt from the cache or the async API client, without blocking the event loop"""
+        client = self.async_api_client
+        if not client:
+            return fallback
+        
+        key = cache_key(prompt)
+        cached = llm_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        try:
+            async with self.request_semaphore():
+                text, complete = await arequest_json(client, prompt)
+        except Exception as e:
+            logger.error(f"API call failed: {e}")
+            return fallback
+        if complete:
+            llm_cache.put(key, text)
+        return text
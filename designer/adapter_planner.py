@@ -5,13 +5,156 @@ Plans what LoRA adapters are needed based on the project blueprint.
 Identifies specialized knowledge domains and creates training plans.
 """
 
-import json
 import logging
-import os
 from typing import Dict, List, Any
-from dataclasses import asdict
 
-from .models import ProjectBlueprint, DesignRequest, AdapterPlan
+from . import _fastjson
+from ._llm_client import LLMClient
+from .models import ProjectBlueprint, DesignRequest, AdapterPlan, blueprint_to_json
+
+# Adapter plan returned when no API client is available or the API call fails
+_FALLBACK_RESPONSE = '{"required_adapters": [{"name": "frontend_react", "domain": "frontend", "specialization": "React components", "priority": "high", "training_data_types": ["jsx_components"], "estimated_training_time": "2 hours", "justification": "React development needed"}], "adapter_dependencies": {}, "training_priority": ["frontend_react"], "estimated_total_time": "2 hours"}'
+
+# Adapter fields filled in from the matching template when the LLM leaves them empty
+_TEMPLATE_FIELDS = ('training_data_types', 'estimated_training_time', 'domain')
+
+# SQL databases; any of them calls for the database_sql adapter
+_SQL_DATABASES = frozenset({'PostgreSQL', 'MySQL', 'SQLite'})
+
+# Fallback adapters by the tech stack category and technologies that call for them, in plan order
+_FALLBACK_ADAPTERS = (
+    ('frontend', frozenset({'React'}), {
+        'name': 'frontend_react',
+        'domain': 'frontend',
+        'specialization': 'React components and patterns',
+        'priority': 'high',
+        'training_data_types': ['jsx_components', 'react_hooks'],
+        'estimated_training_time': '2-4 hours',
+        'justification': 'React is the primary frontend framework'
+    }),
+    ('frontend', frozenset({'Vue'}), {
+        'name': 'frontend_vue',
+        'domain': 'frontend', 
+        'specialization': 'Vue.js components and patterns',
+        'priority': 'high',
+        'training_data_types': ['vue_components', 'vue_composition'],
+        'estimated_training_time': '2-4 hours',
+        'justification': 'Vue is the primary frontend framework'
+    }),
+    ('backend', frozenset({'FastAPI'}), {
+        'name': 'backend_fastapi',
+        'domain': 'backend',
+        'specialization': 'FastAPI endpoints and patterns',
+        'priority': 'high',
+        'training_data_types': ['fastapi_routes', 'pydantic_models'],
+        'estimated_training_time': '3-5 hours',
+        'justification': 'FastAPI is the primary backend framework'
+    }),
+    ('backend', frozenset({'Express'}), {
+        'name': 'backend_express',
+        'domain': 'backend',
+        'specialization': 'Express.js routes and middleware',
+        'priority': 'high',
+        'training_data_types': ['express_routes', 'middleware_patterns'],
+        'estimated_training_time': '2-4 hours',
+        'justification': 'Express is the primary backend framework'
+    }),
+    ('database', _SQL_DATABASES, {
+        'name': 'database_sql',
+        'domain': 'database',
+        'specialization': 'SQL queries and schema design',
+        'priority': 'medium',
+        'training_data_types': ['sql_queries', 'schema_design'],
+        'estimated_training_time': '2-3 hours',
+        'justification': 'SQL database is being used'
+    }),
+)
+
+# Included in every fallback plan
+_FALLBACK_TESTING_ADAPTER = {
+    'name': 'testing_unit',
+    'domain': 'testing',
+    'specialization': 'Unit testing patterns',
+    'priority': 'medium',
+    'training_data_types': ['unit_tests', 'test_fixtures'],
+    'estimated_training_time': '2-3 hours',
+    'justification': 'Testing is essential for code quality'
+}
+
+
+def _uses_any(category_techs: Any, techs: frozenset) -> bool:
+    """
+    Check whether a tech stack category names any of techs
+    
+    A category given as one string is searched for the names as substrings,
+    so "React, Redux" names React. In a list only string entries are compared,
+    since LLM responses may hold objects such as {"name": "React"} there.
+    """
+    if not category_techs:
+        return False
+    if isinstance(category_techs, str):
+        return any(tech in category_techs for tech in techs)
+    return not techs.isdisjoint(tech for tech in category_techs if isinstance(tech, str))
+
+
+# Built once at import; filled in with str.format_map per request
+_ADAPTER_PLANNING_PROMPT = """
+You are a LoRA Adapter Specialist responsible for identifying what specialized adapters are needed for a project.
+
+Project Blueprint:
+{blueprint}
+
+User Requirements:
+{requirements}
+
+Based on this project, identify what LoRA adapters should be created or used. Consider:
+
+1. TECHNOLOGY-SPECIFIC ADAPTERS:
+   - What specific frameworks/libraries are being used?
+   - What patterns are common in those technologies?
+   - What specialized knowledge is needed?
+
+2. DOMAIN-SPECIFIC ADAPTERS:
+   - Authentication/authorization patterns
+   - Database interaction patterns  
+   - API design patterns
+   - Testing patterns
+   - UI/UX patterns specific to this project type
+
+3. PROJECT-SPECIFIC ADAPTERS:
+   - Are there unique patterns this project will need?
+   - Custom business logic patterns
+   - Integration patterns with external services
+
+4. ADAPTER DEPENDENCIES:
+   - Which adapters depend on others?
+   - What's the training priority order?
+   - Which adapters can be trained in parallel?
+
+Respond with JSON in this format:
+{{
+  "required_adapters": [
+    {{
+      "name": "adapter_name",
+      "domain": "domain_category", 
+      "specialization": "what_it_specializes_in",
+      "priority": "high|medium|low",
+      "training_data_types": ["type1", "type2"],
+      "estimated_training_time": "time_estimate",
+      "justification": "why_this_adapter_is_needed"
+    }}
+  ],
+  "adapter_dependencies": {{
+    "adapter_name": ["dependency1", "dependency2"]
+  }},
+  "training_priority": ["adapter1", "adapter2", "adapter3"],
+  "estimated_total_time": "total_time_estimate",
+  "parallel_training_groups": [
+    ["adapter1", "adapter2"],
+    ["adapter3"]
+  ]
+}}
+"""
 
 
 class AdapterPlanner:
@@ -19,12 +162,21 @@ class AdapterPlanner:
     Plans LoRA adapters needed for specialized agents
     """
     
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], async_client=None):
+        """
+        Initialize the adapter planner
+        
+        Args:
+            config: System configuration
+            async_client: AsyncOpenAI client to share with other designer
+                components, so they reuse one connection pool, or a function
+                creating it, called on the first use on each event loop
+        """
         self.logger = logging.getLogger(__name__)
         self.config = config
         
-        # Initialize API client for response generation
-        self._init_api_client()
+        # API clients for response generation
+        self.llm_client = LLMClient(async_client)
         
         # Common adapter types and their specializations
         self.adapter_templates = {
@@ -84,158 +236,84 @@ class AdapterPlanner:
             }
         }
         
-        self.adapter_planning_prompt = """
-You are a LoRA Adapter Specialist responsible for identifying what specialized adapters are needed for a project.
-
-Project Blueprint:
-{blueprint}
-
-User Requirements:
-{requirements}
-
-Based on this project, identify what LoRA adapters should be created or used. Consider:
-
-1. TECHNOLOGY-SPECIFIC ADAPTERS:
-   - What specific frameworks/libraries are being used?
-   - What patterns are common in those technologies?
-   - What specialized knowledge is needed?
-
-2. DOMAIN-SPECIFIC ADAPTERS:
-   - Authentication/authorization patterns
-   - Database interaction patterns  
-   - API design patterns
-   - Testing patterns
-   - UI/UX patterns specific to this project type
-
-3. PROJECT-SPECIFIC ADAPTERS:
-   - Are there unique patterns this project will need?
-   - Custom business logic patterns
-   - Integration patterns with external services
-
-4. ADAPTER DEPENDENCIES:
-   - Which adapters depend on others?
-   - What's the training priority order?
-   - Which adapters can be trained in parallel?
-
-Respond with JSON in this format:
-{{
-  "required_adapters": [
-    {{
-      "name": "adapter_name",
-      "domain": "domain_category", 
-      "specialization": "what_it_specializes_in",
-      "priority": "high|medium|low",
-      "training_data_types": ["type1", "type2"],
-      "estimated_training_time": "time_estimate",
-      "justification": "why_this_adapter_is_needed"
-    }}
-  ],
-  "adapter_dependencies": {{
-    "adapter_name": ["dependency1", "dependency2"]
-  }},
-  "training_priority": ["adapter1", "adapter2", "adapter3"],
-  "estimated_total_time": "total_time_estimate",
-  "parallel_training_groups": [
-    ["adapter1", "adapter2"],
-    ["adapter3"]
-  ]
-}}
-"""
-    
-    def _init_api_client(self):
-        """Initialize API client for response generation"""
-        try:
-            import openai
-            api_key = os.getenv('OPENAI_API_KEY')
-            if api_key:
-                self.api_client = openai.OpenAI(api_key=api_key)
-                self.logger.info("OpenAI API client initialized")
-            else:
-                self.api_client = None
-                self.logger.warning("No OpenAI API key found")
-        except ImportError:
-            self.api_client = None
-            self.logger.warning("OpenAI package not available")
+        self.adapter_planning_prompt = _ADAPTER_PLANNING_PROMPT
     
     def generate_response(self, prompt: str) -> str:
         """Generate response using API client"""
-        if not self.api_client:
-            # Return a fallback response for testing
-            return '{"required_adapters": [{"name": "frontend_react", "domain": "frontend", "specialization": "React components", "priority": "high", "training_data_types": ["jsx_components"], "estimated_training_time": "2 hours", "justification": "React development needed"}], "adapter_dependencies": {}, "training_priority": ["frontend_react"], "estimated_total_time": "2 hours"}'
-        
-        try:
-            response = self.api_client.chat.completions.create(
-                model="gpt-4",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=4096,
-                temperature=0.3
-            )
-            return response.choices[0].message.content.strip()
-        except Exception as e:
-            self.logger.error(f"API call failed: {e}")
-            # Return fallback response
-            return '{"required_adapters": [{"name": "frontend_react", "domain": "frontend", "specialization": "React components", "priority": "high", "training_data_types": ["jsx_components"], "estimated_training_time": "2 hours", "justification": "React development needed"}], "adapter_dependencies": {}, "training_priority": ["frontend_react"], "estimated_total_time": "2 hours"}'
+        return self.llm_client.generate_json(prompt, _FALLBACK_RESPONSE)
+    
+    async def agenerate_response(self, prompt: str) -> str:
+        """Generate response using the async API client, without blocking the event loop"""
+        return await self.llm_client.agenerate_json(prompt, _FALLBACK_RESPONSE)
     
     def plan_adapters(self, blueprint: ProjectBlueprint, request: DesignRequest) -> AdapterPlan:
         """
         Plan what LoRA adapters are needed for this project
         """
         self.logger.info("Planning LoRA adapters...")
-        
-        # Format prompt with blueprint data
-        prompt = self.adapter_planning_prompt.format(
-            blueprint=json.dumps(asdict(blueprint), indent=2),
-            requirements=json.dumps(request.requirements)
-        )
-        
+        return self._parse_adapter_plan(self.generate_response(self.format_prompt(blueprint, request)), blueprint)
+    
+    async def aplan_adapters(self, blueprint: ProjectBlueprint, request: DesignRequest) -> AdapterPlan:
+        """
+        Plan what LoRA adapters are needed without blocking the event loop
+        """
+        self.logger.info("Planning LoRA adapters...")
+        return self._parse_adapter_plan(await self.agenerate_response(self.format_prompt(blueprint, request)), blueprint)
+    
+    def format_prompt(self, blueprint: ProjectBlueprint, request: DesignRequest) -> str:
+        """Format the adapter planning prompt with the blueprint data"""
+        return self.adapter_planning_prompt.format_map({
+            "blueprint": blueprint_to_json(blueprint),
+            "requirements": _fastjson.dumps(request.requirements)
+        })
+    
+    def _parse_adapter_plan(self, response: str, blueprint: ProjectBlueprint) -> AdapterPlan:
+        """
+        Build the adapter plan from the LLM response, or a fallback plan if it is unusable
+        """
         try:
-            # Get LLM response
-            response = self.generate_response(prompt)
-            
             # Parse JSON response
-            plan_data = json.loads(response)
-            
-            # Create AdapterPlan object
-            adapter_plan = AdapterPlan(
-                required_adapters=plan_data.get('required_adapters', []),
-                adapter_dependencies=plan_data.get('adapter_dependencies', {}),
-                training_priority=plan_data.get('training_priority', []),
-                estimated_training_time=plan_data.get('estimated_total_time', 'unknown')
-            )
-            
-            # Enhance with template data
-            adapter_plan = self._enhance_with_templates(adapter_plan)
+            return self.adapter_plan_from_data(_fastjson.loads(response))
             
-            self.logger.info(f"Planned {len(adapter_plan.required_adapters)} adapters")
-            return adapter_plan
-            
-        except json.JSONDecodeError as e:
+        except _fastjson.JSONDecodeError as e:
             self.logger.error(f"Failed to parse adapter plan JSON: {e}")
             return self._create_fallback_adapter_plan(blueprint)
         except Exception as e:
             self.logger.error(f"Error planning adapters: {e}")
             return self._create_fallback_adapter_plan(blueprint)
     
+    def adapter_plan_from_data(self, plan_data: Dict[str, Any]) -> AdapterPlan:
+        """
+        Create the AdapterPlan object from the parsed JSON of an adapter plan
+        """
+        adapter_plan = AdapterPlan(
+            required_adapters=plan_data.get('required_adapters', []),
+            adapter_dependencies=plan_data.get('adapter_dependencies', {}),
+            training_priority=plan_data.get('training_priority', []),
+            estimated_training_time=plan_data.get('estimated_total_time', 'unknown')
+        )
+        
+        # Enhance with template data
+        adapter_plan = self._enhance_with_templates(adapter_plan)
+        
+        self.logger.info("Planned %d adapters", len(adapter_plan.required_adapters))
+        return adapter_plan
+    
     def _enhance_with_templates(self, adapter_plan: AdapterPlan) -> AdapterPlan:
         """
         Enhance adapter plan with template data for known adapter types
         """
+        templates = self.adapter_templates
         for adapter in adapter_plan.required_adapters:
-            adapter_name = adapter.get('name', '')
-            
             # Check if we have a template for this adapter
-            if adapter_name in self.adapter_templates:
-                template = self.adapter_templates[adapter_name]
-                
+            template = templates.get(adapter.get('name', ''))
+            if template:
                 # Fill in missing data from template
-                if not adapter.get('training_data_types'):
-                    adapter['training_data_types'] = template['training_data_types']
-                
-                if not adapter.get('estimated_training_time'):
-                    adapter['estimated_training_time'] = template['estimated_training_time']
-                
-                if not adapter.get('domain'):
-                    adapter['domain'] = template['domain']
+                adapter.update({
+                    field: template[field]
+                    for field in _TEMPLATE_FIELDS
+                    if not adapter.get(field)
+                })
         
         return adapter_plan
     
@@ -245,86 +323,15 @@ Respond with JSON in this format:
         """
         self.logger.warning("Creating fallback adapter plan")
         
-        required_adapters = []
-        training_priority = []
-        
-        # Analyze tech stack and create basic adapters
         tech_stack = blueprint.tech_stack
-        
-        # Frontend adapters
-        if 'React' in tech_stack.get('frontend', []):
-            required_adapters.append({
-                'name': 'frontend_react',
-                'domain': 'frontend',
-                'specialization': 'React components and patterns',
-                'priority': 'high',
-                'training_data_types': ['jsx_components', 'react_hooks'],
-                'estimated_training_time': '2-4 hours',
-                'justification': 'React is the primary frontend framework'
-            })
-            training_priority.append('frontend_react')
-        
-        if 'Vue' in tech_stack.get('frontend', []):
-            required_adapters.append({
-                'name': 'frontend_vue',
-                'domain': 'frontend', 
-                'specialization': 'Vue.js components and patterns',
-                'priority': 'high',
-                'training_data_types': ['vue_components', 'vue_composition'],
-                'estimated_training_time': '2-4 hours',
-                'justification': 'Vue is the primary frontend framework'
-            })
-            training_priority.append('frontend_vue')
-        
-        # Backend adapters
-        if 'FastAPI' in tech_stack.get('backend', []):
-            required_adapters.append({
-                'name': 'backend_fastapi',
-                'domain': 'backend',
-                'specialization': 'FastAPI endpoints and patterns',
-                'priority': 'high',
-                'training_data_types': ['fastapi_routes', 'pydantic_models'],
-                'estimated_training_time': '3-5 hours',
-                'justification': 'FastAPI is the primary backend framework'
-            })
-            training_priority.append('backend_fastapi')
-        
-        if 'Express' in tech_stack.get('backend', []):
-            required_adapters.append({
-                'name': 'backend_express',
-                'domain': 'backend',
-                'specialization': 'Express.js routes and middleware',
-                'priority': 'high',
-                'training_data_types': ['express_routes', 'middleware_patterns'],
-                'estimated_training_time': '2-4 hours',
-                'justification': 'Express is the primary backend framework'
-            })
-            training_priority.append('backend_express')
-        
-        # Database adapters
-        if any(db in ['PostgreSQL', 'MySQL', 'SQLite'] for db in tech_stack.get('database', [])):
-            required_adapters.append({
-                'name': 'database_sql',
-                'domain': 'database',
-                'specialization': 'SQL queries and schema design',
-                'priority': 'medium',
-                'training_data_types': ['sql_queries', 'schema_design'],
-                'estimated_training_time': '2-3 hours',
-                'justification': 'SQL database is being used'
-            })
-            training_priority.append('database_sql')
-        
+        required_adapters = [
+            {**adapter, 'training_data_types': list(adapter['training_data_types'])}
+            for category, techs, adapter in _FALLBACK_ADAPTERS
+            if _uses_any(tech_stack.get(category), techs)
+        ]
         # Always include testing adapter
-        required_adapters.append({
-            'name': 'testing_unit',
-            'domain': 'testing',
-            'specialization': 'Unit testing patterns',
-            'priority': 'medium',
-            'training_data_types': ['unit_tests', 'test_fixtures'],
-            'estimated_training_time': '2-3 hours',
-            'justification': 'Testing is essential for code quality'
-        })
-        training_priority.append('testing_unit')
+        required_adapters.append({**_FALLBACK_TESTING_ADAPTER, 'training_data_types': list(_FALLBACK_TESTING_ADAPTER['training_data_types'])})
+        training_priority = [adapter['name'] for adapter in required_adapters]
         
         return AdapterPlan(
             required_adapters=required_adapters,
@@ -0,0 +1,103 @@
+"""
+Batch Design
+
+Creates blueprints and adapter plans for many design requests concurrently.
+Finished requests can be checkpointed to a JSONL file, so an interrupted
+batch resumes without paying for their LLM calls again.
+"""
+
+import asyncio
+import hashlib
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from . import _fastjson
+from .models import DesignRequest, ProjectBlueprint, AdapterPlan
+
+logger = logging.getLogger(__name__)
+
+
+def request_key(request: DesignRequest) -> str:
+    """Key identifying a design request in a checkpoint; the timestamp is not part of it"""
+    payload = _fastjson.dumps([request.prompt, request.requirements, request.constraints, request.preferences])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _load_checkpoint(path: Path) -> Dict[str, Tuple[ProjectBlueprint, AdapterPlan]]:
+    """Read the designs finished in an earlier run; a line cut off by an interruption is skipped"""
+    finished = {}
+    if not path.exists():
+        return finished
+    
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = _fastjson.loads(line)
+                finished[record['key']] = (
+                    ProjectBlueprint(**record['blueprint']),
+                    AdapterPlan(**record['adapter_plan'])
+                )
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Skipping unreadable checkpoint line: {e}")
+    return finished
+
+
+def _open_checkpoint(path: Path):
+    """Open the checkpoint for appending, ending a line cut off by an interruption first"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    checkpoint_file = open(path, 'a+', encoding='utf-8')
+    if checkpoint_file.tell() > 0:
+        checkpoint_file.seek(checkpoint_file.tell() - 1)
+        if checkpoint_file.read(1) != '\n':
+            checkpoint_file.write('\n')
+    return checkpoint_file
+
+
+async def design_many(blueprint_generator, adapter_planner, requests: List[DesignRequest],
+                      concurrency: int = 5,
+                      checkpoint_path: Optional[Union[str, Path]] = None) -> List[Tuple[ProjectBlueprint, AdapterPlan]]:
+    """
+    Create the blueprint and adapter plan of each request, several at a time
+    
+    Args:
+        blueprint_generator: BlueprintGenerator creating the blueprints
+        adapter_planner: AdapterPlanner planning the adapters
+        requests: Design requests
+        concurrency: Maximum requests being designed at once
+        checkpoint_path: JSONL file recording finished designs; those already
+            in it are read back instead of designed again
+    
+    Returns:
+        (blueprint, adapter plan) of each request, in the order of requests
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    
+    checkpoint = Path(checkpoint_path) if checkpoint_path else None
+    finished = _load_checkpoint(checkpoint) if checkpoint else {}
+    keys = [request_key(request) for request in requests]
+    if finished:
+        logger.info("Resuming batch: %d of %d designs already finished", sum(key in finished for key in keys), len(keys))
+    
+    semaphore = asyncio.Semaphore(concurrency)
+    checkpoint_file = _open_checkpoint(checkpoint) if checkpoint else None
+    
+    async def design_one(key: str, request: DesignRequest) -> Tuple[ProjectBlueprint, AdapterPlan]:
+        if key in finished:
+            return finished[key]
+        async with semaphore:
+            blueprint = await blueprint_generator.acreate_blueprint(request)
+            adapter_plan = await adapter_planner.aplan_adapters(blueprint, request)
+        
+        if checkpoint_file:
+            record = {'key': key, 'blueprint': blueprint.to_dict(), 'adapter_plan': adapter_plan.to_dict()}
+            checkpoint_file.write(_fastjson.dumps(record) + '\n')
+            checkpoint_file.flush()
+        return blueprint, adapter_plan
+    
+    try:
+        return list(await asyncio.gather(*(design_one(key, request) for key, request in zip(keys, requests))))
+    finally:
+        if checkpoint_file:
+            checkpoint_file.close()
@@ -4,28 +4,19 @@ Blueprint Generator
 Creates detailed project blueprints from user requests using LLM analysis.
 """
 
-import json
 import logging
-import os
 from typing import Dict, List, Any
 from dataclasses import asdict
 
+from . import _fastjson
+from ._llm_client import LLMClient
 from .models import DesignRequest, ProjectBlueprint
 
+# Blueprint returned when no API client is available or the API call fails
+_FALLBACK_RESPONSE = '{"project_name": "Test Project", "description": "A test project", "estimated_complexity": "simple", "architecture": {"pattern": "MVC", "components": ["frontend", "backend"], "data_flow": "client-server", "scalability_considerations": "basic"}, "features": [{"name": "basic feature", "description": "test feature", "priority": "high", "complexity": "simple", "dependencies": [], "estimated_effort": "small"}], "tech_stack": {"frontend": ["React"], "backend": ["Node.js"], "database": ["SQLite"], "infrastructure": ["local"], "tools": ["npm"]}, "file_structure": {}, "dependencies": ["react", "express"]}'
 
-class BlueprintGenerator:
-    """
-    Generates detailed project blueprints from user requests
-    """
-    
-    def __init__(self, config: Dict[str, Any]):
-        self.logger = logging.getLogger(__name__)
-        self.config = config
-        
-        # Initialize API client for response generation
-        self._init_api_client()
-        
-        self.blueprint_prompt = """
+# Built once at import; filled in with str.format_map per request
+_BLUEPRINT_PROMPT = """
 You are a Senior Software Architect specializing in creating detailed project blueprints.
 
 User Request: "{prompt}"
@@ -100,84 +91,95 @@ Respond ONLY with valid JSON in this exact format:
   "dependencies": ["string"]
 }}
 """
+
+
+class BlueprintGenerator:
+    """
+    Generates detailed project blueprints from user requests
+    """
     
-    def _init_api_client(self):
-        """Initialize API client for response generation"""
-        try:
-            import openai
-            api_key = os.getenv('OPENAI_API_KEY')
-            if api_key:
-                self.api_client = openai.OpenAI(api_key=api_key)
-                self.logger.info("OpenAI API client initialized")
-            else:
-                self.api_client = None
-                self.logger.warning("No OpenAI API key found")
-        except ImportError:
-            self.api_client = None
-            self.logger.warning("OpenAI package not available")
+    def __init__(self, config: Dict[str, Any], async_client=None):
+        """
+        Initialize the blueprint generator
+        
+        Args:
+            config: System configuration
+            async_client: AsyncOpenAI client to share with other designer
+                components, so they reuse one connection pool, or a function
+                creating it, called on the first use on each event loop
+        """
+        self.logger = logging.getLogger(__name__)
+        self.config = config
+        
+        # API clients for response generation
+        self.llm_client = LLMClient(async_client)
+        
+        self.blueprint_prompt = _BLUEPRINT_PROMPT
     
     def generate_response(self, prompt: str) -> str:
         """Generate response using API client"""
-        if not self.api_client:
-            # Return a fallback response for testing
-            return '{"project_name": "Test Project", "description": "A test project", "estimated_complexity": "simple", "architecture": {"pattern": "MVC", "components": ["frontend", "backend"], "data_flow": "client-server", "scalability_considerations": "basic"}, "features": [{"name": "basic feature", "description": "test feature", "priority": "high", "complexity": "simple", "dependencies": [], "estimated_effort": "small"}], "tech_stack": {"frontend": ["React"], "backend": ["Node.js"], "database": ["SQLite"], "infrastructure": ["local"], "tools": ["npm"]}, "file_structure": {}, "dependencies": ["react", "express"]}'
-        
-        try:
-            response = self.api_client.chat.completions.create(
-                model="gpt-4",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=4096,
-                temperature=0.3
-            )
-            return response.choices[0].message.content.strip()
-        except Exception as e:
-            self.logger.error(f"API call failed: {e}")
-            # Return fallback response
-            return '{"project_name": "Test Project", "description": "A test project", "estimated_complexity": "simple", "architecture": {"pattern": "MVC", "components": ["frontend", "backend"], "data_flow": "client-server", "scalability_considerations": "basic"}, "features": [{"name": "basic feature", "description": "test feature", "priority": "high", "complexity": "simple", "dependencies": [], "estimated_effort": "small"}], "tech_stack": {"frontend": ["React"], "backend": ["Node.js"], "database": ["SQLite"], "infrastructure": ["local"], "tools": ["npm"]}, "file_structure": {}, "dependencies": ["react", "express"]}'
+        return self.llm_client.generate_json(prompt, _FALLBACK_RESPONSE)
+    
+    async def agenerate_response(self, prompt: str) -> str:
+        """Generate response using the async API client, without blocking the event loop"""
+        return await self.llm_client.agenerate_json(prompt, _FALLBACK_RESPONSE)
     
     def create_blueprint(self, request: DesignRequest) -> ProjectBlueprint:
         """
         Create a detailed project blueprint from the design request
         """
         self.logger.info("Generating project blueprint...")
-        
-        # Format the prompt with request details
-        prompt = self.blueprint_prompt.format(
-            prompt=request.prompt,
-            requirements=json.dumps(request.requirements),
-            constraints=json.dumps(request.constraints),
-            preferences=json.dumps(request.preferences)
-        )
-        
+        return self._parse_blueprint(self.generate_response(self.format_prompt(request)), request)
+    
+    async def acreate_blueprint(self, request: DesignRequest) -> ProjectBlueprint:
+        """
+        Create a detailed project blueprint without blocking the event loop
+        """
+        self.logger.info("Generating project blueprint...")
+        return self._parse_blueprint(await self.agenerate_response(self.format_prompt(request)), request)
+    
+    def format_prompt(self, request: DesignRequest) -> str:
+        """Format the blueprint prompt with the request details"""
+        return self.blueprint_prompt.format_map({
+            "prompt": request.prompt,
+            "requirements": _fastjson.dumps(request.requirements),
+            "constraints": _fastjson.dumps(request.constraints),
+            "preferences": _fastjson.dumps(request.preferences)
+        })
+    
+    def _parse_blueprint(self, response: str, request: DesignRequest) -> ProjectBlueprint:
+        """
+        Build the blueprint from the LLM response, or a fallback blueprint if it is unusable
+        """
         try:
-            # Get LLM response
-            response = self.generate_response(prompt)
-            
             # Parse JSON response
-            blueprint_data = json.loads(response)
-            
-            # Create ProjectBlueprint object
-            blueprint = ProjectBlueprint(
-                project_name=blueprint_data.get('project_name', 'Untitled Project'),
-                description=blueprint_data.get('description', ''),
-                architecture=blueprint_data.get('architecture', {}),
-                features=blueprint_data.get('features', []),
-                tech_stack=blueprint_data.get('tech_stack', {}),
-                file_structure=blueprint_data.get('file_structure', {}),
-                dependencies=blueprint_data.get('dependencies', []),
-                estimated_complexity=blueprint_data.get('estimated_complexity', 'moderate')
-            )
-            
-            self.logger.info(f"Blueprint created for: {blueprint.project_name}")
-            return blueprint
+            return self.blueprint_from_data(_fastjson.loads(response))
             
-        except json.JSONDecodeError as e:
+        except _fastjson.JSONDecodeError as e:
             self.logger.error(f"Failed to parse blueprint JSON: {e}")
             return self._create_fallback_blueprint(request)
         except Exception as e:
             self.logger.error(f"Error creating blueprint: {e}")
             return self._create_fallback_blueprint(request)
     
+    def blueprint_from_data(self, blueprint_data: Dict[str, Any]) -> ProjectBlueprint:
+        """
+        Create the ProjectBlueprint object from the parsed JSON of a blueprint
+        """
+        blueprint = ProjectBlueprint(
+            project_name=blueprint_data.get('project_name', 'Untitled Project'),
+            description=blueprint_data.get('description', ''),
+            architecture=blueprint_data.get('architecture', {}),
+            features=blueprint_data.get('features', []),
+            tech_stack=blueprint_data.get('tech_stack', {}),
+            file_structure=blueprint_data.get('file_structure', {}),
+            dependencies=blueprint_data.get('dependencies', []),
+            estimated_complexity=blueprint_data.get('estimated_complexity', 'moderate')
+        )
+        
+        self.logger.info("Blueprint created for: %s", blueprint.project_name)
+        return blueprint
+    
     def _create_fallback_blueprint(self, request: DesignRequest) -> ProjectBlueprint:
         """
         Create a basic fallback blueprint if LLM fails
@@ -5,11 +5,15 @@ Connects the Designer LLM System to actual specialized agents for code generatio
 This is the core of Phase 2: Enhanced Adapter Execution.
 """
 
+import asyncio
+import heapq
 import os
 import json
 import logging
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Any, Optional
-from dataclasses import asdict
 
 from utils.dependency_graph import Task, TaskStatus, AgentType
 from agents.frontend_agent import FrontendAgent
@@ -21,6 +25,159 @@ from utils.config_loader import AgentConfig, ModelConfig
 from .models import WorkPlan, ProjectBlueprint
 
 
+def _substring_pattern(*words: str) -> "re.Pattern":
+    """Compile a pattern matching any of the words anywhere in a string, in one scan"""
+    return re.compile('|'.join(re.escape(word) for word in words))
+
+
+# Substrings of a chunk's adapter name that pick its agent, checked in this order
+_ADAPTER_PATTERNS = (
+    (_substring_pattern('react', 'frontend'), AgentType.FRONTEND),
+    (_substring_pattern('node', 'express', 'backend'), AgentType.BACKEND),
+    (_substring_pattern('mongodb', 'database', 'sql'), AgentType.DATABASE),
+    (_substring_pattern('test'), AgentType.TESTING),
+    (_substring_pattern('doc'), AgentType.DOCUMENTATION),
+)
+
+# Enhanced keyword matching for chunk name and description
+_KEYWORD_PATTERNS = (
+    (_substring_pattern('ui', 'frontend', 'react', 'component', 'interface', 'client', 'view', 'page'), AgentType.FRONTEND),
+    (_substring_pattern('api', 'backend', 'server', 'endpoint', 'service', 'controller', 'authentication', 'auth', 'crud', 'route'), AgentType.BACKEND),
+    (_substring_pattern('database', 'schema', 'model', 'migration', 'query', 'collection', 'table'), AgentType.DATABASE),
+    (_substring_pattern('test', 'testing', 'spec', 'unit', 'integration'), AgentType.TESTING),
+)
+
+# File paths in a chunk's scope that point to its agent
+_SCOPE_PATTERNS = (
+    (_substring_pattern('client/', 'src/components', 'public/', 'assets/', '.jsx', '.tsx', '.html', '.css', '.scss'), AgentType.FRONTEND),
+    (_substring_pattern('server/', 'api/', 'controllers/', 'routes/', 'middleware/', '.js', '.py', '.java'), AgentType.BACKEND),
+    (_substring_pattern('models/', 'schemas/', 'migrations/', 'database/'), AgentType.DATABASE),
+)
+
+# Educated guesses when nothing else matched: auth, CRUD and social features are typically backend
+_BACKEND_GUESS_PATTERN = _substring_pattern('authentication', 'auth', 'crud', 'comment', 'like')
+
+# Code examples shown to agents for the project's frameworks
+_REACT_COMPONENT_EXAMPLE = '''
+import React, { useState } from 'react';
+
+function ComponentName() {
+  const [state, setState] = useState(initialValue);
+  
+  return (
+    <div>
+      <button onClick={handleClick}>Click me</button>
+    </div>
+  );
+}
+
+export default ComponentName;'''
+
+_VUE_COMPONENT_EXAMPLE = '''
+<template>
+  <div>
+    <button @click="handleClick">Click me</button>
+  </div>
+</template>
+
+<script setup>
+import { ref } from 'vue';
+const state = ref(initialValue);
+</script>'''
+
+_EXPRESS_ROUTE_EXAMPLE = '''
+const express = require('express');
+const router = express.Router();
+
+router.get('/api/endpoint', (req, res) => {
+  res.json({ message: 'Success' });
+});
+
+module.exports = router;'''
+
+_MONGOOSE_MODEL_EXAMPLE = '''
+const mongoose = require('mongoose');
+
+const schema = new mongoose.Schema({
+  field: { type: String, required: true },
+  createdAt: { type: Date, default: Date.now }
+});
+
+module.exports = mongoose.model('ModelName', schema);'''
+
+# System prompts of the agents created for chunks
+_SYSTEM_PROMPTS = {
+    AgentType.FRONTEND: """You are a frontend development expert specializing in React, HTML, CSS, and JavaScript.
+Your task is to generate high-quality frontend code based on the given requirements.
+
+Focus on:
+- Clean, maintainable React components
+- Modern JavaScript/TypeScript patterns
+- Responsive CSS design
+- User experience best practices
+- Accessibility considerations
+
+Generate complete, working code files that can be directly used in a project.""",
+
+    AgentType.BACKEND: """You are a backend development expert specializing in Node.js, Express, and API development.
+Your task is to generate high-quality backend code based on the given requirements.
+
+Focus on:
+- RESTful API design
+- Proper error handling
+- Security best practices
+- Database integration
+- Authentication and authorization
+- Clean code architecture
+
+Generate complete, working code files that can be directly used in a project.""",
+
+    AgentType.DATABASE: """You are a database expert specializing in MongoDB, schema design, and data modeling.
+Your task is to generate high-quality database code based on the given requirements.
+
+Focus on:
+- Efficient schema design
+- Proper indexing strategies
+- Data validation
+- Migration scripts
+- Query optimization
+- Database security
+
+Generate complete, working database schemas and models that can be directly used in a project.""",
+
+    AgentType.TESTING: """You are a testing expert specializing in unit tests, integration tests, and test automation.
+Your task is to generate comprehensive test suites based on the given requirements.
+
+Focus on:
+- Complete test coverage
+- Clear test descriptions
+- Proper test structure
+- Mock and stub usage
+- Edge case testing
+- Performance testing
+
+Generate complete, working test files that can be directly used in a project.""",
+
+    AgentType.DOCUMENTATION: """You are a documentation expert specializing in technical writing and API documentation.
+Your task is to generate clear, comprehensive documentation based on the given requirements.
+
+Focus on:
+- Clear explanations
+- Code examples
+- API documentation
+- Setup instructions
+- Usage guidelines
+- Best practices
+
+Generate complete, well-structured documentation that helps developers understand and use the code."""
+}
+
+_DEFAULT_SYSTEM_PROMPT = "You are a software development expert. Generate high-quality code based on the given requirements."
+
+# Agent calls in flight at once when the config has no orchestrator max_parallel_tasks
+_DEFAULT_MAX_CONCURRENT_TASKS = 3
+
+
 class ChunkExecutor:
     """
     Executes work chunks using specialized agents
@@ -50,6 +207,19 @@ class ChunkExecutor:
         
         # Cache for initialized agents
         self.agents_cache = {}
+        # Framework context by tech stack (as sorted JSON)
+        self._framework_context_cache: Dict[str, Dict[str, Any]] = {}
+        # Writes the files of every task; created on first use and shut down by close()
+        self._file_writer: Optional[ThreadPoolExecutor] = None
+        # Files are saved from worker threads, so only one of them may create the pool
+        self._file_writer_lock = threading.Lock()
+    
+    def close(self):
+        """Shut down the file writer threads"""
+        with self._file_writer_lock:
+            file_writer, self._file_writer = self._file_writer, None
+        if file_writer:
+            file_writer.shutdown()
     
     def execute_chunks(self, work_plan: WorkPlan, blueprint: ProjectBlueprint, 
                       context_serialization: Dict[str, Any], output_dir: str,
@@ -62,17 +232,25 @@ class ChunkExecutor:
         if dry_run:
             return self._dry_run_execution(work_plan.chunks)
         
+        return asyncio.run(self.aexecute_chunks(work_plan, blueprint, context_serialization, output_dir))
+    
+    async def aexecute_chunks(self, work_plan: WorkPlan, blueprint: ProjectBlueprint,
+                              context_serialization: Dict[str, Any], output_dir: str) -> Dict[str, Any]:
+        """
+        Execute all work chunks, running independent ones concurrently
+        
+        Every chunk whose dependencies have finished is dispatched, with at most
+        the orchestrator's max_parallel_tasks agent calls in flight.
+        """
         # Create output directory
         os.makedirs(output_dir, exist_ok=True)
         
         # Convert chunks to tasks
         tasks = self._convert_chunks_to_tasks(work_plan.chunks, blueprint, context_serialization)
-        
-        # Execute tasks in dependency order
-        execution_results = {}
-        for task in self._sort_tasks_by_dependencies(tasks):
-            result = self._execute_task(task, output_dir, execution_results)
-            execution_results[task.id] = result
+        try:
+            execution_results = await self._execute_tasks_concurrently(tasks, output_dir)
+        finally:
+            self.close()
         
         return {
             'total_chunks': len(work_plan.chunks),
@@ -106,6 +284,8 @@ class ChunkExecutor:
                                 context_serialization: Dict[str, Any]) -> List[Task]:
         """Convert work chunks to Task objects"""
         tasks = []
+        # Plan-wide part of the context, shared by the context of every chunk
+        shared_context = self._create_shared_context(blueprint, context_serialization)
         
         for chunk in chunks:
             agent_type = self._determine_agent_type(chunk)
@@ -114,7 +294,7 @@ class ChunkExecutor:
                 agent_type = AgentType.BACKEND  # Default fallback
             
             # Create context for this specific chunk
-            chunk_context = self._create_chunk_context(chunk, blueprint, context_serialization)
+            chunk_context = self._create_chunk_context(chunk, blueprint, context_serialization, shared_context)
             
             task = Task(
                 id=chunk['id'],
@@ -139,83 +319,79 @@ class ChunkExecutor:
         scope = chunk.get('scope', [])
         
         # Check adapter name first
-        if 'react' in adapter_required or 'frontend' in adapter_required:
-            return AgentType.FRONTEND
-        elif 'node' in adapter_required or 'express' in adapter_required or 'backend' in adapter_required:
-            return AgentType.BACKEND
-        elif 'mongodb' in adapter_required or 'database' in adapter_required or 'sql' in adapter_required:
-            return AgentType.DATABASE
-        elif 'test' in adapter_required:
-            return AgentType.TESTING
-        elif 'doc' in adapter_required:
-            return AgentType.DOCUMENTATION
-        
-        # Enhanced keyword matching for chunk name and description
-        frontend_keywords = ['ui', 'frontend', 'react', 'component', 'interface', 'client', 'view', 'page']
-        backend_keywords = ['api', 'backend', 'server', 'endpoint', 'service', 'controller', 'authentication', 'auth', 'crud', 'route']
-        database_keywords = ['database', 'schema', 'model', 'migration', 'query', 'collection', 'table']
-        test_keywords = ['test', 'testing', 'spec', 'unit', 'integration']
-        
-        text_to_check = f"{chunk_name} {description}".lower()
-        
-        if any(keyword in text_to_check for keyword in frontend_keywords):
-            return AgentType.FRONTEND
-        elif any(keyword in text_to_check for keyword in backend_keywords):
-            return AgentType.BACKEND
-        elif any(keyword in text_to_check for keyword in database_keywords):
-            return AgentType.DATABASE
-        elif any(keyword in text_to_check for keyword in test_keywords):
-            return AgentType.TESTING
+        for pattern, agent_type in _ADAPTER_PATTERNS:
+            if pattern.search(adapter_required):
+                return agent_type
+        
+        text_to_check = f"{chunk_name} {description}"
+        for pattern, agent_type in _KEYWORD_PATTERNS:
+            if pattern.search(text_to_check):
+                return agent_type
         
         # Check file paths in scope for better detection
         if scope:
-            frontend_paths = ['client/', 'src/components', 'public/', 'assets/', '.jsx', '.tsx', '.html', '.css', '.scss']
-            backend_paths = ['server/', 'api/', 'controllers/', 'routes/', 'middleware/', '.js', '.py', '.java']
-            database_paths = ['models/', 'schemas/', 'migrations/', 'database/']
-            
             scope_text = ' '.join(scope).lower()
-            
-            if any(path in scope_text for path in frontend_paths):
-                return AgentType.FRONTEND
-            elif any(path in scope_text for path in backend_paths):
-                return AgentType.BACKEND
-            elif any(path in scope_text for path in database_paths):
-                return AgentType.DATABASE
+            for pattern, agent_type in _SCOPE_PATTERNS:
+                if pattern.search(scope_text):
+                    return agent_type
         
         # If we still can't determine, make educated guesses based on common patterns
-        if 'authentication' in text_to_check or 'auth' in text_to_check:
-            return AgentType.BACKEND  # Auth is typically backend
-        elif 'crud' in text_to_check:
-            return AgentType.BACKEND  # CRUD operations are typically backend
-        elif 'comment' in text_to_check or 'like' in text_to_check:
-            return AgentType.BACKEND  # Social features are typically backend
+        if _BACKEND_GUESS_PATTERN.search(text_to_check):
+            return AgentType.BACKEND
         
         return None
     
     def _create_chunk_context(self, chunk: Dict[str, Any], blueprint: ProjectBlueprint,
-                             context_serialization: Dict[str, Any]) -> Dict[str, Any]:
-        """Create context for a specific chunk with enhanced tech stack information"""
+                             context_serialization: Dict[str, Any],
+                             shared_context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Create context for a specific chunk with enhanced tech stack information
+        
+        shared_context is the plan's _create_shared_context(), when the caller
+        already has it; its values are referenced, not copied, so chunks sharing
+        it must treat them as read-only.
+        """
+        if shared_context is None:
+            shared_context = self._create_shared_context(blueprint, context_serialization)
+        
+        context = {
+            'chunk_info': chunk,
+            'chunk_context': context_serialization.get('chunk_contexts', {}).get(chunk['id'], {}),
+        }
+        context.update(shared_context)
+        return context
+    
+    def _create_shared_context(self, blueprint: ProjectBlueprint,
+                               context_serialization: Dict[str, Any]) -> Dict[str, Any]:
+        """Create the part of the chunk context that is the same for every chunk of a plan"""
         # Extract tech stack details for better agent context
         tech_stack = blueprint.tech_stack
         
-        # Create framework-specific context
-        framework_context = self._create_framework_context(tech_stack, chunk)
-        
         return {
-            'chunk_info': chunk,
-            'project_blueprint': asdict(blueprint),
+            'project_blueprint': blueprint.to_dict(),
             'global_context': context_serialization.get('global_context', {}),
-            'chunk_context': context_serialization.get('chunk_contexts', {}).get(chunk['id'], {}),
             'project_name': blueprint.project_name,
             'description': blueprint.description,
             'tech_stack': tech_stack,
             'architecture': blueprint.architecture,
-            'framework_context': framework_context,
+            'framework_context': self._get_framework_context(tech_stack),
             'dependencies': blueprint.dependencies,
             'file_structure': blueprint.file_structure
         }
     
-    def _create_framework_context(self, tech_stack: Dict[str, Any], chunk: Dict[str, Any]) -> Dict[str, Any]:
+    def _get_framework_context(self, tech_stack: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Get the framework context of a tech stack, built once per distinct tech stack
+        
+        Every chunk of a project shares the returned dict, so it must not be modified.
+        """
+        key = json.dumps(tech_stack, sort_keys=True, default=str)
+        framework_context = self._framework_context_cache.get(key)
+        if framework_context is None:
+            framework_context = self._framework_context_cache[key] = self._create_framework_context(tech_stack)
+        return framework_context
+    
+    def _create_framework_context(self, tech_stack: Dict[str, Any]) -> Dict[str, Any]:
         """Create framework-specific context to guide agents"""
         framework_context = {
             'primary_frameworks': {},
@@ -234,36 +410,13 @@ class ChunkExecutor:
                 framework_context['specific_instructions'].append(
                     'Use JSX syntax, not Vue template syntax'
                 )
-                framework_context['code_examples']['react_component'] = '''
-import React, { useState } from 'react';
-
-function ComponentName() {
-  const [state, setState] = useState(initialValue);
-  
-  return (
-    <div>
-      <button onClick={handleClick}>Click me</button>
-    </div>
-  );
-}
-
-export default ComponentName;'''
+                framework_context['code_examples']['react_component'] = _REACT_COMPONENT_EXAMPLE
             elif 'Vue' in frontend_frameworks or 'Vue.js' in frontend_frameworks:
                 framework_context['primary_frameworks']['frontend'] = 'Vue'
                 framework_context['specific_instructions'].append(
                     'Use Vue 3 composition API with <script setup>'
                 )
-                framework_context['code_examples']['vue_component'] = '''
-<template>
-  <div>
-    <button @click="handleClick">Click me</button>
-  </div>
-</template>
-
-<script setup>
-import { ref } from 'vue';
-const state = ref(initialValue);
-</script>'''
+                framework_context['code_examples']['vue_component'] = _VUE_COMPONENT_EXAMPLE
             elif 'Angular' in frontend_frameworks:
                 framework_context['primary_frameworks']['frontend'] = 'Angular'
                 framework_context['specific_instructions'].append(
@@ -278,15 +431,7 @@ const state = ref(initialValue);
                 framework_context['specific_instructions'].append(
                     'Use Express.js for REST API endpoints'
                 )
-                framework_context['code_examples']['express_route'] = '''
-const express = require('express');
-const router = express.Router();
-
-router.get('/api/endpoint', (req, res) => {
-  res.json({ message: 'Success' });
-});
-
-module.exports = router;'''
+                framework_context['code_examples']['express_route'] = _EXPRESS_ROUTE_EXAMPLE
             elif 'FastAPI' in backend_frameworks:
                 framework_context['primary_frameworks']['backend'] = 'FastAPI'
                 framework_context['specific_instructions'].append(
@@ -306,15 +451,7 @@ module.exports = router;'''
                 framework_context['specific_instructions'].append(
                     'Use Mongoose for MongoDB object modeling'
                 )
-                framework_context['code_examples']['mongoose_model'] = '''
-const mongoose = require('mongoose');
-
-const schema = new mongoose.Schema({
-  field: { type: String, required: true },
-  createdAt: { type: Date, default: Date.now }
-});
-
-module.exports = mongoose.model('ModelName', schema);'''
+                framework_context['code_examples']['mongoose_model'] = _MONGOOSE_MODEL_EXAMPLE
             elif 'PostgreSQL' in database_systems:
                 framework_context['primary_frameworks']['database'] = 'PostgreSQL'
                 framework_context['specific_instructions'].append(
@@ -341,53 +478,85 @@ module.exports = mongoose.model('ModelName', schema);'''
         }
         return effort_map.get(chunk.get('estimated_effort', 'medium'), 60)
     
-    def _sort_tasks_by_dependencies(self, tasks: List[Task]) -> List[Task]:
-        """Sort tasks by their dependencies (topological sort)"""
-        # Simple implementation - can be enhanced with proper topological sorting
-        task_dict = {task.id: task for task in tasks}
-        sorted_tasks = []
-        processed = set()
-        
-        def process_task(task_id: str):
-            if task_id in processed:
-                return
-            
-            task = task_dict.get(task_id)
-            if not task:
-                return
+    def _max_concurrent_tasks(self) -> int:
+        """Get how many agent calls may be in flight at once"""
+        orchestrator = getattr(self.config, 'orchestrator', None)
+        return getattr(orchestrator, 'max_parallel_tasks', None) or _DEFAULT_MAX_CONCURRENT_TASKS
+    
+    async def _execute_tasks_concurrently(self, tasks: List[Task], output_dir: str) -> Dict[str, Any]:
+        """
+        Execute tasks as soon as their dependencies have finished
+        
+        A task runs once each of its dependencies has finished, successfully or
+        not, as in sequential execution; dependencies on chunks outside the plan
+        are ignored. When more tasks are ready than may run at once, the highest
+        priority ones start first, ties going to plan order. Results are keyed
+        by task id.
+        """
+        task_ids = {task.id for task in tasks}
+        waiting = {task.id: {dep_id for dep_id in task.dependencies if dep_id in task_ids} for task in tasks}
+        dependents: Dict[str, List[int]] = {}
+        for index, task in enumerate(tasks):
+            for dep_id in waiting[task.id]:
+                dependents.setdefault(dep_id, []).append(index)
+        
+        max_concurrent = self._max_concurrent_tasks()
+        execution_results = {}
+        in_flight: Dict[asyncio.Future, Task] = {}
+        
+        # Ready tasks as (-priority, plan position), so the heap pops the most urgent first
+        ready = [(-task.priority, index) for index, task in enumerate(tasks) if not waiting[task.id]]
+        heapq.heapify(ready)
+        remaining = len(tasks)
+        while remaining:
+            if not ready and not in_flight:
+                # Only tasks in a dependency cycle are left; run them in plan order
+                self.logger.warning("Dependency cycle between chunks; running the remaining chunks in plan order")
+                for index, task in enumerate(tasks):
+                    if task.id not in execution_results and waiting[task.id]:
+                        waiting[task.id].clear()
+                        heapq.heappush(ready, (0, index))
             
-            # Process dependencies first
-            for dep_id in task.dependencies:
-                if dep_id in task_dict:
-                    process_task(dep_id)
+            while ready and len(in_flight) < max_concurrent:
+                task = tasks[heapq.heappop(ready)[1]]
+                in_flight[asyncio.ensure_future(self._aexecute_task(task, output_dir, execution_results))] = task
             
-            sorted_tasks.append(task)
-            processed.add(task_id)
-        
-        # Process all tasks
-        for task in tasks:
-            process_task(task.id)
-        
-        return sorted_tasks
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                task = in_flight.pop(future)
+                execution_results[task.id] = future.result()
+                remaining -= 1
+                # Finishing this task may make its dependents ready for the next dispatch
+                for index in dependents.get(task.id, ()):
+                    dependent_waiting = waiting[tasks[index].id]
+                    if task.id in dependent_waiting:
+                        dependent_waiting.discard(task.id)
+                        if not dependent_waiting:
+                            heapq.heappush(ready, (-tasks[index].priority, index))
+        
+        return execution_results
     
-    def _execute_task(self, task: Task, output_dir: str, 
-                     previous_results: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute a single task using the appropriate agent"""
+    async def _aexecute_task(self, task: Task, output_dir: str,
+                             previous_results: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute a single task using the appropriate agent, without blocking the event loop"""
         self.logger.info(f"Executing task: {task.name} (Agent: {task.agent_type.value})")
         
         try:
             # Get or create agent
             agent = self._get_agent(task.agent_type)
             
-            # Add previous results to context
-            task.context['previous_results'] = previous_results
+            # Add the results of this task's dependencies to a copy of its context,
+            # leaving task.context as built
+            dependency_results = {dep_id: previous_results[dep_id]
+                                  for dep_id in task.dependencies if dep_id in previous_results}
+            context = dict(task.context, previous_results=dependency_results)
             
             # Execute task
-            result = agent.run_task(task, task.context)
+            result = await agent.arun_task(task, context)
             
             if result.success:
-                # Save generated files
-                self._save_generated_files(result.files, output_dir)
+                # Save generated files, off the event loop
+                await asyncio.to_thread(self._save_generated_files, result.files, output_dir)
                 
                 self.logger.info(f"✅ Task {task.name} completed successfully")
                 return {
@@ -414,8 +583,9 @@ module.exports = mongoose.model('ModelName', schema);'''
     
     def _get_agent(self, agent_type: AgentType):
         """Get or create an agent of the specified type"""
-        if agent_type in self.agents_cache:
-            return self.agents_cache[agent_type]
+        agent = self.agents_cache.get(agent_type)
+        if agent is not None:
+            return agent
         
         # Get model configuration from config
         model_config = self._get_model_config_for_agent(agent_type)
@@ -435,6 +605,7 @@ module.exports = mongoose.model('ModelName', schema);'''
         if not agent_class:
             raise ValueError(f"No agent class found for type: {agent_type}")
         
+        # Only called from the event loop thread, so no other agent of this type can have been created meanwhile
         agent = agent_class(agent_config, model_config)
         self.agents_cache[agent_type] = agent
         
@@ -468,84 +639,34 @@ module.exports = mongoose.model('ModelName', schema);'''
     
     def _get_system_prompt_for_agent(self, agent_type: AgentType) -> str:
         """Get system prompt template for a specific agent type"""
-        prompts = {
-            AgentType.FRONTEND: """You are a frontend development expert specializing in React, HTML, CSS, and JavaScript.
-Your task is to generate high-quality frontend code based on the given requirements.
-
-Focus on:
-- Clean, maintainable React components
-- Modern JavaScript/TypeScript patterns
-- Responsive CSS design
-- User experience best practices
-- Accessibility considerations
-
-Generate complete, working code files that can be directly used in a project.""",
-            
-            AgentType.BACKEND: """You are a backend development expert specializing in Node.js, Express, and API development.
-Your task is to generate high-quality backend code based on the given requirements.
-
-Focus on:
-- RESTful API design
-- Proper error handling
-- Security best practices
-- Database integration
-- Authentication and authorization
-- Clean code architecture
-
-Generate complete, working code files that can be directly used in a project.""",
-            
-            AgentType.DATABASE: """You are a database expert specializing in MongoDB, schema design, and data modeling.
-Your task is to generate high-quality database code based on the given requirements.
-
-Focus on:
-- Efficient schema design
-- Proper indexing strategies
-- Data validation
-- Migration scripts
-- Query optimization
-- Database security
-
-Generate complete, working database schemas and models that can be directly used in a project.""",
-            
-            AgentType.TESTING: """You are a testing expert specializing in unit tests, integration tests, and test automation.
-Your task is to generate comprehensive test suites based on the given requirements.
-
-Focus on:
-- Complete test coverage
-- Clear test descriptions
-- Proper test structure
-- Mock and stub usage
-- Edge case testing
-- Performance testing
-
-Generate complete, working test files that can be directly used in a project.""",
-            
-            AgentType.DOCUMENTATION: """You are a documentation expert specializing in technical writing and API documentation.
-Your task is to generate clear, comprehensive documentation based on the given requirements.
-
-Focus on:
-- Clear explanations
-- Code examples
-- API documentation
-- Setup instructions
-- Usage guidelines
-- Best practices
-
-Generate complete, well-structured documentation that helps developers understand and use the code."""
-        }
-        
-        return prompts.get(agent_type, "You are a software development expert. Generate high-quality code based on the given requirements.")
+        return _SYSTEM_PROMPTS.get(agent_type, _DEFAULT_SYSTEM_PROMPT)
+    
+    def _get_file_writer(self) -> ThreadPoolExecutor:
+        """Get the thread pool writing files, creating it on first use"""
+        with self._file_writer_lock:
+            if self._file_writer is None:
+                self._file_writer = ThreadPoolExecutor(max_workers=os.cpu_count() or 1,
+                                                       thread_name_prefix='chunk-file-writer')
+            return self._file_writer
     
     def _save_generated_files(self, files: Dict[str, str], output_dir: str):
-        """Save generated files to the output directory"""
-        for filename, content in files.items():
-            file_path = os.path.join(output_dir, filename)
-            
-            # Create directory if it doesn't exist
-            os.makedirs(os.path.dirname(file_path), exist_ok=True)
-            
-            # Write file
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-            
-            self.logger.debug(f"Saved file: {file_path}")
\ No newline at end of file
+        """Save generated files to the output directory, several at once when there are many"""
+        file_paths = {filename: os.path.join(output_dir, filename) for filename in files}
+        
+        # Create each directory once, rather than once per file in it
+        for directory in {os.path.dirname(file_path) for file_path in file_paths.values()}:
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        
+        def write(filename: str):
+            with open(file_paths[filename], 'w', encoding='utf-8') as f:
+                f.write(files[filename])
+            self.logger.debug(f"Saved file: {file_paths[filename]}")
+        
+        if len(files) <= 1:
+            for filename in files:
+                write(filename)
+            return
+        
+        # File writes release the GIL; list() re-raises the first failed write
+        list(self._get_file_writer().map(write, files))
\ No newline at end of file
@@ -0,0 +1,42 @@
+"""
+Combined Design Prompt
+
+Asks for the project blueprint and its adapter plan in a single LLM request,
+saving the round trip of planning adapters in a second request.
+"""
+
+from . import _fastjson
+from .models import DesignRequest
+
+# Stands in for the blueprint in the adapter planning prompt; the model writes it in the same response
+_BLUEPRINT_PLACEHOLDER = "(the blueprint you create in PART 1)"
+
+_RESPONSE_FORMAT = """
+Do both parts in this one response. Respond ONLY with a valid JSON object with exactly two keys:
+{"blueprint": <the blueprint, in the PART 1 format>, "adapter_plan": <the adapter plan, in the PART 2 format>}
+"""
+
+
+def build_combined_prompt(blueprint_generator, adapter_planner, request: DesignRequest) -> str:
+    """
+    Build the prompt asking for both the blueprint and the adapter plan
+    
+    Args:
+        blueprint_generator: BlueprintGenerator whose prompt forms part 1
+        adapter_planner: AdapterPlanner whose prompt forms part 2
+        request: Design request
+    
+    Returns:
+        Prompt whose response is a JSON object with "blueprint" and "adapter_plan" keys
+    """
+    adapter_part = adapter_planner.adapter_planning_prompt.format_map({
+        "blueprint": _BLUEPRINT_PLACEHOLDER,
+        "requirements": _fastjson.dumps(request.requirements)
+    })
+    return (
+        "PART 1 - PROJECT BLUEPRINT\n"
+        f"{blueprint_generator.format_prompt(request)}\n"
+        "PART 2 - LORA ADAPTER PLAN\n"
+        f"{adapter_part}\n"
+        f"{_RESPONSE_FORMAT}"
+    )
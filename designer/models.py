@@ -4,13 +4,28 @@ Designer data models
 Shared data classes for the Designer LLM system to avoid circular imports.
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from typing import Dict, List, Any
 from datetime import datetime
 
+from . import _fastjson
+
+
+class _PlainFields:
+    """Mixin for dataclasses whose fields hold only plain JSON-style values"""
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get the fields as a dict
+        
+        Unlike dataclasses.asdict this doesn't deep-copy nested lists and
+        dicts, so the values are the object's own; meant for serializing.
+        """
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
 
 @dataclass
-class DesignRequest:
+class DesignRequest(_PlainFields):
     """User's design request"""
     prompt: str
     requirements: List[str]
@@ -20,7 +35,7 @@ class DesignRequest:
 
 
 @dataclass
-class ProjectBlueprint:
+class ProjectBlueprint(_PlainFields):
     """Complete project blueprint"""
     project_name: str
     description: str
@@ -30,10 +45,25 @@ class ProjectBlueprint:
     file_structure: Dict[str, Any]
     dependencies: List[str]
     estimated_complexity: str
+    
+    # JSON of the blueprint, filled in by blueprint_to_json (a plain attribute, not a dataclass field)
+    _json_cache = None
+
+
+def blueprint_to_json(blueprint: ProjectBlueprint) -> str:
+    """
+    Serialize a blueprint to indented JSON, once
+    
+    Blueprints aren't modified after they are created, so the JSON is kept
+    on the blueprint and reused by every prompt that embeds it.
+    """
+    if blueprint._json_cache is None:
+        blueprint._json_cache = _fastjson.dumps(blueprint.to_dict(), indent=True)
+    return blueprint._json_cache
 
 
 @dataclass
-class AdapterPlan:
+class AdapterPlan(_PlainFields):
     """Plan for LoRA adapters needed"""
     required_adapters: List[Dict[str, Any]]
     adapter_dependencies: Dict[str, List[str]]
@@ -42,7 +72,7 @@ class AdapterPlan:
 
 
 @dataclass
-class WorkPlan:
+class WorkPlan(_PlainFields):
     """Chunked work plan for specialized agents"""
     chunks: List[Dict[str, Any]]
     execution_order: List[str]
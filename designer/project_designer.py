@@ -9,20 +9,30 @@ Takes high-level user prompts and orchestrates the design process:
 5. Coordinates specialized agents
 """
 
+import asyncio
 import json
 import logging
 import os
-from typing import Dict, List, Any, Optional
-from dataclasses import asdict
+import weakref
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 
 from .models import DesignRequest, ProjectBlueprint, AdapterPlan, WorkPlan, DesignResult
+from . import _fastjson, _llm_client
 from .blueprint_generator import BlueprintGenerator
+from .combined_prompt import build_combined_prompt
 from .adapter_planner import AdapterPlanner
 from .work_chunker import WorkChunker
+from utils import llm_cache
 from utils.config_loader import ConfigLoader
 import logging
 
+# Connection pool of the shared async client, kept warm so requests skip new TLS handshakes
+_MAX_CONNECTIONS = 64
+_MAX_KEEPALIVE_CONNECTIONS = 32
+# Retries of failed connection attempts, on top of the SDK's request retries
+_CONNECT_RETRIES = 2
+
 
 class ProjectDesigner:
     """
@@ -34,9 +44,11 @@ class ProjectDesigner:
         config_loader = ConfigLoader(config_path)
         self.config = config_loader.config
         
-        # Initialize sub-components
-        self.blueprint_generator = BlueprintGenerator(self.config)
-        self.adapter_planner = AdapterPlanner(self.config)
+        # Initialize sub-components; the LLM-backed ones share one async client and its connection pool
+        # per event loop, created when they first need it there
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+        self.blueprint_generator = BlueprintGenerator(self.config, self._shared_async_client)
+        self.adapter_planner = AdapterPlanner(self.config, self._shared_async_client)
         self.work_chunker = WorkChunker(self.config)
         
         # Designer LLM prompt templates
@@ -125,29 +137,182 @@ Respond in JSON format with your orchestration plan.
         Returns:
             DesignResult containing complete design plan
         """
-        self.logger.info(f"Starting project design for: {prompt[:100]}...")
+        self.logger.info("Starting project design for: %.100s...", prompt)
+        request = self._create_request(prompt, requirements, constraints, preferences)
+        
+        # Steps 1 and 2 in a single request, when the response to it is usable
+        planned = self._plan_in_one_request(request)
+        if planned:
+            blueprint, adapter_plan = planned
+        else:
+            # Step 1: Analyze the request and create blueprint
+            self.logger.info("Step 1: Analyzing request and creating blueprint...")
+            blueprint = self.blueprint_generator.create_blueprint(request)
+            
+            # Step 2: Plan required LoRA adapters
+            self.logger.info("Step 2: Planning LoRA adapters...")
+            adapter_plan = self.adapter_planner.plan_adapters(blueprint, request)
+        
+        # Step 3: Break work into chunks
+        self.logger.info("Step 3: Breaking work into chunks...")
+        work_plan = self.work_chunker.create_work_chunks(blueprint, adapter_plan)
+        
+        return self._complete_design(request, blueprint, adapter_plan, work_plan)
+    
+    async def adesign_project(self, prompt: str, requirements: List[str] = None,
+                              constraints: List[str] = None, preferences: Dict[str, Any] = None) -> DesignResult:
+        """
+        Design a project without blocking the event loop
+        
+        Several designs can run concurrently on one event loop, each waiting
+        on its own LLM calls. Arguments are the same as design_project.
+        
+        Returns:
+            DesignResult containing complete design plan
+        """
+        self.logger.info("Starting project design for: %.100s...", prompt)
+        request = self._create_request(prompt, requirements, constraints, preferences)
+        
+        # Steps 1 and 2 in a single request, when the response to it is usable
+        planned = await self._aplan_in_one_request(request)
+        if planned:
+            blueprint, adapter_plan = planned
+        else:
+            # Step 1: Analyze the request and create blueprint
+            self.logger.info("Step 1: Analyzing request and creating blueprint...")
+            blueprint = await self.blueprint_generator.acreate_blueprint(request)
+            
+            # Step 2: Plan required LoRA adapters
+            self.logger.info("Step 2: Planning LoRA adapters...")
+            adapter_plan = await self.adapter_planner.aplan_adapters(blueprint, request)
+        
+        # Step 3: Break work into chunks (blocking, so off the event loop)
+        self.logger.info("Step 3: Breaking work into chunks...")
+        work_plan = await asyncio.to_thread(self.work_chunker.create_work_chunks, blueprint, adapter_plan)
+        
+        return self._complete_design(request, blueprint, adapter_plan, work_plan)
+    
+    def _plan_in_one_request(self, request: DesignRequest) -> Optional[Tuple[ProjectBlueprint, AdapterPlan]]:
+        """
+        Create the blueprint and adapter plan with a single LLM request
+        
+        Returns None if there is no API client, the request fails or the
+        response lacks either part; the caller then runs the steps one by one.
+        """
+        client = self.blueprint_generator.llm_client.api_client
+        if not client:
+            return None
+        
+        self.logger.info("Steps 1-2: Creating blueprint and planning LoRA adapters in one request...")
+        prompt = build_combined_prompt(self.blueprint_generator, self.adapter_planner, request)
+        cache_key = _llm_client.cache_key(prompt)
+        response = llm_cache.get(cache_key)
+        
+        if response is None:
+            try:
+                response, _ = _llm_client.request_json(client, prompt)
+            except Exception as e:
+                self.logger.warning(f"Combined design request failed: {e}")
+                return None
+        
+        return self._parse_combined_response(response, cache_key)
+    
+    async def _aplan_in_one_request(self, request: DesignRequest) -> Optional[Tuple[ProjectBlueprint, AdapterPlan]]:
+        """Create the blueprint and adapter plan with a single LLM request, without blocking the event loop"""
+        llm_client = self.blueprint_generator.llm_client
+        client = llm_client.async_api_client
+        if not client:
+            return None
+        
+        self.logger.info("Steps 1-2: Creating blueprint and planning LoRA adapters in one request...")
+        prompt = build_combined_prompt(self.blueprint_generator, self.adapter_planner, request)
+        cache_key = _llm_client.cache_key(prompt)
+        response = llm_cache.get(cache_key)
+        
+        if response is None:
+            try:
+                async with llm_client.request_semaphore():
+                    response, _ = await _llm_client.arequest_json(client, prompt)
+            except Exception as e:
+                self.logger.warning(f"Combined design request failed: {e}")
+                return None
+        
+        return self._parse_combined_response(response, cache_key)
+    
+    def _parse_combined_response(self, response: str, cache_key: str) -> Optional[Tuple[ProjectBlueprint, AdapterPlan]]:
+        """Split a combined response into the blueprint and adapter plan, caching it if both are there"""
+        try:
+            data = _fastjson.loads(response)
+            blueprint = self.blueprint_generator.blueprint_from_data(data['blueprint'])
+            adapter_plan = self.adapter_planner.adapter_plan_from_data(data['adapter_plan'])
+        except Exception as e:
+            self.logger.warning(f"Unusable combined design response, planning step by step: {e}")
+            return None
+        
+        llm_cache.put(cache_key, response)
+        return blueprint, adapter_plan
+    
+    def _shared_async_client(self):
+        """
+        Get the AsyncOpenAI client shared by the designer components on the running event loop
         
-        # Create design request
-        request = DesignRequest(
+        Pooled connections belong to the loop that opened them, so each loop
+        (e.g. each asyncio.run) gets its own client, created on first use.
+        """
+        loop = asyncio.get_running_loop()
+        if loop not in self._async_clients:
+            self._async_clients[loop] = self._create_async_client()
+        return self._async_clients[loop]
+    
+    def _create_async_client(self):
+        """Create the AsyncOpenAI client shared by the designer components, or None if unavailable"""
+        try:
+            import openai
+        except ImportError:
+            return None
+        api_key = os.getenv('OPENAI_API_KEY')
+        if not api_key:
+            return None
+        return openai.AsyncOpenAI(api_key=api_key, http_client=self._create_http_client())
+    
+    def _create_http_client(self):
+        """
+        Create the pooled httpx client behind the shared AsyncOpenAI client
+        
+        Requests are multiplexed over HTTP/2 when the h2 package is installed.
+        """
+        import httpx
+        import openai
+        try:
+            import h2  # noqa: F401
+            http2 = True
+        except ImportError:
+            http2 = False
+        transport = httpx.AsyncHTTPTransport(
+            http2=http2,
+            retries=_CONNECT_RETRIES,
+            limits=httpx.Limits(
+                max_connections=_MAX_CONNECTIONS,
+                max_keepalive_connections=_MAX_KEEPALIVE_CONNECTIONS
+            )
+        )
+        # Keep the SDK's request timeout rather than httpx's much shorter default
+        return httpx.AsyncClient(transport=transport, timeout=openai.DEFAULT_TIMEOUT)
+    
+    def _create_request(self, prompt: str, requirements: Optional[List[str]], constraints: Optional[List[str]],
+                        preferences: Optional[Dict[str, Any]]) -> DesignRequest:
+        """Create the design request for a prompt"""
+        return DesignRequest(
             prompt=prompt,
             requirements=requirements or [],
             constraints=constraints or [],
             preferences=preferences or {},
             timestamp=datetime.now().isoformat()
         )
-        
-        # Step 1: Analyze the request and create blueprint
-        self.logger.info("Step 1: Analyzing request and creating blueprint...")
-        blueprint = self.blueprint_generator.create_blueprint(request)
-        
-        # Step 2: Plan required LoRA adapters
-        self.logger.info("Step 2: Planning LoRA adapters...")
-        adapter_plan = self.adapter_planner.plan_adapters(blueprint, request)
-        
-        # Step 3: Break work into chunks
-        self.logger.info("Step 3: Breaking work into chunks...")
-        work_plan = self.work_chunker.create_work_chunks(blueprint, adapter_plan)
-        
+    
+    def _complete_design(self, request: DesignRequest, blueprint: ProjectBlueprint,
+                         adapter_plan: AdapterPlan, work_plan: WorkPlan) -> DesignResult:
+        """Add the context serialization and orchestration plans to finish a design"""
         # Step 4: Create context serialization plan
         self.logger.info("Step 4: Creating context serialization...")
         context_serialization = self._create_context_serialization(blueprint, work_plan)
@@ -245,43 +410,29 @@ Respond in JSON format with your orchestration plan.
         import os
         os.makedirs(output_path, exist_ok=True)
         
+        # Convert dataclasses to dict for JSON serialization, once for both
+        # the main design file and the individual component files
+        result_dict = {
+            'request': result.request.to_dict(),
+            'blueprint': result.blueprint.to_dict(),
+            'adapter_plan': result.adapter_plan.to_dict(),
+            'work_plan': result.work_plan.to_dict(),
+            'context_serialization': result.context_serialization,
+            'orchestration_plan': result.orchestration_plan
+        }
+        
         # Save main design file
         design_file = os.path.join(output_path, 'design_result.json')
         with open(design_file, 'w', encoding='utf-8') as f:
-            # Convert dataclasses to dict for JSON serialization
-            result_dict = {
-                'request': asdict(result.request),
-                'blueprint': asdict(result.blueprint),
-                'adapter_plan': asdict(result.adapter_plan),
-                'work_plan': asdict(result.work_plan),
-                'context_serialization': result.context_serialization,
-                'orchestration_plan': result.orchestration_plan
-            }
             json.dump(result_dict, f, indent=2, ensure_ascii=False)
         
         # Save individual components
         components_dir = os.path.join(output_path, 'components')
         os.makedirs(components_dir, exist_ok=True)
         
-        # Save blueprint
-        with open(os.path.join(components_dir, 'blueprint.json'), 'w') as f:
-            json.dump(asdict(result.blueprint), f, indent=2)
-        
-        # Save adapter plan
-        with open(os.path.join(components_dir, 'adapter_plan.json'), 'w') as f:
-            json.dump(asdict(result.adapter_plan), f, indent=2)
-        
-        # Save work plan
-        with open(os.path.join(components_dir, 'work_plan.json'), 'w') as f:
-            json.dump(asdict(result.work_plan), f, indent=2)
-        
-        # Save context serialization
-        with open(os.path.join(components_dir, 'context_serialization.json'), 'w') as f:
-            json.dump(result.context_serialization, f, indent=2)
-        
-        # Save orchestration plan
-        with open(os.path.join(components_dir, 'orchestration_plan.json'), 'w') as f:
-            json.dump(result.orchestration_plan, f, indent=2)
+        for component in ('blueprint', 'adapter_plan', 'work_plan', 'context_serialization', 'orchestration_plan'):
+            with open(os.path.join(components_dir, f'{component}.json'), 'w') as f:
+                json.dump(result_dict[component], f, indent=2)
         
         self.logger.info(f"Design saved to {output_path}")
     
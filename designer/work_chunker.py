@@ -5,13 +5,15 @@ Breaks down the project into LLM-friendly work chunks that can be handled
 by specialized agents with specific LoRA adapters.
 """
 
-import json
 import logging
-import os
 from typing import Dict, List, Any
-from dataclasses import asdict
 
-from .models import ProjectBlueprint, AdapterPlan, WorkPlan
+from . import _fastjson
+from ._llm_client import LLMClient
+from .models import ProjectBlueprint, AdapterPlan, WorkPlan, blueprint_to_json
+
+# Work plan returned when no API client is available or the API call fails
+_FALLBACK_RESPONSE = '{"chunks": [{"id": "chunk1", "name": "Setup Project", "description": "Initialize project structure", "scope": ["package.json", "src/"], "adapter_required": "frontend_react", "inputs": [], "outputs": ["project_structure"], "dependencies": [], "estimated_effort": "small", "priority": "high", "constraints": []}], "execution_order": ["chunk1"], "dependencies": {}, "estimated_duration": "1 hour"}'
 
 
 class WorkChunker:
@@ -23,8 +25,8 @@ class WorkChunker:
         self.logger = logging.getLogger(__name__)
         self.config = config
         
-        # Initialize API client for response generation
-        self._init_api_client()
+        # API client for response generation
+        self.llm_client = LLMClient()
         
         self.chunking_prompt = """
 You are a Project Manager specializing in breaking down software projects into manageable work chunks.
@@ -84,39 +86,9 @@ Respond with JSON in this format:
 }}
 """
     
-    def _init_api_client(self):
-        """Initialize API client for response generation"""
-        try:
-            import openai
-            api_key = os.getenv('OPENAI_API_KEY')
-            if api_key:
-                self.api_client = openai.OpenAI(api_key=api_key)
-                self.logger.info("OpenAI API client initialized")
-            else:
-                self.api_client = None
-                self.logger.warning("No OpenAI API key found")
-        except ImportError:
-            self.api_client = None
-            self.logger.warning("OpenAI package not available")
-    
     def generate_response(self, prompt: str) -> str:
         """Generate response using API client"""
-        if not self.api_client:
-            # Return a fallback response for testing
-            return '{"chunks": [{"id": "chunk1", "name": "Setup Project", "description": "Initialize project structure", "scope": ["package.json", "src/"], "adapter_required": "frontend_react", "inputs": [], "outputs": ["project_structure"], "dependencies": [], "estimated_effort": "small", "priority": "high", "constraints": []}], "execution_order": ["chunk1"], "dependencies": {}, "estimated_duration": "1 hour"}'
-        
-        try:
-            response = self.api_client.chat.completions.create(
-                model="gpt-4",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=4096,
-                temperature=0.3
-            )
-            return response.choices[0].message.content.strip()
-        except Exception as e:
-            self.logger.error(f"API call failed: {e}")
-            # Return fallback response
-            return '{"chunks": [{"id": "chunk1", "name": "Setup Project", "description": "Initialize project structure", "scope": ["package.json", "src/"], "adapter_required": "frontend_react", "inputs": [], "outputs": ["project_structure"], "dependencies": [], "estimated_effort": "small", "priority": "high", "constraints": []}], "execution_order": ["chunk1"], "dependencies": {}, "estimated_duration": "1 hour"}'
+        return self.llm_client.generate_json(prompt, _FALLBACK_RESPONSE)
     
     def create_work_chunks(self, blueprint: ProjectBlueprint, adapter_plan: AdapterPlan) -> WorkPlan:
         """
@@ -126,8 +98,8 @@ Respond with JSON in this format:
         
         # Format prompt with blueprint and adapter data
         prompt = self.chunking_prompt.format(
-            blueprint=json.dumps(asdict(blueprint), indent=2),
-            adapters=json.dumps(adapter_plan.required_adapters, indent=2)
+            blueprint=blueprint_to_json(blueprint),
+            adapters=_fastjson.dumps(adapter_plan.required_adapters, indent=True)
         )
         
         try:
@@ -135,7 +107,7 @@ Respond with JSON in this format:
             response = self.generate_response(prompt)
             
             # Parse JSON response
-            work_data = json.loads(response)
+            work_data = _fastjson.loads(response)
             
             # Create WorkPlan object
             work_plan = WorkPlan(
@@ -148,10 +120,10 @@ Respond with JSON in this format:
             # Validate and enhance chunks
             work_plan = self._validate_and_enhance_chunks(work_plan, blueprint, adapter_plan)
             
-            self.logger.info(f"Created {len(work_plan.chunks)} work chunks")
+            self.logger.info("Created %d work chunks", len(work_plan.chunks))
             return work_plan
             
-        except json.JSONDecodeError as e:
+        except _fastjson.JSONDecodeError as e:
             self.logger.error(f"Failed to parse work plan JSON: {e}")
             return self._create_fallback_work_plan(blueprint, adapter_plan)
         except Exception as e:
@@ -18,6 +18,8 @@ from agents.orchestrator import Orchestrator
 from utils.logger import setup_logging
 from utils.config_loader import ConfigLoader
 
+__version__ = "0.1.0"
+
 
 def create_parser():
     """Create command-line argument parser."""
@@ -49,7 +51,7 @@ Examples:
     parser.add_argument(
         "--version", 
         action="version", 
-        version="LLM Swarm 0.1.0"
+        version=f"LLM Swarm {__version__}"
     )
     
     parser.add_argument(
@@ -96,6 +98,11 @@ Examples:
         action="store_true",
         help="Show execution plan without generating code"
     )
+    generate_parser.add_argument(
+        "--use-batch-api",
+        action="store_true",
+        help="Plan through the provider's batch API (about half the cost, may take hours)"
+    )
     generate_parser.add_argument(
         "--force",
         action="store_true",
@@ -309,7 +316,7 @@ def cmd_generate(args):
         else:
             print("🚀 Starting project generation...")
         
-        success = orchestrator.run(project_spec, dry_run=args.dry_run)
+        success = orchestrator.run(project_spec, dry_run=args.dry_run, use_batch_api=args.use_batch_api)
         
         if success:
             if args.dry_run:
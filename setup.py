@@ -29,12 +29,15 @@ setup(
     author_email="team@llmswarm.dev",
     url="https://github.com/your-username/llm-swarm",
     packages=find_packages(),
+    # Top-level scripts behind the console entry points
+    py_modules=["main", "demo"],
     include_package_data=True,
     install_requires=requirements,
     python_requires=">=3.8",
     entry_points={
         "console_scripts": [
             "llm-swarm=main:main",
+            "llm-swarm-demo=demo:main",
         ],
     },
     classifiers=[
@@ -34,6 +34,14 @@ def test_config_loader():
         errors = config_loader.validate_config()
         if errors:
             print(f"⚠️  Config validation warnings: {errors}")
+        assert config_loader.validate_config() == errors
+        
+        # Cached results are returned as copies and rebuilt on reload
+        enabled_agents = config_loader.get_enabled_agents()
+        enabled_agents.append("not_an_agent")
+        assert "not_an_agent" not in config_loader.get_enabled_agents()
+        assert config_loader.reload_config()
+        assert config_loader.get_enabled_agents() == enabled_agents[:-1]
         
         print("✅ ConfigLoader test passed")
         return True
@@ -131,6 +139,12 @@ def test_file_manager():
             written_files = file_manager.write_files(files)
             assert len(written_files) == 3
             
+            # Test parallel writing
+            parallel_files = {f"pkg/module_{i}.py": f"VALUE = {i}" for i in range(8)}
+            written_files = file_manager.write_files_parallel(parallel_files, max_workers=4)
+            assert written_files == [file_manager.output_dir / path for path in parallel_files]
+            assert file_manager.read_file("pkg/module_5.py") == "VALUE = 5"
+            
             # Test project structure
             structure = file_manager.get_project_structure()
             assert "src" in structure
@@ -167,6 +181,13 @@ def test_prompt_templates():
         assert len(rendered) > 0
         assert "frontend developer" in rendered.lower()
         
+        # Renders are memoized, keeping only the most recently used ones
+        from utils.prompt_templates import _MAX_RENDERED
+        assert templates.render_template("frontend_system", agent_name="Test Agent", agent_type="frontend") is rendered
+        for i in range(_MAX_RENDERED + 10):
+            templates.render_template("frontend_task", project_context=f"Project {i}", task_description="Build", dependencies=None)
+        assert len(templates._rendered) == _MAX_RENDERED
+        
         print("✅ PromptTemplates test passed")
         return True
         
@@ -175,6 +196,463 @@ def test_prompt_templates():
         return False
 
 
+def test_response_cache():
+    """Test response cache lookups and eviction."""
+    print("🧪 Testing ResponseCache...")
+    
+    try:
+        from utils.response_cache import ResponseCache
+        
+        cache = ResponseCache(max_entries=2)
+        
+        # Keys ignore whitespace and case differences
+        key = ResponseCache.make_key("backend", "Create  the API", None)
+        assert key == ResponseCache.make_key("backend", "create the api", "")
+        assert ResponseCache.make_key("Create  the API", normalize=False) != ResponseCache.make_key("create the api", normalize=False)
+        assert cache.get(key) is None
+        
+        cache.put(key, "response")
+        assert cache.get(key) == "response"
+        
+        # Least recently used entry is evicted
+        cache.put("b", "2")
+        cache.get(key)
+        cache.put("c", "3")
+        assert cache.get("b") is None
+        assert cache.get(key) == "response"
+        assert len(cache) == 2
+        
+        # Reworded requests are found by similarity, unrelated ones are not
+        cache.put("api", "api code", text="Create a REST API for managing user accounts")
+        assert cache.get_similar("Create a REST API for managing user accounts and roles", 0.85) == "api code"
+        assert cache.get_similar("Write a landing page with a signup form", 0.85) is None
+        
+        print("✅ ResponseCache test passed")
+        return True
+        
+    except Exception as e:
+        print(f"❌ ResponseCache test failed: {e}")
+        return False
+
+
+def test_planning_cache():
+    """Test that planning responses are reused by later runs."""
+    print("🧪 Testing planning cache...")
+    
+    try:
+        import asyncio
+        import os
+        import uuid
+        from types import SimpleNamespace
+        from agents.orchestrator import APIAgent
+        from utils.config_loader import ModelConfig
+        
+        # Keep this test's entries out of the user's cache
+        os.environ["LLM_CACHE_PATH"] = str(Path(tempfile.mkdtemp()) / "responses.sqlite3")
+        os.environ.setdefault("OPENAI_API_KEY", "test")
+        model_config = ModelConfig(name="planner", type="api", model_id="gpt-test", api_key_env="OPENAI_API_KEY", temperature=0)
+        prompt = f"Plan project {uuid.uuid4()}"
+        calls = []
+        
+        def create(**kwargs):
+            calls.append(kwargs)
+            message = SimpleNamespace(content='[{"name": "Setup"}]')
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+        
+        agent = APIAgent(model_config)
+        agent.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+        assert agent.generate(prompt) == '[{"name": "Setup"}]'
+        
+        # A new agent, as in the next run, streams the stored plan without calling the API
+        agent = APIAgent(model_config)
+        agent.client = agent._async_client_class = None
+        
+        async def stream():
+            return [chunk async for chunk in agent.agenerate_stream(prompt)]
+        
+        assert asyncio.run(stream()) == ['[{"name": "Setup"}]']
+        assert agent.generate(prompt) == '[{"name": "Setup"}]'
+        assert len(calls) == 1
+        
+        print("✅ Planning cache test passed")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Planning cache test failed: {e}")
+        return False
+
+
+def test_designer_json():
+    """Test that designer JSON encoding doesn't depend on the installed backend."""
+    print("🧪 Testing designer JSON...")
+    
+    try:
+        import json
+        from designer import _fastjson
+        from designer.batch import request_key
+        from designer.models import DesignRequest
+        
+        data = {"name": "Café ☕", "values": [1, 2.5, 1e-07, 1e16, None, True], "nested": {"empty": [], "items": [{"a": "b"}]}}
+        request = DesignRequest(prompt="Build a café app", requirements=["Unicode ☕"], constraints=[],
+                                preferences={"ratio": 1e-07}, timestamp="now")
+        
+        backend = _fastjson.orjson
+        try:
+            outputs = []
+            # Both backends: orjson if it is installed, then the standard library
+            for module in (backend, None):
+                _fastjson.orjson = module
+                outputs.append((_fastjson.dumps(data), _fastjson.dumps(data, indent=True), request_key(request)))
+                assert _fastjson.loads(outputs[-1][0]) == data
+        finally:
+            _fastjson.orjson = backend
+        
+        assert outputs[0] == outputs[1]
+        assert outputs[0][:2] == (json.dumps(data), json.dumps(data, indent=2))
+        
+        print("✅ Designer JSON test passed")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Designer JSON test failed: {e}")
+        return False
+
+
+def test_rate_limiter():
+    """Test request spacing of the rate limiter."""
+    print("🧪 Testing RateLimiter...")
+    
+    try:
+        import time
+        from utils.rate_limiter import RateLimiter, get_rate_limiter
+        
+        # 1200 requests per minute leaves 50ms between requests
+        limiter = RateLimiter(1200)
+        start = time.monotonic()
+        for _ in range(3):
+            limiter.acquire()
+        assert time.monotonic() - start >= 0.09
+        
+        # Limiters are shared by model name, and only exist when a limit is set
+        assert get_rate_limiter("test_model", 60) is get_rate_limiter("test_model", 60)
+        assert get_rate_limiter("test_model", None) is None
+        
+        print("✅ RateLimiter test passed")
+        return True
+        
+    except Exception as e:
+        print(f"❌ RateLimiter test failed: {e}")
+        return False
+
+
+def test_agent_batching():
+    """Test batched task execution on an agent."""
+    print("🧪 Testing agent batching...")
+    
+    try:
+        from agents.base_agent import BaseAgent
+        from utils.config_loader import AgentConfig, ModelConfig
+        
+        class EchoAgent(BaseAgent):
+            def _generate_response(self, prompt):
+                return "Done\n```filename: out.py\nprint('ok')\n```"
+        
+        agent = EchoAgent(
+            "Echo Agent",
+            AgentType.BACKEND,
+            AgentConfig(name="echo", agent_type="backend", model="test", system_prompt_template=""),
+            ModelConfig(name="test", type="api", model_id="gpt-test")
+        )
+        
+        tasks = [
+            Task(id=f"task{i}", name=f"Task {i}", description="Write code", agent_type=AgentType.BACKEND)
+            for i in range(3)
+        ]
+        
+        outputs = agent.run_tasks(tasks)
+        assert len(outputs) == 3
+        assert all(output.success for output in outputs)
+        assert [output.metadata["task_id"] for output in outputs] == ["task0", "task1", "task2"]
+        assert outputs[0].files["out.py"] == "print('ok')"
+        assert agent.get_stats()["tasks_completed"] == 3
+        
+        # Tasks combined into one API request don't each ask for END_OF_FILES,
+        # which would stop generation after the first answer
+        from agents.base_agent import SMEAgent
+        
+        class MarshalingAgent(SMEAgent):
+            def _load_api_client(self):
+                pass
+            
+            def _generate_response(self, prompt):
+                # Answer every task, writing END_OF_FILES wherever asked to; the stop sequence ends the response there
+                sections = prompt.split("=== TASK ")[1:]
+                response = ""
+                for number, section in enumerate(sections, 1):
+                    response += f"=== RESPONSE {number} ===\n```filename: task{number}.py\npass\n```\n"
+                    if "write END_OF_FILES on its own line" in section:
+                        response += "END_OF_FILES\n"
+                return response.split("END_OF_FILES")[0]
+        
+        agent = MarshalingAgent(
+            "Marshaling Agent",
+            AgentType.BACKEND,
+            AgentConfig(name="marshaling", agent_type="backend", model="test", system_prompt_template=""),
+            ModelConfig(name="test", type="api", model_id="gpt-test", max_tasks_per_request=3)
+        )
+        outputs = agent.run_tasks(tasks)
+        assert all(output.success for output in outputs)
+        assert [list(output.files) for output in outputs] == [["task1.py"], ["task2.py"], ["task3.py"]]
+        
+        print("✅ Agent batching test passed")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Agent batching test failed: {e}")
+        return False
+
+
+def test_similar_task_cache():
+    """Test that similarity lookups tell apart the tasks of one project."""
+    print("🧪 Testing similar task caching...")
+    
+    try:
+        from agents.base_agent import BaseAgent
+        from utils.config_loader import AgentConfig, ModelConfig
+        
+        prompts = []
+        
+        class CountingAgent(BaseAgent):
+            def _generate_response(self, prompt):
+                prompts.append(prompt)
+                return f"Response {len(prompts)}\n```filename: out{len(prompts)}.py\npass\n```"
+        
+        agent = CountingAgent(
+            "Counting Agent",
+            AgentType.BACKEND,
+            AgentConfig(name="counting", agent_type="backend", model="test", system_prompt_template="",
+                        similarity_threshold=0.9),
+            ModelConfig(name="test", type="api", model_id="gpt-test")
+        )
+        spec = (Path(__file__).parent / "examples" / "simple-cli-spec.txt").read_text(encoding="utf-8")
+        project_context = {"description": spec}
+        
+        def run(task_id, description):
+            task = Task(id=task_id, name=task_id, description=description, agent_type=AgentType.BACKEND)
+            return agent.run_task(task, project_context)
+        
+        parser = run("parser", "Implement the command line argument parser")
+        writer = run("writer", "Write unit tests for the file writer module")
+        assert len(prompts) == 2
+        assert parser.summary != writer.summary
+        
+        # A reworded task of the same project still reuses the response
+        reworded = run("parser2", "Implement the command line argument parser module")
+        assert len(prompts) == 2
+        assert reworded.summary == parser.summary
+        
+        print("✅ Similar task caching test passed")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Similar task caching test failed: {e}")
+        return False
+
+
+def test_response_parsing():
+    """Test parsing of JSON envelope and code fence responses."""
+    print("🧪 Testing response parsing...")
+    
+    try:
+        import json
+        from agents.base_agent import BaseAgent
+        from utils.config_loader import AgentConfig, ModelConfig
+        
+        class ParseAgent(BaseAgent):
+            def _generate_response(self, prompt):
+                return ""
+        
+        agent = ParseAgent(
+            "Parse Agent",
+            AgentType.BACKEND,
+            AgentConfig(name="parse", agent_type="backend", model="test", system_prompt_template=""),
+            ModelConfig(name="test", type="api", model_id="gpt-test")
+        )
+        task = Task(id="task", name="Parse Task", description="Write code", agent_type=AgentType.BACKEND)
+        
+        envelope = json.dumps({"summary": "Added app", "files": [{"path": "app.py", "content": "x = '```'"}]})
+        output = agent._parse_response(envelope, task)
+        assert output.files == {"app.py": "x = '```'"}
+        assert output.summary == "Added app"
+        
+        # Leading whitespace and a json code fence around the envelope are tolerated
+        for response in ("\n  " + envelope, "```json\n" + envelope + "\n```\n"):
+            output = agent._parse_response(response, task)
+            assert output.files == {"app.py": "x = '```'"}
+            assert output.summary == "Added app"
+        
+        # Anything that isn't a valid envelope falls back to code fences
+        output = agent._parse_response('{"note": 1}\n```filename: b.py\npass\n```', task)
+        assert output.files == {"b.py": "pass"}
+        assert output.summary == '{"note": 1}'
+        
+        # Structured output neither asks for END_OF_FILES nor stops on it, which would cut off the envelope
+        from types import SimpleNamespace
+        from agents.base_agent import SMEAgent
+        
+        requests = []
+        
+        def create(**kwargs):
+            requests.append(kwargs)
+            message = SimpleNamespace(content=envelope)
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+        
+        class StructuredAgent(SMEAgent):
+            def _load_api_client(self):
+                self._provider = "openai"
+                self.api_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+        
+        agent = StructuredAgent(
+            "Structured Agent",
+            AgentType.BACKEND,
+            AgentConfig(name="structured", agent_type="backend", model="test", system_prompt_template=""),
+            ModelConfig(name="test", type="api", model_id="gpt-test", structured_output=True, max_tasks_per_request=2)
+        )
+        output = agent.run_task(task, {"description": "Test project"})
+        assert output.files == {"app.py": "x = '```'"}
+        assert "stop" not in requests[0]
+        assert "END_OF_FILES" not in json.dumps(requests[0]["messages"])
+        
+        # Nor are its tasks combined into one request, whose answer would be a single envelope
+        tasks = [
+            Task(id=f"task{i}", name=f"Task {i}", description=f"Write module {i}", agent_type=AgentType.BACKEND)
+            for i in range(2)
+        ]
+        outputs = agent.run_tasks(tasks, {"description": "Test project"})
+        assert [output.files for output in outputs] == [{"app.py": "x = '```'"}] * 2
+        assert len(requests) == 3
+        
+        print("✅ Response parsing test passed")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Response parsing test failed: {e}")
+        return False
+
+
+def test_streamed_files():
+    """Test that files are written as soon as a streaming model finishes them."""
+    print("🧪 Testing streamed files...")
+    
+    try:
+        from agents.orchestrator import Orchestrator
+        
+        output_dir = Path(tempfile.mkdtemp())
+        orchestrator = Orchestrator("models/config.yaml", str(output_dir))
+        agent = orchestrator.agents["backend"]
+        chunks = ["Models\n```filename: models.py\nclass User", ":\n    pass\n```\n", "```filename: app.py\napp = 1\n```"]
+        
+        def generate_streaming(prompt, on_file):
+            def stream():
+                yield from chunks[:-1]
+                # The first file is on disk while the rest is still being generated
+                assert (output_dir / "models.py").read_text() == "class User:\n    pass"
+                yield chunks[-1]
+            for filename, content in agent._iter_completed_files(stream()):
+                on_file(filename, content)
+            return "".join(chunks)
+        
+        agent._generate_response_streaming = generate_streaming
+        orchestrator.dependency_graph.add_task(
+            Task(id="task_001", name="Models", description="Write the models", agent_type=AgentType.BACKEND)
+        )
+        assert orchestrator.execute_plan()
+        assert (output_dir / "app.py").read_text() == "app = 1"
+        
+        print("✅ Streamed files test passed")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Streamed files test failed: {e}")
+        return False
+
+
+def test_interrupted_plan():
+    """Test that a planning stream failing partway through fails the run."""
+    print("🧪 Testing interrupted planning...")
+    
+    try:
+        from agents.orchestrator import Orchestrator
+        from agents.base_agent import AgentOutput
+        
+        orchestrator = Orchestrator("models/config.yaml", tempfile.mkdtemp())
+        orchestrator.orchestrator_config.parallel_execution = True
+        
+        async def agenerate_stream(prompt, static_prefix=None):
+            yield '[{"id": "task_001", "name": "Models", "agent_type": "backend"}, '
+            raise ConnectionError("stream closed")
+        
+        async def arun_task(task, project_context):
+            return AgentOutput(success=True, summary="Done")
+        
+        orchestrator.api_agent.agenerate_stream = agenerate_stream
+        for agent in orchestrator.agents.values():
+            agent.arun_task = arun_task
+        
+        assert orchestrator.run("Build an app") is False
+        
+        print("✅ Interrupted planning test passed")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Interrupted planning test failed: {e}")
+        return False
+
+
+def test_inference_server_batching():
+    """Test that concurrent requests are batched together."""
+    print("🧪 Testing inference server batching...")
+    
+    try:
+        import asyncio
+        from agents.inference_server import InferenceServer
+        
+        batches = []
+        
+        def generate_batch(prompts):
+            batches.append(list(prompts))
+            return [prompt.upper() for prompt in prompts]
+        
+        async def submit_all():
+            server = InferenceServer(max_batch_size=4, window_ms=50)
+            return await asyncio.gather(
+                *(server.submit(f"prompt {i}", generate_batch) for i in range(6))
+            )
+        
+        responses = asyncio.run(submit_all())
+        assert responses == [f"PROMPT {i}" for i in range(6)]
+        assert [len(batch) for batch in batches] == [4, 2]
+        
+        # Short and long generations are batched separately
+        batches.clear()
+        
+        async def submit_mixed():
+            server = InferenceServer(max_batch_size=4, window_ms=50)
+            return await asyncio.gather(
+                *(server.submit(f"prompt {i}", generate_batch, 100 if i % 2 else 4000) for i in range(4))
+            )
+        
+        asyncio.run(submit_mixed())
+        assert sorted(batches) == [["prompt 0", "prompt 2"], ["prompt 1", "prompt 3"]]
+        
+        print("✅ Inference server batching test passed")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Inference server batching test failed: {e}")
+        return False
+
+
 def test_logging():
     """Test logging setup."""
     print("🧪 Testing logging...")
@@ -207,7 +685,17 @@ def main():
         test_config_loader,
         test_dependency_graph,
         test_file_manager,
-        test_prompt_templates
+        test_prompt_templates,
+        test_response_cache,
+        test_planning_cache,
+        test_designer_json,
+        test_rate_limiter,
+        test_agent_batching,
+        test_similar_task_cache,
+        test_response_parsing,
+        test_streamed_files,
+        test_interrupted_plan,
+        test_inference_server_batching
     ]
     
     passed = 0
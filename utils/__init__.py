@@ -8,6 +8,8 @@ from .file_manager import FileManager
 from .dependency_graph import DependencyGraph, Task
 from .prompt_templates import PromptTemplates
 from .config_loader import ConfigLoader
+from .response_cache import ResponseCache
+from .rate_limiter import RateLimiter
 
 __all__ = [
     "setup_logging",
@@ -15,5 +17,7 @@ __all__ = [
     "DependencyGraph",
     "Task",
     "PromptTemplates",
-    "ConfigLoader"
+    "ConfigLoader",
+    "ResponseCache",
+    "RateLimiter"
 ]
\ No newline at end of file
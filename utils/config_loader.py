@@ -13,23 +13,30 @@ from pydantic import BaseModel, Field, validator
 class ModelConfig(BaseModel):
     """Configuration for a single model."""
     name: str
-    type: str = Field(..., description="Type: 'api' or 'local'")
+    type: str = Field(..., description="Type: 'api', 'local' or 'vllm'")
     model_id: str = Field(..., description="Model identifier or path")
     api_key_env: Optional[str] = Field(None, description="Environment variable for API key")
     api_base: Optional[str] = Field(None, description="API base URL")
     max_tokens: int = Field(2048, description="Maximum tokens to generate")
     temperature: float = Field(0.7, description="Sampling temperature")
     timeout: int = Field(60, description="Request timeout in seconds")
+    cache_responses: bool = Field(False, description="Reuse responses to identical prompts across runs (always on at temperature 0)")
+    requests_per_minute: Optional[int] = Field(None, description="API models: client-side request rate limit, shared by every agent using the model")
     
     # Local model specific settings
     device: str = Field("auto", description="Device for local models")
-    quantization: Optional[str] = Field(None, description="Quantization method")
+    quantization: Optional[str] = Field(None, description="Quantization method: '4bit', 'auto' (4bit on CUDA) or None")
     max_memory: Optional[str] = Field(None, description="Maximum memory usage")
+    max_num_seqs: int = Field(16, description="Maximum prompts generated together in one batch")
+    max_tasks_per_request: int = Field(1, description="API models: independent tasks combined into one request (max_tokens is shared); ignored with structured_output")
+    compile: bool = Field(False, description="Compile local models with torch.compile when CUDA is available (uses a static KV cache, which disables prompt prefix caching)")
+    structured_output: bool = Field(False, description="Request a JSON envelope of files, enforced by backends that support it")
+    kv_cache_dtype: str = Field("auto", description="vLLM KV cache dtype: 'auto' or an FP8 type such as 'fp8_e5m2'")
     
     @validator('type')
     def validate_type(cls, v):
-        if v not in ['api', 'local']:
-            raise ValueError("Model type must be 'api' or 'local'")
+        if v not in ['api', 'local', 'vllm']:
+            raise ValueError("Model type must be 'api', 'local' or 'vllm'")
         return v
 
 
@@ -40,6 +47,7 @@ class AgentConfig(BaseModel):
     model: str = Field(..., description="Model name to use")
     system_prompt_template: str = Field(..., description="System prompt template")
     max_retries: int = Field(3, description="Maximum retry attempts")
+    similarity_threshold: Optional[float] = Field(None, description="Reuse the response to a task at least this similar (0-1); None for exact matches only")
     enabled: bool = Field(True, description="Whether agent is enabled")
 
 
@@ -50,6 +58,8 @@ class OrchestratorConfig(BaseModel):
     max_tasks: int = Field(50, description="Maximum number of tasks")
     parallel_execution: bool = Field(False, description="Enable parallel task execution")
     max_parallel_tasks: int = Field(3, description="Maximum parallel tasks")
+    max_retries: int = Field(5, description="Retries of planning requests failing on rate limits, timeouts or server errors")
+    batch_tasks: bool = Field(False, description="Hand ready tasks that share an agent to it together")
 
 
 class SystemConfig(BaseModel):
@@ -82,6 +92,9 @@ class ConfigLoader:
             self.config_path = self._find_config_file()
         
         self.config: Optional[SystemConfig] = None
+        # Derived from the loaded config on first use; cleared whenever it is (re)loaded
+        self._enabled_agents: Optional[List[str]] = None
+        self._reference_errors: Optional[List[str]] = None
         self._load_config()
     
     def _find_config_file(self) -> Path:
@@ -105,6 +118,9 @@ class ConfigLoader:
     
     def _load_config(self) -> None:
         """Load configuration from file."""
+        self._enabled_agents = None
+        self._reference_errors = None
+        
         if not self.config_path.exists():
             self.logger.warning(f"Config file not found: {self.config_path}")
             self._create_default_config()
@@ -230,10 +246,12 @@ class ConfigLoader:
         """Get list of enabled agent names."""
         if not self.config:
             return []
-        return [
-            name for name, config in self.config.agents.items()
-            if config.enabled
-        ]
+        if self._enabled_agents is None:
+            self._enabled_agents = [
+                name for name, config in self.config.agents.items()
+                if config.enabled
+            ]
+        return list(self._enabled_agents)
     
     def validate_config(self) -> List[str]:
         """
@@ -242,23 +260,12 @@ class ConfigLoader:
         Returns:
             List of validation errors (empty if valid)
         """
-        errors = []
-        
         if not self.config:
-            errors.append("No configuration loaded")
-            return errors
-        
-        # Check that orchestrator model exists
-        orch_model = self.config.orchestrator.model
-        if orch_model not in self.config.models:
-            errors.append(f"Orchestrator model '{orch_model}' not found in models config")
+            return ["No configuration loaded"]
         
-        # Check that agent models exist
-        for agent_name, agent_config in self.config.agents.items():
-            if agent_config.model not in self.config.models:
-                errors.append(f"Agent '{agent_name}' references non-existent model '{agent_config.model}'")
+        errors = list(self._get_reference_errors())
         
-        # Check API keys for API models
+        # Check API keys for API models; the environment can change, so this is redone every time
         for model_name, model_config in self.config.models.items():
             if model_config.type == "api" and model_config.api_key_env:
                 if not os.getenv(model_config.api_key_env):
@@ -266,6 +273,24 @@ class ConfigLoader:
         
         return errors
     
+    def _get_reference_errors(self) -> List[str]:
+        """Get the errors of model references that don't resolve, checked once per loaded config."""
+        if self._reference_errors is None:
+            errors = []
+            
+            # Check that orchestrator model exists
+            orch_model = self.config.orchestrator.model
+            if orch_model not in self.config.models:
+                errors.append(f"Orchestrator model '{orch_model}' not found in models config")
+            
+            # Check that agent models exist
+            for agent_name, agent_config in self.config.agents.items():
+                if agent_config.model not in self.config.models:
+                    errors.append(f"Agent '{agent_name}' references non-existent model '{agent_config.model}'")
+            
+            self._reference_errors = errors
+        return self._reference_errors
+    
     def reload_config(self) -> bool:
         """
         Reload configuration from file.
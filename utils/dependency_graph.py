@@ -5,6 +5,8 @@ Task and dependency graph management for the LLM Swarm system.
 from dataclasses import dataclass, field
 from typing import List, Dict, Set, Optional, Any
 from enum import Enum
+import heapq
+import itertools
 import logging
 
 
@@ -44,6 +46,7 @@ class Task:
     context: Dict[str, Any] = field(default_factory=dict)
     priority: int = 0  # Higher number = higher priority
     estimated_duration: Optional[int] = None  # in minutes
+    expected_tokens: Optional[int] = None  # expected output length, used to batch similar generations
     
     def __post_init__(self):
         """Validate task after initialization."""
@@ -84,6 +87,8 @@ class DependencyGraph:
     
     def __init__(self):
         self.tasks: Dict[str, Task] = {}
+        # Reverse dependency edges: ids of the tasks depending on each task id
+        self._dependents: Dict[str, List[str]] = {}
         self.logger = logging.getLogger(__name__)
     
     def add_task(self, task: Task) -> None:
@@ -100,6 +105,8 @@ class DependencyGraph:
             raise ValueError(f"Task with ID '{task.id}' already exists")
         
         self.tasks[task.id] = task
+        for dep_id in task.dependencies:
+            self._dependents.setdefault(dep_id, []).append(task.id)
         self.logger.debug(f"Added task: {task.id} ({task.name})")
     
     def get_task(self, task_id: str) -> Optional[Task]:
@@ -148,23 +155,25 @@ class DependencyGraph:
                     raise ValueError(f"Task '{task.id}' depends on non-existent task '{dep_id}'")
                 in_degree[task.id] += 1
         
-        # Find tasks with no dependencies
-        queue = [task_id for task_id, degree in in_degree.items() if degree == 0]
+        # Heap of ready tasks by priority (higher first), then by when they became ready
+        sequence = itertools.count()
+        queue = [
+            (-self.tasks[task_id].priority, next(sequence), task_id)
+            for task_id, degree in in_degree.items() if degree == 0
+        ]
+        heapq.heapify(queue)
         result = []
         
         while queue:
-            # Sort by priority for consistent ordering
-            queue.sort(key=lambda tid: -self.tasks[tid].priority)
-            current_id = queue.pop(0)
+            _, _, current_id = heapq.heappop(queue)
             current_task = self.tasks[current_id]
             result.append(current_task)
             
             # Update in-degrees for dependent tasks
-            for task in self.tasks.values():
-                if current_id in task.dependencies:
-                    in_degree[task.id] -= 1
-                    if in_degree[task.id] == 0:
-                        queue.append(task.id)
+            for dependent_id in self._dependents.get(current_id, ()):
+                in_degree[dependent_id] -= 1
+                if in_degree[dependent_id] == 0:
+                    heapq.heappush(queue, (-self.tasks[dependent_id].priority, next(sequence), dependent_id))
         
         # Check for circular dependencies
         if len(result) != len(self.tasks):
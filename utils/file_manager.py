@@ -4,6 +4,7 @@ File management utilities for the LLM Swarm system.
 
 import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Optional, Union
 import logging
@@ -90,6 +91,40 @@ class FileManager:
         self.logger.info(f"Written {len(written_files)} files")
         return written_files
     
+    def write_files_parallel(self, files: Dict[str, str], overwrite: bool = True,
+                             max_workers: Optional[int] = None) -> List[Path]:
+        """
+        Write multiple files at once, using a thread pool.
+        
+        File writes release the GIL, so many small files are written with
+        their syscalls overlapping instead of one after another.
+        
+        Args:
+            files: Dictionary mapping relative paths to content
+            overwrite: Whether to overwrite existing files
+            max_workers: Number of writer threads (default: CPU count)
+            
+        Returns:
+            List of paths to written files, in the order given
+        """
+        if len(files) <= 1:
+            return self.write_files(files, overwrite)
+        
+        def write(item):
+            relative_path, content = item
+            try:
+                return self.write_file(relative_path, content, overwrite)
+            except Exception as e:
+                self.logger.error(f"Failed to write {relative_path}: {e}")
+                return None
+        
+        max_workers = min(len(files), max_workers or os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            written_files = [path for path in executor.map(write, files.items()) if path is not None]
+        
+        self.logger.info(f"Written {len(written_files)} files")
+        return written_files
+    
     def read_file(self, relative_path: str) -> str:
         """
         Read content from a file in the output directory.
@@ -182,10 +217,13 @@ class FileManager:
         self.logger.debug(f"Copied directory: {source_path} -> {relative_dest}")
         return dest_path
     
-    def write_json(self, relative_path: str, data: dict, indent: int = 2) -> Path:
+    def write_json(self, relative_path: str, data: Union[dict, list], indent: int = 2) -> Path:
         """
         Write data as JSON to a file.
         
+        The JSON is encoded straight into the file, so large data is never
+        held in memory as one string.
+        
         Args:
             relative_path: Path relative to output directory
             data: Data to write as JSON
@@ -194,8 +232,19 @@ class FileManager:
         Returns:
             Path to written file
         """
-        content = json.dumps(data, indent=indent, ensure_ascii=False)
-        return self.write_file(relative_path, content)
+        file_path = self.output_dir / relative_path
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        try:
+            with open(file_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=indent, ensure_ascii=False)
+            
+            self.logger.debug(f"Written file: {relative_path}")
+            return file_path
+            
+        except Exception as e:
+            self.logger.error(f"Failed to write file {relative_path}: {e}")
+            raise
     
     def write_yaml(self, relative_path: str, data: dict) -> Path:
         """
@@ -0,0 +1,108 @@
+"""
+Persistent LLM response cache for the LLM Swarm system.
+
+Repeated runs with the same prompts, such as design runs or the planning of
+a dry run and then of the real one, read a local database instead of calling
+the API again.
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+# Default database location; LLM_CACHE_PATH overrides it
+_DEFAULT_PATH = Path.home() / ".cache" / "llm-swarm" / "responses.sqlite3"
+
+# Most recently used responses also kept in memory
+_MAX_MEMORY_ENTRIES = 1000
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_memory: "OrderedDict[str, str]" = OrderedDict()
+_connection: Optional[sqlite3.Connection] = None
+_unavailable = False
+
+
+def make_key(model: str, temperature: float, prompt: str) -> str:
+    """Build the cache key of a request."""
+    return hashlib.sha256(f"{model}\0{temperature}\0{prompt}".encode("utf-8")).hexdigest()
+
+
+def _enabled() -> bool:
+    """Check whether caching is on (LLM_CACHE_DISABLE=1 turns it off)."""
+    return os.getenv("LLM_CACHE_DISABLE", "") not in ("1", "true", "yes")
+
+
+def _connect() -> Optional[sqlite3.Connection]:
+    """Open the cache database on first use; None if it can't be opened. Call with _lock held."""
+    global _connection, _unavailable
+    if _connection is None and not _unavailable:
+        try:
+            path = Path(os.getenv("LLM_CACHE_PATH") or _DEFAULT_PATH)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            _connection = sqlite3.connect(str(path), check_same_thread=False)
+            _connection.execute("PRAGMA journal_mode=WAL")
+            _connection.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, response TEXT NOT NULL)")
+            _connection.commit()
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"LLM response cache unavailable: {e}")
+            _connection = None
+            _unavailable = True
+    return _connection
+
+
+def _remember(key: str, response: str) -> None:
+    """Keep a response in the in-memory layer, evicting the least recently used. Call with _lock held."""
+    _memory[key] = response
+    _memory.move_to_end(key)
+    while len(_memory) > _MAX_MEMORY_ENTRIES:
+        _memory.popitem(last=False)
+
+
+def get(key: str) -> Optional[str]:
+    """Get a cached response, or None if there is none."""
+    if not _enabled():
+        return None
+    
+    with _lock:
+        response = _memory.get(key)
+        if response is not None:
+            _memory.move_to_end(key)
+            return response
+        
+        connection = _connect()
+        if connection is None:
+            return None
+        try:
+            row = connection.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"LLM response cache read failed: {e}")
+            return None
+        if row is None:
+            return None
+        
+        _remember(key, row[0])
+        return row[0]
+
+
+def put(key: str, response: str) -> None:
+    """Store a response."""
+    if not _enabled():
+        return
+    
+    with _lock:
+        _remember(key, response)
+        connection = _connect()
+        if connection is None:
+            return
+        try:
+            connection.execute("INSERT OR REPLACE INTO responses (key, response) VALUES (?, ?)", (key, response))
+            connection.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"LLM response cache write failed: {e}")
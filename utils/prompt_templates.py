@@ -2,9 +2,16 @@
 Prompt templates for the LLM Swarm system.
 """
 
-from typing import Dict, Any
-from jinja2 import Template
+from collections import OrderedDict
+from typing import Dict, Any, Tuple
+from jinja2 import Environment, Template
 import logging
+import threading
+
+# Variable types whose renders can be memoized; anything else (lists, dicts) is rendered every time
+_CACHEABLE_TYPES = (str, int, float, bool, type(None))
+# Most recently used renders kept; task renders hold whole project descriptions, so the memo stays small
+_MAX_RENDERED = 64
 
 
 class PromptTemplates:
@@ -15,6 +22,14 @@ class PromptTemplates:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         self.templates = self._load_default_templates()
+        # Templates are compiled once, here and in add_template, rather than on every render
+        self.env = Environment(cache_size=-1, auto_reload=False)
+        self._compiled: Dict[str, Template] = {
+            name: self.env.from_string(content) for name, content in self.templates.items()
+        }
+        # Rendered output by (template name, variables), for renders with plain scalar variables
+        self._rendered: "OrderedDict[Tuple, str]" = OrderedDict()
+        self._rendered_lock = threading.Lock()
     
     def _load_default_templates(self) -> Dict[str, str]:
         """Load default prompt templates."""
@@ -22,10 +37,7 @@ class PromptTemplates:
             # Orchestrator templates
             "orchestrator_planning": """You are a senior software architect and project manager. Your task is to analyze a project specification and create a detailed implementation plan.
 
-Project Specification:
-{{ project_spec }}
-
-Please analyze this specification and create a comprehensive implementation plan. Break down the project into specific, actionable tasks that can be handled by specialized development agents.
+Please analyze the project specification given at the end and create a comprehensive implementation plan. Break down the project into specific, actionable tasks that can be handled by specialized development agents.
 
 For each task, provide:
 1. Task ID (unique identifier)
@@ -56,7 +68,10 @@ Output your plan as a JSON array of task objects with the following structure:
 ]
 ```
 
-Focus on creating a logical sequence where dependencies are clearly defined and tasks build upon each other appropriately.""",
+Focus on creating a logical sequence where dependencies are clearly defined and tasks build upon each other appropriately.
+
+Project Specification:
+{{ project_spec }}""",
 
             # Frontend agent templates
             "frontend_system": """You are an expert frontend developer with deep knowledge of modern web technologies including:
@@ -86,26 +101,26 @@ Guidelines:
 
 Output only the code files requested, with clear file names and proper structure.""",
 
-            "frontend_task": """Project Context:
+            "frontend_task": """Please implement the frontend components and functionality as specified below. Provide the complete code for all necessary files.
+
+Format your response as follows:
+```filename: path/to/file.ext
+[file content]
+```
+
+For multiple files, separate each with a new filename block.{% if not structured_output %} After the last file, write END_OF_FILES on its own line.{% endif %}
+
+Project Context:
 {{ project_context }}
 
 Task: {{ task_description }}
-
 {% if dependencies %}
+
 Dependencies completed:
 {% for dep in dependencies %}
 - {{ dep.name }}: {{ dep.output_summary }}
 {% endfor %}
-{% endif %}
-
-Please implement the frontend components and functionality as specified. Provide the complete code for all necessary files.
-
-Format your response as follows:
-```filename: path/to/file.ext
-[file content]
-```
-
-For multiple files, separate each with a new filename block.""",
+{% endif %}""",
 
             # Backend agent templates  
             "backend_system": """You are an expert backend developer with extensive experience in:
@@ -130,26 +145,26 @@ Guidelines:
 
 Output only the code files requested, with clear file names and proper structure.""",
 
-            "backend_task": """Project Context:
+            "backend_task": """Please implement the backend functionality as specified below. Provide the complete code for all necessary files.
+
+Format your response as follows:
+```filename: path/to/file.ext
+[file content]
+```
+
+For multiple files, separate each with a new filename block.{% if not structured_output %} After the last file, write END_OF_FILES on its own line.{% endif %}
+
+Project Context:
 {{ project_context }}
 
 Task: {{ task_description }}
-
 {% if dependencies %}
+
 Dependencies completed:
 {% for dep in dependencies %}
 - {{ dep.name }}: {{ dep.output_summary }}
 {% endfor %}
-{% endif %}
-
-Please implement the backend functionality as specified. Provide the complete code for all necessary files.
-
-Format your response as follows:
-```filename: path/to/file.ext
-[file content]
-```
-
-For multiple files, separate each with a new filename block.""",
+{% endif %}""",
 
             # Database agent templates
             "database_system": """You are an expert database developer and architect with deep knowledge of:
@@ -174,26 +189,26 @@ Guidelines:
 
 Output only the code files requested, with clear file names and proper structure.""",
 
-            "database_task": """Project Context:
+            "database_task": """Please implement the database schema and related code as specified below. Provide the complete code for all necessary files.
+
+Format your response as follows:
+```filename: path/to/file.ext
+[file content]
+```
+
+For multiple files, separate each with a new filename block.{% if not structured_output %} After the last file, write END_OF_FILES on its own line.{% endif %}
+
+Project Context:
 {{ project_context }}
 
 Task: {{ task_description }}
-
 {% if dependencies %}
+
 Dependencies completed:
 {% for dep in dependencies %}
 - {{ dep.name }}: {{ dep.output_summary }}
 {% endfor %}
-{% endif %}
-
-Please implement the database schema and related code as specified. Provide the complete code for all necessary files.
-
-Format your response as follows:
-```filename: path/to/file.ext
-[file content]
-```
-
-For multiple files, separate each with a new filename block.""",
+{% endif %}""",
 
             # Testing agent templates
             "testing_system": """You are an expert software testing engineer with comprehensive knowledge of:
@@ -218,26 +233,26 @@ Guidelines:
 
 Output only the test files requested, with clear file names and proper structure.""",
 
-            "testing_task": """Project Context:
+            "testing_task": """Please implement comprehensive tests as specified below. Provide the complete test code for all necessary files.
+
+Format your response as follows:
+```filename: path/to/file.ext
+[file content]
+```
+
+For multiple files, separate each with a new filename block.{% if not structured_output %} After the last file, write END_OF_FILES on its own line.{% endif %}
+
+Project Context:
 {{ project_context }}
 
 Task: {{ task_description }}
-
 {% if dependencies %}
+
 Dependencies completed:
 {% for dep in dependencies %}
 - {{ dep.name }}: {{ dep.output_summary }}
 {% endfor %}
-{% endif %}
-
-Please implement comprehensive tests as specified. Provide the complete test code for all necessary files.
-
-Format your response as follows:
-```filename: path/to/file.ext
-[file content]
-```
-
-For multiple files, separate each with a new filename block.""",
+{% endif %}""",
 
             # Documentation agent templates
             "documentation_system": """You are an expert technical writer specializing in software documentation. You have extensive experience with:
@@ -261,26 +276,38 @@ Guidelines:
 
 Output only the documentation files requested, with clear file names and proper structure.""",
 
-            "documentation_task": """Project Context:
+            "documentation_task": """Please create comprehensive documentation as specified below. Provide the complete documentation for all necessary files.
+
+Format your response as follows:
+```filename: path/to/file.ext
+[file content]
+```
+
+For multiple files, separate each with a new filename block.{% if not structured_output %} After the last file, write END_OF_FILES on its own line.{% endif %}
+
+Project Context:
 {{ project_context }}
 
 Task: {{ task_description }}
-
 {% if dependencies %}
+
 Dependencies completed:
 {% for dep in dependencies %}
 - {{ dep.name }}: {{ dep.output_summary }}
 {% endfor %}
-{% endif %}
-
-Please create comprehensive documentation as specified. Provide the complete documentation for all necessary files.
-
-Format your response as follows:
-```filename: path/to/file.ext
-[file content]
-```
-
-For multiple files, separate each with a new filename block."""
+{% endif %}""",
+
+            # Several independent tasks answered in one request (see max_tasks_per_request)
+            "batched_tasks": """Complete each of the {{ tasks|length }} independent tasks below, in order. Start the answer to each task with a line reading exactly "=== RESPONSE n ===", where n is the task number. Write END_OF_FILES only once, after the answer to the last task.
+{% for task in tasks %}
+=== TASK {{ loop.index }} ===
+{{ task }}
+{% endfor %}""",
+
+            # Appended to system prompts when the model is configured for structured output
+            "structured_output_format": """Respond with a single JSON object instead of filename code blocks, and nothing else:
+{"summary": "<short description of what you implemented>", "files": [{"path": "path/to/file.ext", "content": "<complete file content>"}]}
+This format replaces the code block format described in the task."""
         }
     
     def get_template(self, template_name: str) -> Template:
@@ -296,10 +323,10 @@ For multiple files, separate each with a new filename block."""
         Raises:
             KeyError: If template not found
         """
-        if template_name not in self.templates:
+        if template_name not in self._compiled:
             raise KeyError(f"Template '{template_name}' not found")
         
-        return Template(self.templates[template_name])
+        return self._compiled[template_name]
     
     def render_template(self, template_name: str, **kwargs) -> str:
         """
@@ -312,8 +339,23 @@ For multiple files, separate each with a new filename block."""
         Returns:
             Rendered template string
         """
-        template = self.get_template(template_name)
-        return template.render(**kwargs)
+        if not all(isinstance(value, _CACHEABLE_TYPES) for value in kwargs.values()):
+            return self.get_template(template_name).render(**kwargs)
+        
+        key = (template_name, tuple(sorted(kwargs.items())))
+        with self._rendered_lock:
+            rendered = self._rendered.get(key)
+            if rendered is not None:
+                self._rendered.move_to_end(key)
+                return rendered
+        
+        rendered = self.get_template(template_name).render(**kwargs)
+        with self._rendered_lock:
+            self._rendered[key] = rendered
+            # Evict the least recently used renders
+            while len(self._rendered) > _MAX_RENDERED:
+                self._rendered.popitem(last=False)
+        return rendered
     
     def add_template(self, name: str, template_content: str) -> None:
         """
@@ -324,6 +366,10 @@ For multiple files, separate each with a new filename block."""
             template_content: Template content
         """
         self.templates[name] = template_content
+        self._compiled[name] = self.env.from_string(template_content)
+        with self._rendered_lock:
+            for key in [key for key in self._rendered if key[0] == name]:
+                del self._rendered[key]
         self.logger.debug(f"Added template: {name}")
     
     def list_templates(self) -> list:
@@ -0,0 +1,76 @@
+"""
+Client-side request rate limiting for the LLM Swarm system.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Dict, Optional
+
+
+class RateLimiter:
+    """
+    Spaces requests evenly to stay under a requests-per-minute limit.
+    
+    Each caller reserves the next free slot and waits until it comes up, so
+    concurrent callers, sync or async, queue behind each other instead of
+    bursting into the provider's limit and getting rate-limited (HTTP 429).
+    """
+    
+    def __init__(self, requests_per_minute: float):
+        """
+        Initialize the rate limiter.
+        
+        Args:
+            requests_per_minute: Maximum sustained request rate
+        """
+        if requests_per_minute <= 0:
+            raise ValueError("requests_per_minute must be positive")
+        self.interval = 60.0 / requests_per_minute
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+    
+    def _reserve(self) -> float:
+        """Reserve the next slot and return how long to wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+            return slot - now
+    
+    def acquire(self) -> None:
+        """Block until the next request may be sent."""
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+    
+    async def aacquire(self) -> None:
+        """Wait, without blocking the event loop, until the next request may be sent."""
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+# Limiters by model name, so every agent using a model shares its limit
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(name: str, requests_per_minute: Optional[float]) -> Optional[RateLimiter]:
+    """
+    Get the shared rate limiter for a model.
+    
+    Args:
+        name: Model name
+        requests_per_minute: Configured limit, or None for no limit
+    
+    Returns:
+        The model's rate limiter, or None if it isn't rate limited
+    """
+    if not requests_per_minute:
+        return None
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            limiter = _limiters[name] = RateLimiter(requests_per_minute)
+        return limiter
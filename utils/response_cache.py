@@ -0,0 +1,146 @@
+"""
+Response caching for the LLM Swarm system.
+"""
+
+import hashlib
+import math
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def _vectorize(text: str) -> Tuple[Dict[str, int], float]:
+    """Bag-of-words counts of a text and their Euclidean norm."""
+    counts = Counter(_WORD_RE.findall(text.lower()))
+    return counts, math.sqrt(sum(count * count for count in counts.values()))
+
+
+class ResponseCache:
+    """
+    Bounded, time-limited cache of model responses.
+    
+    Keys are hashes of whitespace- and case-normalized text, so the same
+    request phrased with different spacing or capitalization hits the same
+    entry. The least recently used entry is evicted once the cache is full.
+    
+    Entries stored with their source text can also be found by similarity,
+    for requests that are reworded rather than repeated exactly.
+    """
+    
+    def __init__(self, max_entries: int = 256, ttl_seconds: Optional[float] = 3600):
+        """
+        Initialize the response cache.
+        
+        Args:
+            max_entries: Maximum number of cached responses
+            ttl_seconds: How long an entry stays valid (None for no expiry)
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def make_key(*parts: Any, normalize: bool = True) -> str:
+        """
+        Build a cache key from request parts.
+        
+        Args:
+            *parts: Values identifying the request; None is treated as empty
+            normalize: Ignore case and whitespace differences; disable for
+                exact-match keys such as full prompts
+        
+        Returns:
+            Hex digest of the (normalized) parts
+        """
+        if normalize:
+            parts = [" ".join(str(part or "").lower().split()) for part in parts]
+        joined = "\x1f".join(str(part if part is not None else "") for part in parts)
+        return hashlib.sha256(joined.encode("utf-8")).hexdigest()
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Get a cached value, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            stored_at, value, _ = entry
+            if self.ttl_seconds is not None and time.time() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def get_similar(self, text: str, threshold: float) -> Optional[Any]:
+        """
+        Get the cached value whose source text is most similar to ``text``.
+        
+        Similarity is the cosine of bag-of-words vectors, so word order and
+        repeated boilerplate matter little while different wording does.
+        
+        Args:
+            text: Text of the new request
+            threshold: Minimum cosine similarity (0-1) for a hit
+        
+        Returns:
+            The most similar value, or None if nothing reaches the threshold
+        """
+        counts, norm = _vectorize(text)
+        if not norm:
+            return None
+        
+        with self._lock:
+            now = time.time()
+            best_key, best_score = None, threshold
+            for key, (stored_at, _, vector) in self._entries.items():
+                if vector is None or (self.ttl_seconds is not None and now - stored_at > self.ttl_seconds):
+                    continue
+                other_counts, other_norm = vector
+                # Iterate over the smaller vector; words missing from either side contribute nothing
+                small, large = (counts, other_counts) if len(counts) <= len(other_counts) else (other_counts, counts)
+                score = sum(count * large.get(word, 0) for word, count in small.items()) / (norm * other_norm)
+                if score >= best_score:
+                    best_key, best_score = key, score
+            
+            if best_key is None:
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(best_key)
+            self.hits += 1
+            return self._entries[best_key][1]
+    
+    def put(self, key: str, value: Any, text: Optional[str] = None) -> None:
+        """
+        Store a value, evicting the least recently used entry if the cache is full.
+        
+        Args:
+            key: Cache key
+            value: Value to store
+            text: Source text of the request, to make the entry findable by get_similar
+        """
+        vector = _vectorize(text) if text else None
+        with self._lock:
+            self._entries[key] = (time.time(), value, vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        """Remove all cached entries."""
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)